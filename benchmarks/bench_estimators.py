@@ -0,0 +1,154 @@
+"""
+Benchmark: every estimator entry point across data sizes.
+
+Times `edge`, `edge_hft.edge`, `edge_rolling` (several windows and steps)
+and `edge_expanding` on seeded synthetic bars from 10 to 10^7 rows, with
+clean and NaN-laden inputs. Warm timings are the best of several runs after
+a warm-up call; cold timings run each entry point in a fresh interpreter
+with an empty numba cache, so they include JIT compilation. Results are
+written as JSON to compare commits.
+
+Usage:
+    python benchmarks/bench_estimators.py [--sizes 10 1000 100000] [--cases edge edge_rolling]
+        [--output results.json] [--compare baseline.json] [--no-cold]
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from common import (
+    CASES,
+    NAN_FRACTIONS,
+    ROOT,
+    SIZES,
+    environment,
+    ohlc_frame,
+    select_cases,
+)
+
+COLD_N = 1_000
+
+
+def _time_warm(fn, df, repeat, budget):
+    """Best and median seconds of ``fn(df)`` after a warm-up call."""
+    t0 = time.perf_counter()
+    fn(df)
+    first = time.perf_counter() - t0
+    repeat = max(1, min(repeat, int(budget / max(first, 1e-9))))
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - t0)
+    return min(times), float(np.median(times)), repeat
+
+
+def _time_cold(name):
+    """First and second call of one case in a fresh process with no JIT cache."""
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ, NUMBA_CACHE_DIR=cache)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--_cold", name],
+            env=env, capture_output=True, text=True, check=True, cwd=ROOT,
+        )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _cold_child(name):
+    t0 = time.perf_counter()
+    fn = CASES[name][2]
+    df = ohlc_frame(COLD_N)
+    t1 = time.perf_counter()
+    fn(df)
+    t2 = time.perf_counter()
+    fn(df)
+    t3 = time.perf_counter()
+    print(json.dumps({"setup_s": t1 - t0, "first_call_s": t2 - t1, "second_call_s": t3 - t2}))
+
+
+def run(sizes, case_names, repeat, budget, cold):
+    cases = select_cases(case_names)
+    results = []
+    print(f"{'case':<28} {'n':>10} {'nan':>5} {'best (s)':>11} {'median (s)':>11} {'Mbars/s':>9}")
+    for name, (params, max_n, fn) in cases.items():
+        for n in sizes:
+            if max_n is not None and n > max_n:
+                continue
+            for nan_frac in NAN_FRACTIONS:
+                df = ohlc_frame(n, nan_frac)
+                best, median, runs = _time_warm(fn, df, repeat, budget)
+                results.append({
+                    "case": name, "params": params, "n": n, "nan_frac": nan_frac,
+                    "mode": "warm", "best_s": best, "median_s": median, "runs": runs,
+                    "bars_per_s": n / best,
+                })
+                print(f"{name:<28} {n:>10} {nan_frac:>5.2f} {best:>11.6f} {median:>11.6f} "
+                      f"{n / best / 1e6:>9.3f}")
+        if cold:
+            res = _time_cold(name)
+            results.append({"case": name, "params": params, "n": COLD_N, "nan_frac": 0.0,
+                            "mode": "cold", **res})
+            print(f"{name:<28} {'cold':>10} {'':>5} first call {res['first_call_s']:.3f}s, "
+                  f"second {res['second_call_s']:.6f}s")
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """Print warm-time ratios against a previous result file; returns regressions."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    key = lambda r: (r["case"], r["n"], r["nan_frac"])  # noqa: E731
+    old = {key(r): r for r in baseline["results"] if r["mode"] == "warm"}
+    regressions = []
+    print(f"\nvs {baseline_path} (commit {baseline['environment']['commit']})")
+    for r in results:
+        if r["mode"] != "warm" or key(r) not in old:
+            continue
+        ratio = r["best_s"] / old[key(r)]["best_s"]
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        if flag:
+            regressions.append((key(r), ratio))
+        print(f"{r['case']:<28} {r['n']:>10} {r['nan_frac']:>5.2f} {ratio:>8.2f}x {flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="bars per input")
+    parser.add_argument("--cases", nargs="+", help="case names, e.g. edge edge_rolling (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="max timed runs per input")
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="approximate seconds of timed runs per input")
+    parser.add_argument("--no-cold", action="store_true", help="skip cold-JIT subprocess runs")
+    parser.add_argument("--output", help="JSON result file (default: benchmarks/results/estimators-<commit>.json)")
+    parser.add_argument("--compare", help="previous JSON result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown flagged as a regression by --compare")
+    parser.add_argument("--_cold", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._cold:
+        _cold_child(args._cold)
+        sys.exit(0)
+
+    env = environment()
+    results = run(args.sizes, args.cases, args.repeat, args.budget, not args.no_cold)
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"estimators-{env['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=1)
+    print(f"\nWrote {output}")
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
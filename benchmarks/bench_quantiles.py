@@ -0,0 +1,77 @@
+"""
+Benchmark: streaming rolling quantiles vs pandas rolling quantile.
+
+Compares `rolling_quantile` (batch) and `RollingQuantile.update` (one value
+at a time, as in a live feed) against ``Series.rolling(w).quantile(q)`` for
+two thresholds, and checks that the results are identical.
+
+Usage:
+    python benchmarks/bench_quantiles.py [--n 1000000] [--windows 48 480 4800]
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantjourney_bidask.quantiles import RollingQuantile, rolling_quantile
+
+
+def _timed(fn, repeat=3):
+    best = np.inf
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run(n, windows, live_n):
+    rng = np.random.default_rng(0)
+    spread = np.abs(rng.normal(0.001, 0.0003, n))
+    spread[rng.random(n) < 0.01] = np.nan
+    series = pd.Series(spread)
+    qs = (0.25, 0.75)
+
+    rolling_quantile(spread[:100], 10, qs)  # JIT warm-up
+
+    print(f"{'window':>8} {'pandas (s)':>12} {'batch (s)':>12} {'speedup':>9} "
+          f"{'live (us/update)':>18} {'identical':>10}")
+    for w in windows:
+        t_pd, expected = _timed(
+            lambda w=w: np.column_stack([series.rolling(w).quantile(q).to_numpy() for q in qs])
+        )
+        t_nb, got = _timed(lambda w=w: rolling_quantile(spread, w, qs))
+
+        rq = RollingQuantile(w, qs)
+        values = spread[:live_n].tolist()
+        t0 = time.perf_counter()
+        for v in values:
+            rq.update(v)
+        t_live = (time.perf_counter() - t0) / len(values) * 1e6
+
+        same = np.array_equal(got, expected, equal_nan=True)
+        print(f"{w:>8} {t_pd:>12.4f} {t_nb:>12.4f} {t_pd / t_nb:>8.1f}x "
+              f"{t_live:>18.2f} {str(same):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--n", type=int, default=1_000_000, help="observations")
+    parser.add_argument("--windows", type=int, nargs="+", default=[48, 480, 4800])
+    parser.add_argument("--live-n", type=int, default=100_000, help="observations for the live loop")
+    args = parser.parse_args()
+    run(args.n, args.windows, args.live_n)
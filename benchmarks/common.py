@@ -0,0 +1,102 @@
+"""
+Shared inputs and cases for the estimator benchmarks.
+
+Seeded synthetic OHLC data (optionally with missing prices) and one entry per
+public estimator entry point, so the timing and memory harnesses measure
+exactly the same calls.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data.synthetic import simulate_ohlc_arrays  # noqa: E402
+from quantjourney_bidask import edge, edge_expanding, edge_hft, edge_rolling  # noqa: E402
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+NAN_FRACTIONS = [0.0, 0.05]
+
+
+def ohlc_frame(n: int, nan_frac: float = 0.0, seed: int = 0) -> pd.DataFrame:
+    """Seeded synthetic OHLC bars; ``nan_frac`` of each column set to NaN."""
+    arrays = simulate_ohlc_arrays(n, spread=0.002, volatility=0.001, seed=seed)
+    df = pd.DataFrame({k: arrays[k][0] for k in ("open", "high", "low", "close")})
+    if nan_frac > 0:
+        rng = np.random.default_rng(seed + 1)
+        for col in df.columns:
+            df.loc[rng.random(n) < nan_frac, col] = np.nan
+    return df
+
+
+def _arrays(df):
+    return df["open"].to_numpy(), df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy()
+
+
+# name -> (params, max_n, function of the input frame)
+CASES = {
+    "edge": ({}, None, lambda df: edge(*_arrays(df))),
+    "edge_hft": ({}, None, lambda df: edge_hft.edge(*_arrays(df))),
+    "edge_rolling[w=21,step=1]": (
+        {"window": 21, "step": 1}, None, lambda df: edge_rolling(df, window=21)
+    ),
+    "edge_rolling[w=21,step=5]": (
+        {"window": 21, "step": 5}, None, lambda df: edge_rolling(df, window=21, step=5)
+    ),
+    "edge_rolling[w=252,step=1]": (
+        {"window": 252, "step": 1}, None, lambda df: edge_rolling(df, window=252)
+    ),
+    # Worker processes over shared memory; compare with the serial w=21 case.
+    "edge_rolling[w=21,n_jobs=-1]": (
+        {"window": 21, "n_jobs": -1}, None, lambda df: edge_rolling(df, window=21, n_jobs=-1)
+    ),
+    # One full edge() call per row: quadratic, so capped.
+    "edge_expanding": ({"min_periods": 3}, 10_000, lambda df: edge_expanding(df)),
+}
+
+
+def select_cases(names=None):
+    """Cases named in ``names``; ``"edge_rolling"`` selects every variant (all if None)."""
+    if not names:
+        return dict(CASES)
+    return {
+        k: v for k, v in CASES.items()
+        if any(k == n or k.startswith(n + "[") for n in names)
+    }
+
+
+def environment() -> dict:
+    """Machine, library versions and commit, stored with every result file."""
+    import numba
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "numba": numba.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
@@ -0,0 +1,180 @@
+"""
+Memory profile: peak bytes and allocations of every estimator entry point.
+
+Runs the same cases and seeded inputs as `bench_estimators.py` (see
+`common.py`) and measures each call twice after a small warm-up call that
+triggers JIT compilation:
+
+- RSS pass: a background thread samples the resident set size every
+  millisecond; the reported figure is the peak above the level before the
+  call, so it includes memory tracemalloc cannot see (a lower bound when
+  earlier calls left freed memory resident).
+- tracemalloc pass: peak traced bytes during the call (NumPy buffers and
+  Python objects), bytes and blocks still held by the result, and the
+  number of allocations made inside compiled kernels (numba runtime
+  statistics).
+
+Results are printed as a table and written as JSON; ``--compare`` flags
+cases whose peak grew beyond ``--tolerance`` of a previous run, so memory
+budgets can be checked the same way as timings.
+
+Usage:
+    python benchmarks/profile_memory.py [--sizes 1000 100000] [--cases edge edge_rolling]
+        [--output results.json] [--compare baseline.json]
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Numba only counts kernel allocations when enabled before it is imported.
+os.environ.setdefault("NUMBA_NRT_STATS", "1")
+
+from common import NAN_FRACTIONS, ROOT, SIZES, environment, ohlc_frame, select_cases  # noqa: E402
+from numba.core.runtime import rtsys  # noqa: E402
+
+WARMUP_N = 100
+
+
+def _rss_bytes():
+    """Current resident set size (Linux ``/proc``; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class _RssSampler(threading.Thread):
+    """Records the highest RSS seen until stopped."""
+
+    def __init__(self, interval=0.001):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = _rss_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak = max(self.peak, _rss_bytes())
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, _rss_bytes())
+        return self.peak
+
+
+def _rss_pass(fn, df):
+    gc.collect()
+    before = _rss_bytes()
+    sampler = _RssSampler()
+    sampler.start()
+    result = fn(df)
+    peak = sampler.stop()
+    del result
+    return max(0, peak - before)
+
+
+def _tracemalloc_pass(fn, df):
+    gc.collect()
+    nrt_before = rtsys.get_allocation_stats()
+    tracemalloc.start()
+    base = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    result = fn(df)
+    current, peak = tracemalloc.get_traced_memory()
+    held = tracemalloc.take_snapshot().compare_to(base, "filename")
+    tracemalloc.stop()
+    nrt_after = rtsys.get_allocation_stats()
+    del result
+    return {
+        "peak_bytes": peak - start_bytes,
+        "retained_bytes": current - start_bytes,
+        "retained_blocks": sum(max(0, s.count_diff) for s in held),
+        "kernel_allocs": nrt_after.alloc - nrt_before.alloc,
+    }
+
+
+def run(sizes, case_names):
+    cases = select_cases(case_names)
+    results = []
+    print(f"{'case':<28} {'n':>10} {'nan':>5} {'peak MiB':>10} {'B/bar':>8} "
+          f"{'RSS MiB':>9} {'held MiB':>9} {'blocks':>7} {'kernel':>7}")
+    for name, (params, max_n, fn) in cases.items():
+        fn(ohlc_frame(WARMUP_N))
+        for n in sizes:
+            if max_n is not None and n > max_n:
+                continue
+            for nan_frac in NAN_FRACTIONS:
+                df = ohlc_frame(n, nan_frac)
+                input_bytes = int(df.memory_usage(index=True, deep=True).sum())
+                rss = _rss_pass(fn, df)
+                traced = _tracemalloc_pass(fn, df)
+                results.append({
+                    "case": name, "params": params, "n": n, "nan_frac": nan_frac,
+                    "input_bytes": input_bytes, "rss_peak_bytes": rss, **traced,
+                    "peak_bytes_per_bar": traced["peak_bytes"] / n,
+                })
+                print(f"{name:<28} {n:>10} {nan_frac:>5.2f} {traced['peak_bytes'] / 2**20:>10.2f} "
+                      f"{traced['peak_bytes'] / n:>8.1f} {rss / 2**20:>9.2f} "
+                      f"{traced['retained_bytes'] / 2**20:>9.2f} {traced['retained_blocks']:>7} "
+                      f"{traced['kernel_allocs']:>7}")
+                del df
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """Print peak-byte ratios against a previous result file; returns regressions."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    key = lambda r: (r["case"], r["n"], r["nan_frac"])  # noqa: E731
+    old = {key(r): r for r in baseline["results"]}
+    regressions = []
+    print(f"\nvs {baseline_path} (commit {baseline['environment']['commit']})")
+    for r in results:
+        if key(r) not in old:
+            continue
+        ratio = r["peak_bytes"] / max(old[key(r)]["peak_bytes"], 1)
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        if flag:
+            regressions.append((key(r), ratio))
+        print(f"{r['case']:<28} {r['n']:>10} {r['nan_frac']:>5.2f} {ratio:>8.2f}x {flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="bars per input")
+    parser.add_argument("--cases", nargs="+", help="case names, e.g. edge edge_rolling (default: all)")
+    parser.add_argument("--output", help="JSON result file (default: benchmarks/results/memory-<commit>.json)")
+    parser.add_argument("--compare", help="previous JSON result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="peak-memory growth flagged as a regression by --compare")
+    args = parser.parse_args()
+
+    env = environment()
+    results = run(args.sizes, args.cases)
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"memory-{env['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=1)
+    print(f"\nWrote {output}")
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
@@ -15,11 +15,23 @@ import asyncio
 import logging
 import os
 from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
 
 import numpy as np
 import pandas as pd
 import yfinance as yf
 
+try:
+    from .providers import BatchEquityLoader, EquityProvider
+    from .realtime import RealtimeStream
+    from .stream import EXCHANGES, StreamClient
+    from .synthetic import simulate_ohlc
+except ImportError:
+    from providers import BatchEquityLoader, EquityProvider
+    from realtime import RealtimeStream
+    from stream import EXCHANGES, StreamClient
+    from synthetic import simulate_ohlc
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -38,127 +50,117 @@ class DataFetcher:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
+        self.realtime_stream = None
+        self._stream_callbacks = []
         logger.info(f"DataFetcher initialized: data_dir={data_dir}")
 
+    def start_realtime_crypto_stream(
+        self,
+        symbols,
+        interval: str = "1m",
+        exchange: str = "binance",
+        is_synthetic_stream: bool = False,
+        use_ccxt: bool = False,
+        url: Optional[str] = None,
+        queue_size: int = 10000,
+        workers: int = 2,
+        conflate: bool = False,
+        min_interval: float = 0.0,
+        metrics=None,
+    ):
+        """Start a background bar stream; raises if the exchange is unreachable.
+
+        Network I/O runs on its own asyncio thread and callbacks on a pool of
+        ``workers`` threads (see `data.realtime.RealtimeStream`). With
+        ``conflate=True`` callbacks get each symbol's latest bar at most once
+        per ``min_interval`` seconds instead of every update. A
+        ``metrics`` registry (`quantjourney_bidask.metrics`) receives the
+        stream counters and stage latencies. ``use_ccxt``
+        is accepted for compatibility: live bars and order book quotes always
+        come from the exchange websocket.
+        """
+        if self.realtime_stream is not None and self.realtime_stream.running:
+            raise RuntimeError("A real-time stream is already running.")
+        stream = RealtimeStream(
+            symbols,
+            interval=interval,
+            exchange=exchange,
+            synthetic=is_synthetic_stream,
+            url=url,
+            queue_size=queue_size,
+            workers=workers,
+            conflate=conflate,
+            min_interval=min_interval,
+            metrics=metrics,
+        )
+        for callback in self._stream_callbacks:
+            stream.add_callback(callback)
+        stream.start()
+        self.realtime_stream = stream
+        return stream
+
+    def add_stream_callback(self, callback):
+        """Register a callback receiving one bar dict per stream update."""
+        if not callable(callback):
+            raise TypeError("Callback must be a callable function.")
+        self._stream_callbacks.append(callback)
+        if self.realtime_stream is not None:
+            self.realtime_stream.add_callback(callback)
+
+    def stop_realtime_crypto_stream(self):
+        """Stop the background stream started by `start_realtime_crypto_stream`."""
+        if self.realtime_stream is not None:
+            self.realtime_stream.stop()
+
+    def get_stream_stats(self):
+        """Queue depth, drop and throughput counters of the running stream."""
+        if self.realtime_stream is None:
+            return {}
+        return self.realtime_stream.stats()
+
     async def get_btc_1m_websocket(
-        self, exchange_name: str = "binance", duration_seconds: int = 60
+        self,
+        exchange_name: str = "binance",
+        duration_seconds: int = 60,
+        url: Optional[str] = None,
     ):
-        """Get real-time BTC data via CCXT - fetches live data every second."""
-        if not CCXT_AVAILABLE:
-            logger.info("CCXT not available, using synthetic BTC data")
+        """Get real-time BTC data from the exchange's push websocket streams."""
+        if exchange_name.lower() not in EXCHANGES:
+            logger.info(f"No websocket adapter for {exchange_name}, using synthetic BTC data")
             return self._generate_synthetic_btc_stream(duration_seconds)
 
+        client = StreamClient(exchange_name, interval="1m", url=url, connect_timeout=5.0)
+        client.subscribe(["BTCUSDT"])
         try:
-            exchange_class = getattr(ccxt_async, exchange_name.lower())
-            exchange = exchange_class({"enableRateLimit": True, "timeout": 10000})
-            await exchange.load_markets()
-
-            data_points = []
-            symbol = "BTC/USDT"
-
             logger.info(
                 f"🚀 Starting BTC real-time data stream for {duration_seconds}s "
                 f"using {exchange_name}"
             )
-
-            for i in range(duration_seconds):
-                try:
-                    # Fetch real-time ticker data
-                    ticker = await exchange.fetch_ticker(symbol)
-
-                    # Calculate spread from bid/ask if available
-                    price = float(ticker["close"])
-                    bid = ticker.get("bid")
-                    ask = ticker.get("ask")
-
-                    if bid and ask and bid > 0 and ask > 0:
-                        # Real bid-ask spread
-                        spread_value = float(ask) - float(bid)
-                        # If real spread is 0 or very small, use estimated
-                        # spread instead
-                        # Less than 0.1 bps
-                        if spread_value < price * 0.000001:
-                            # 2 basis points realistic spread
-                            base_spread_bps = 2.0
-                            volatility_factor = 1 + np.random.uniform(-0.3, 0.7)
-                            spread_bps = base_spread_bps * volatility_factor
-                            spread_value = price * (spread_bps / 10000)
-                            spread_source = "estimated"
-                        else:
-                            spread_source = "real"
-                    else:
-                        # Estimate realistic spread for BTC (typically 1-5 bps)
-                        base_spread_bps = 2.5  # 2.5 basis points base spread
-                        volatility_factor = 1 + np.random.uniform(
-                            -0.5, 1.0
-                        )  # Add some randomness
-                        spread_bps = base_spread_bps * volatility_factor
-                        spread_value = price * (spread_bps / 10000)
-                        spread_source = "estimated"
-
-                    current_time = datetime.now(timezone.utc)
-                    data_points.append(
-                        {
-                            "timestamp": current_time,
-                            "symbol": "BTCUSDT",
-                            "price": price,
-                            "open": (
-                                float(ticker["open"]) if ticker.get("open") else price
-                            ),
-                            "high": (
-                                float(ticker["high"]) if ticker.get("high") else price
-                            ),
-                            "low": float(ticker["low"]) if ticker.get("low") else price,
-                            "close": price,
-                            "volume": (
-                                float(ticker["baseVolume"])
-                                if ticker.get("baseVolume")
-                                else 0
-                            ),
-                            "bid": float(bid) if bid else price - spread_value / 2,
-                            "ask": float(ask) if ask else price + spread_value / 2,
-                            "spread": spread_value / price,  # As percentage
-                            "spread_source": spread_source,
-                        }
-                    )
-
-                    spread_bps = (spread_value / price) * 10000
-                    if i % 5 == 0:  # Log every 5 seconds
-                        logger.info(
-                            f"Real BTC: ${price:.2f}, spread: "
-                            f"{spread_bps:.2f}bps ({spread_source})"
-                        )
-
-                    await asyncio.sleep(1)
-
-                except Exception as e:
-                    logger.warning(f"Fetch ticker error: {e}")
-                    # Continue trying for a few more attempts
-                    if i < duration_seconds - 5:
-                        await asyncio.sleep(1)
-                        continue
-                    else:
-                        break
-
-            await exchange.close()
-
-            # If we got some real data, return it
-            if data_points:
-                df = pd.DataFrame(data_points)
-                logger.info(
-                    f"Collected {len(data_points)} real BTC data points "
-                    f"from {exchange_name}"
-                )
-                return df
-            else:
-                logger.info("No real data collected, falling back to synthetic")
-                return self._generate_synthetic_btc_stream(duration_seconds)
-
+            await client.connect()
+            await client.run(duration=duration_seconds)
         except Exception as e:
             logger.error(f"Real-time data error: {e}")
             logger.info("Falling back to synthetic data")
             return self._generate_synthetic_btc_stream(duration_seconds)
 
+        rows = client.buffer.drain()
+        if len(rows["close"]) == 0:
+            logger.info("No real data collected, falling back to synthetic")
+            return self._generate_synthetic_btc_stream(duration_seconds)
+
+        df = client.to_frame(rows)
+        df["price"] = df["close"]
+        df["spread"] = (df["ask"] - df["bid"]) / df["price"]  # As percentage
+        df["spread_source"] = np.where(df["spread"].notna(), "real", "missing")
+        cols = ["timestamp", "symbol", "price", "open", "high", "low", "close"]
+        cols += ["volume", "bid", "ask", "spread", "spread_source", "is_closed"]
+        df = df[cols]
+        logger.info(
+            f"Collected {len(df)} real BTC data points from {exchange_name} "
+            f"({client.messages} messages, {client.reconnects} reconnects)"
+        )
+        return df
+
     async def get_historical_crypto_data(
         self,
         symbol: str = "BTC/USDT",
@@ -226,6 +228,18 @@ class DataFetcher:
             logger.error(f"Stock data error for {ticker}: {e}")
             return pd.DataFrame()
 
+    def get_stock_panel(
+        self,
+        tickers: Iterable[str],
+        period: str = "1mo",
+        interval: str = "1d",
+        provider: Optional[EquityProvider] = None,
+        max_workers: int = 8,
+    ) -> pd.DataFrame:
+        """Get stock data for many tickers as one long-format panel."""
+        loader = BatchEquityLoader(provider=provider, max_workers=max_workers)
+        return loader.load(tickers, period=period, interval=interval)
+
     def save_data(self, df: pd.DataFrame, filename: str):
         """Save data to CSV."""
         if not filename.endswith(".csv"):
@@ -258,94 +272,62 @@ class DataFetcher:
 
     def _generate_synthetic_btc_stream(self, duration_seconds: int):
         """Generate synthetic BTC stream data with realistic price movements."""
-        base_price = 45000
-        data_points = []
-        current_time = datetime.now(timezone.utc)
-
         logger.info(
             f"Generating synthetic BTC data with realistic price movements "
             f"for {duration_seconds}s"
         )
 
-        for i in range(duration_seconds):
-            # More realistic price movement with trend and volatility
-            trend = 0.0001 if i > duration_seconds / 2 else -0.0001  # Slight trend
-            volatility = base_price * 0.0005  # 0.05% volatility per second
-            price_change = np.random.normal(trend * base_price, volatility)
-            price = max(base_price + price_change, 1000)
-
-            # Dynamic spread based on volatility
-            base_spread_bps = 1.5  # 1.5 basis points base spread
-            volatility_multiplier = 1 + abs(price_change) / (base_price * 0.001)
-            spread_bps = base_spread_bps * volatility_multiplier
-            spread_value = price * (spread_bps / 10000)
-
-            data_points.append(
-                {
-                    "timestamp": current_time + timedelta(seconds=i),
-                    "symbol": "BTCUSDT",
-                    "price": price,
-                    "open": base_price,
-                    "high": max(base_price, price),
-                    "low": min(base_price, price),
-                    "close": price,
-                    "volume": np.random.uniform(500, 2000),
-                    "bid": price - spread_value / 2,
-                    "ask": price + spread_value / 2,
-                    "spread": spread_value / price,  # As percentage
-                }
-            )
-
-            if i % 10 == 0:  # Log every 10 seconds
-                logger.info(
-                    f"Synthetic BTC: ${price:.2f} "
-                    f"(change: {((price/base_price-1)*100):+.3f}%), "
-                    f"spread: {spread_bps:.2f}bps"
-                )
-
-            base_price = price  # Use current price as base for next
+        # 1-second bars, 0.05% volatility per second, 1.5 bps true spread
+        bars = simulate_ohlc(
+            duration_seconds,
+            spread=0.00015,
+            volatility=0.0005,
+            trades_per_bar=20,
+            initial_price=45000,
+            start=datetime.now(timezone.utc),
+            freq="1s",
+            symbols=["BTCUSDT"],
+        )
+        half_spread = bars["spread"] / 2
+        df = pd.DataFrame(
+            {
+                "timestamp": bars["timestamp"],
+                "symbol": bars["symbol"],
+                "price": bars["close"],
+                "open": bars["open"],
+                "high": bars["high"],
+                "low": bars["low"],
+                "close": bars["close"],
+                "volume": bars["volume"] * 50,
+                "bid": bars["mid"] * (1 - half_spread),
+                "ask": bars["mid"] * (1 + half_spread),
+                "spread": bars["spread"],  # As percentage
+            }
+        )
 
-        min_price = min(d['price'] for d in data_points)
-        max_price = max(d['price'] for d in data_points)
         logger.info(
-            f"Generated {len(data_points)} synthetic BTC data points with "
-            f"price range ${min_price:.2f}-${max_price:.2f}"
+            f"Generated {len(df)} synthetic BTC data points with "
+            f"price range ${df['price'].min():.2f}-${df['price'].max():.2f}"
         )
-        return pd.DataFrame(data_points)
+        return df
 
     def _generate_synthetic_historical_data(self, symbol: str, limit: int):
         """Generate synthetic historical OHLCV data."""
         base_price = 45000 if "BTC" in symbol.upper() else 2500
-        data_points = []
-        current_time = datetime.now(timezone.utc) - timedelta(minutes=limit)
-
-        for i in range(limit):
-            # Generate realistic OHLCV data
-            price_change = np.random.normal(0, base_price * 0.005)
-            close_price = max(base_price + price_change, 1)
-
-            open_price = base_price
-            high_price = max(open_price, close_price) * (
-                1 + np.random.uniform(0, 0.002)
-            )
-            low_price = min(open_price, close_price) * (1 - np.random.uniform(0, 0.002))
-            volume = np.random.uniform(1000, 10000)
-
-            data_points.append(
-                {
-                    "timestamp": current_time + timedelta(minutes=i),
-                    "symbol": symbol.replace("/", ""),
-                    "open": open_price,
-                    "high": high_price,
-                    "low": low_price,
-                    "close": close_price,
-                    "volume": volume,
-                }
-            )
-            base_price = close_price
+        df = simulate_ohlc(
+            limit,
+            spread=0.001,
+            volatility=0.005,
+            initial_price=base_price,
+            start=datetime.now(timezone.utc) - timedelta(minutes=limit),
+            freq="1min",
+            symbols=[symbol.replace("/", "")],
+        )
+        df["volume"] *= 500
+        df = df[["timestamp", "symbol", "open", "high", "low", "close", "volume"]]
 
-        logger.info(f"Generated {len(data_points)} synthetic historical data points")
-        return pd.DataFrame(data_points)
+        logger.info(f"Generated {len(df)} synthetic historical data points")
+        return df
 
 
 # Convenience functions for backward compatibility
@@ -366,10 +348,16 @@ def get_stock_data(ticker: str, period: str = "1mo", interval: str = "1d"):
     return fetcher.get_stock_data(ticker, period, interval)
 
 
-async def stream_btc_data(duration_seconds: int = 60):
+def get_stock_panel(tickers: Iterable[str], period: str = "1mo", interval: str = "1d"):
+    """Quick function to get a multi-ticker stock panel."""
+    fetcher = DataFetcher()
+    return fetcher.get_stock_panel(tickers, period, interval)
+
+
+async def stream_btc_data(duration_seconds: int = 60, url: Optional[str] = None):
     """Quick function to stream BTC data."""
     fetcher = DataFetcher()
-    return await fetcher.get_btc_1m_websocket(duration_seconds=duration_seconds)
+    return await fetcher.get_btc_1m_websocket(duration_seconds=duration_seconds, url=url)
 
 
 async def main():
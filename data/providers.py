@@ -0,0 +1,228 @@
+"""
+Batched equity data providers for quantjourney_bidask examples and tests.
+
+Loads OHLCV bars for many tickers at once and returns them as a single
+long-format panel (one row per symbol and timestamp) that can be passed
+straight to the estimators after a ``groupby("symbol")``.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PANEL_COLUMNS = ["timestamp", "symbol", "open", "high", "low", "close", "volume"]
+_FIELDS = ["open", "high", "low", "close", "volume"]
+
+
+class EquityProvider(ABC):
+    """
+    Interface for equity bar sources used by `BatchEquityLoader`.
+
+    Providers that support multi-symbol requests set ``batch_size > 1`` and
+    are queried with `fetch_batch`; with ``batch_size == 1`` the loader calls
+    `fetch_one` per ticker. Both return raw frames indexed by timestamp:
+    `fetch_batch` with ``(field, ticker)`` MultiIndex columns (the layout of
+    ``yfinance.download``), `fetch_one` with one column per field.
+    """
+
+    batch_size: int = 1
+
+    @abstractmethod
+    def fetch_batch(
+        self, tickers: List[str], period: str, interval: str
+    ) -> pd.DataFrame:
+        """Raw wide frame of ``tickers`` from one multi-symbol request."""
+
+    @abstractmethod
+    def fetch_one(self, ticker: str, period: str, interval: str) -> pd.DataFrame:
+        """Raw frame of a single ``ticker``."""
+
+
+class YFinanceProvider(EquityProvider):
+    """Yahoo Finance provider using one ``yf.download`` call per batch."""
+
+    def __init__(self, batch_size: int = 100):
+        self.batch_size = batch_size
+
+    def fetch_batch(
+        self, tickers: List[str], period: str, interval: str
+    ) -> pd.DataFrame:
+        import yfinance as yf
+
+        return yf.download(
+            tickers,
+            period=period,
+            interval=interval,
+            group_by="column",
+            auto_adjust=True,
+            threads=False,
+            progress=False,
+        )
+
+    def fetch_one(self, ticker: str, period: str, interval: str) -> pd.DataFrame:
+        import yfinance as yf
+
+        return yf.Ticker(ticker).history(period=period, interval=interval)
+
+
+def _empty_panel() -> pd.DataFrame:
+    return pd.DataFrame({col: [] for col in PANEL_COLUMNS})
+
+
+def normalise_wide(frame: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+    """
+    Convert a wide ``(field, ticker)`` frame into the long panel layout.
+
+    Column names are lower-cased once for the whole frame and every field is
+    reshaped with a single NumPy ravel, so the cost does not depend on the
+    number of tickers in the batch. Rows where a ticker has no OHLC data at a
+    timestamp (e.g. before listing) are dropped.
+    """
+    if frame is None or frame.empty:
+        return _empty_panel()
+
+    if isinstance(frame.columns, pd.MultiIndex):
+        # yfinance puts the field on level 0 for group_by="column" and on
+        # level 1 for group_by="ticker"; detect which one holds the fields.
+        level0 = {str(v).lower() for v in frame.columns.get_level_values(0)}
+        field_level = 0 if "close" in level0 else 1
+        ticker_level = 1 - field_level
+        frame = frame.copy()
+        frame.columns = pd.MultiIndex.from_arrays(
+            [
+                [str(v).lower() for v in frame.columns.get_level_values(field_level)],
+                frame.columns.get_level_values(ticker_level),
+            ]
+        )
+        present = [t for t in tickers if t in set(frame.columns.get_level_values(1))]
+    else:
+        # Single-ticker frame without the ticker level.
+        if len(tickers) != 1:
+            raise ValueError("A flat frame can only be normalised for one ticker.")
+        frame = frame.rename(columns=lambda c: str(c).lower())
+        frame.columns = pd.MultiIndex.from_product([frame.columns, tickers])
+        present = list(tickers)
+
+    if not present:
+        return _empty_panel()
+
+    n_rows, n_sym = len(frame), len(present)
+    timestamps = pd.to_datetime(frame.index, utc=True)
+    # Tile the int64 values: tiling the tz-aware index builds an object array.
+    stamps = np.tile(timestamps.asi8, n_sym).view(timestamps.tz_localize(None).dtype)
+    data = {
+        "timestamp": pd.DatetimeIndex(stamps).tz_localize("UTC").tz_convert(timestamps.tz),
+        "symbol": np.repeat(np.asarray(present, dtype=object), n_rows),
+    }
+    fields = set(frame.columns.get_level_values(0))
+    for field in _FIELDS:
+        if field in fields:
+            block = frame[field].reindex(columns=present).to_numpy(dtype=float)
+        else:
+            block = np.full((n_rows, n_sym), np.nan)
+        # Column-major ravel keeps each symbol's rows contiguous and in time order.
+        data[field] = block.ravel(order="F")
+
+    panel = pd.DataFrame(data, columns=PANEL_COLUMNS)
+    has_prices = panel[["open", "high", "low", "close"]].notna().any(axis=1)
+    return panel[has_prices.to_numpy()].reset_index(drop=True)
+
+
+class BatchEquityLoader:
+    """
+    Load OHLCV bars for many tickers into one long-format panel.
+
+    Tickers are grouped into multi-symbol requests of ``provider.batch_size``
+    tickers; providers without batch support are queried one ticker at a time.
+    Either way the requests are dispatched on a thread pool, so network
+    latency overlaps instead of adding up.
+
+    Args:
+        provider : EquityProvider, optional
+            Data source, defaults to `YFinanceProvider`.
+        max_workers : int, default 8
+            Number of concurrent requests.
+    """
+
+    def __init__(self, provider: Optional[EquityProvider] = None, max_workers: int = 8):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1.")
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.max_workers = max_workers
+
+    def load(
+        self, tickers: Iterable[str], period: str = "1mo", interval: str = "1d"
+    ) -> pd.DataFrame:
+        """
+        Fetch all tickers and return a panel sorted by symbol and timestamp.
+
+        Failed requests are logged and skipped, so the panel simply lacks the
+        affected tickers.
+        """
+        tickers = list(dict.fromkeys(tickers))  # de-duplicate, keep order
+        if not tickers:
+            return _empty_panel()
+
+        batch_size = max(1, int(getattr(self.provider, "batch_size", 1)))
+        if batch_size > 1:
+            groups = [
+                tickers[i : i + batch_size] for i in range(0, len(tickers), batch_size)
+            ]
+            fetch = self._fetch_group
+        else:
+            groups = [[t] for t in tickers]
+            fetch = self._fetch_single
+
+        workers = min(self.max_workers, len(groups))
+        if workers == 1:
+            frames = [fetch(g, period, interval) for g in groups]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                frames = list(pool.map(lambda g: fetch(g, period, interval), groups))
+
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            logger.warning(f"No stock data for {len(tickers)} tickers")
+            return _empty_panel()
+
+        panel = pd.concat(frames, ignore_index=True)
+        order = {t: i for i, t in enumerate(tickers)}
+        panel = panel.sort_values(
+            ["symbol", "timestamp"], key=lambda s: s.map(order) if s.name == "symbol" else s
+        ).reset_index(drop=True)
+        logger.info(
+            f"Fetched {len(panel)} stock data points for "
+            f"{panel['symbol'].nunique()}/{len(tickers)} tickers "
+            f"in {len(groups)} requests"
+        )
+        return panel
+
+    def _fetch_group(self, group: List[str], period: str, interval: str) -> pd.DataFrame:
+        try:
+            raw = self.provider.fetch_batch(group, period, interval)
+            return normalise_wide(raw, group)
+        except Exception as e:
+            logger.error(f"Stock data error for batch {group[0]}..{group[-1]}: {e}")
+            return _empty_panel()
+
+    def _fetch_single(
+        self, group: List[str], period: str, interval: str
+    ) -> pd.DataFrame:
+        try:
+            raw = self.provider.fetch_one(group[0], period, interval)
+            return normalise_wide(raw, group)
+        except Exception as e:
+            logger.error(f"Stock data error for {group[0]}: {e}")
+            return _empty_panel()
@@ -0,0 +1,447 @@
+"""
+Threaded real-time crypto stream for quantjourney_bidask examples.
+
+Runs the network I/O of a `StreamClient` (or a synthetic bar generator) on a
+private asyncio event loop in a background thread and hands completed bar
+updates to user callbacks running on a pool of worker threads.
+
+Bars are sharded by symbol over the workers. Each worker owns a bounded
+single-producer/single-consumer queue, so per-symbol ordering is preserved,
+the I/O thread never waits for a consumer, and a slow callback only delays
+the symbols of its own shard. When a shard queue is full, its oldest pending
+bar is dropped and counted.
+
+With ``conflate=True`` a shard instead keeps at most one pending update per
+symbol: while a symbol's update waits for the worker, newer bars replace it
+and are counted as conflated. Callbacks then see each symbol's latest state
+at most once per ``min_interval`` seconds, and the backlog (hence the
+end-to-end latency) is bounded by the number of symbols, however bursty the
+feed.
+
+Given a `quantjourney_bidask.metrics.MetricsRegistry`, the stream exports
+per-symbol received/dispatched counters, drop/conflation/error counters,
+the queue depth and the ``bar_build``, ``receive`` and ``callback`` stage
+latencies in Prometheus format.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .stream import StreamClient
+    from .synthetic import simulate_ohlc_arrays
+except ImportError:
+    from stream import StreamClient
+    from synthetic import simulate_ohlc_arrays
+
+logger = logging.getLogger(__name__)
+
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def interval_seconds(interval: str) -> int:
+    """Convert an exchange interval string such as ``"1m"`` to seconds."""
+    try:
+        return int(interval[:-1]) * _UNIT_SECONDS[interval[-1]]
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"Unsupported interval: {interval}") from e
+
+
+class _Shard:
+    """Bounded SPSC queue drained by one worker thread."""
+
+    def __init__(self, maxsize: int):
+        self.queue: deque = deque(maxlen=maxsize)
+        self.maxsize = maxsize
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self.conflated = 0
+        self.dispatched = 0
+        self.callback_errors = 0
+        self.latency_ns: deque = deque(maxlen=4096)
+        self.thread: Optional[threading.Thread] = None
+
+    def put(self, item):
+        with self.lock:
+            if len(self.queue) == self.maxsize:
+                self.dropped += 1  # deque(maxlen) evicts the oldest entry
+            self.queue.append(item)
+        self.wakeup.set()
+
+    def take(self, timeout: float) -> Optional[Dict]:
+        """Next bar to dispatch, or None after waiting up to ``timeout``."""
+        with self.lock:
+            if self.queue:
+                return self.queue.popleft()
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
+        return None
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+
+class _ConflatingShard(_Shard):
+    """Latest-value-per-symbol queue with a per-symbol minimum dispatch interval."""
+
+    def __init__(self, maxsize: int, min_interval: float = 0.0):
+        super().__init__(maxsize)
+        self.min_interval = min_interval
+        self.pending: Dict[str, Dict] = {}
+        self.ready: deque = deque()
+        self.deferred: List = []  # heap of (due, symbol)
+        self.last_sent: Dict[str, float] = {}
+
+    def put(self, item):
+        symbol = item["symbol"]
+        with self.lock:
+            if symbol in self.pending:
+                self.conflated += 1
+            else:
+                self.ready.append(symbol)
+            self.pending[symbol] = item
+        self.wakeup.set()
+
+    def take(self, timeout: float) -> Optional[Dict]:
+        now = time.monotonic()
+        with self.lock:
+            if self.deferred and self.deferred[0][0] <= now:
+                symbol = heapq.heappop(self.deferred)[1]
+            elif self.ready:
+                symbol = self.ready.popleft()
+                due = self.last_sent.get(symbol, -np.inf) + self.min_interval
+                if due > now:
+                    heapq.heappush(self.deferred, (due, symbol))
+                    return None
+            else:
+                symbol = None
+                if self.deferred:
+                    timeout = min(timeout, self.deferred[0][0] - now)
+            if symbol is not None:
+                self.last_sent[symbol] = now
+                return self.pending.pop(symbol)
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
+        return None
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+
+class RealtimeStream:
+    """
+    Background real-time bar stream with a callback worker pool.
+
+    Args:
+        symbols : sequence of str
+            Exchange symbols, e.g. ``["BTCUSDT", "ETHUSDT"]``.
+        interval : str, default "1m"
+            Bar interval.
+        exchange : str, default "binance"
+            Exchange key for the websocket client.
+        synthetic : bool, default False
+            Generate bars locally instead of connecting to the exchange.
+        url : str, optional
+            Websocket endpoint override (e.g. a local ``ReplayServer``).
+        queue_size : int, default 10000
+            Capacity of each worker's queue.
+        workers : int, default 2
+            Number of callback worker threads.
+        tick_seconds : float, default 1.0
+            Wall-clock seconds between synthetic bars.
+        connect_timeout : float, default 10.0
+            Seconds `start` waits for the first connection.
+        conflate : bool, default False
+            Keep only the latest pending update per symbol instead of a
+            FIFO of every update.
+        min_interval : float, default 0.0
+            With ``conflate``, minimum seconds between two callback
+            dispatches of the same symbol.
+        metrics : MetricsRegistry, optional
+            Registry receiving the stream counters and stage latencies.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        interval: str = "1m",
+        exchange: str = "binance",
+        synthetic: bool = False,
+        url: Optional[str] = None,
+        queue_size: int = 10000,
+        workers: int = 2,
+        tick_seconds: float = 1.0,
+        connect_timeout: float = 10.0,
+        conflate: bool = False,
+        min_interval: float = 0.0,
+        metrics=None,
+    ):
+        if workers < 1 or queue_size < 1:
+            raise ValueError("workers and queue_size must be >= 1.")
+        if min_interval < 0:
+            raise ValueError("min_interval must be non-negative.")
+        self.symbols = [s.upper() for s in symbols]
+        self.interval = interval
+        self.exchange = exchange
+        self.synthetic = synthetic
+        self.url = url
+        self.tick_seconds = tick_seconds
+        self.connect_timeout = connect_timeout
+
+        self.callbacks: List[Callable[[Dict], None]] = []
+        self.conflate = conflate
+        if conflate:
+            self.shards = [_ConflatingShard(queue_size, min_interval) for _ in range(workers)]
+        else:
+            self.shards = [_Shard(queue_size) for _ in range(workers)]
+        self._shard_of = {s: i % workers for i, s in enumerate(self.symbols)}
+        self.client: Optional[StreamClient] = None
+        self.received = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._io_thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+
+        self.metrics = metrics
+        if metrics is not None:
+            self._register_metrics(metrics)
+
+    # --- Public API ---
+    @property
+    def running(self) -> bool:
+        return self._running.is_set()
+
+    def add_callback(self, callback: Callable[[Dict], None]):
+        """Register ``callback(bar_dict)``; called from a worker thread."""
+        if not callable(callback):
+            raise TypeError("Callback must be a callable function.")
+        self.callbacks.append(callback)
+
+    def start(self):
+        """Start the I/O thread and workers; raises if the first connect fails."""
+        if self.running:
+            raise RuntimeError("Stream is already running.")
+        self._running.set()
+        self._started.clear()
+        self._start_error = None
+        for i, shard in enumerate(self.shards):
+            shard.thread = threading.Thread(
+                target=self._worker, args=(shard,), name=f"stream-worker-{i}", daemon=True
+            )
+            shard.thread.start()
+        self._io_thread = threading.Thread(target=self._run_loop, name="stream-io", daemon=True)
+        self._io_thread.start()
+
+        if not self._started.wait(self.connect_timeout + 1.0):
+            self._start_error = TimeoutError("Timed out waiting for stream to start.")
+        if self._start_error is not None:
+            self.stop()
+            raise ConnectionError(str(self._start_error)) from self._start_error
+        logger.info(
+            f"Real-time stream started for {len(self.symbols)} symbols "
+            f"({'synthetic' if self.synthetic else self.exchange}, {self.interval})"
+        )
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the I/O loop and the workers; pending bars are discarded."""
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        io_alive = self._io_thread is not None and self._io_thread.is_alive()
+        if io_alive and self.client is not None:
+            try:
+                self._loop.call_soon_threadsafe(self.client.stop)
+            except RuntimeError:  # loop finished in the meantime
+                pass
+        if self._io_thread is not None:
+            self._io_thread.join(timeout)
+        for shard in self.shards:
+            shard.wakeup.set()
+            if shard.thread is not None:
+                shard.thread.join(timeout)
+        logger.info("Real-time stream stopped.")
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for monitoring: received, dispatched, dropped, conflated,
+        queue depth and receive-to-dispatch latency of recent bars."""
+        latency = np.fromiter(
+            (x for s in self.shards for x in tuple(s.latency_ns)), dtype=np.float64
+        )
+        stats = {
+            "received": self.received,
+            "dispatched": sum(s.dispatched for s in self.shards),
+            "dropped": sum(s.dropped for s in self.shards),
+            "conflated": sum(s.conflated for s in self.shards),
+            "queue_depth": sum(len(s) for s in self.shards),
+            "max_queue_depth": max(len(s) for s in self.shards),
+            "callback_errors": sum(s.callback_errors for s in self.shards),
+            "latency_p50_ms": float(np.percentile(latency, 50)) / 1e6 if len(latency) else np.nan,
+            "latency_p99_ms": float(np.percentile(latency, 99)) / 1e6 if len(latency) else np.nan,
+            "latency_max_ms": float(latency.max()) / 1e6 if len(latency) else np.nan,
+        }
+        if self.client is not None:
+            stats["messages"] = self.client.messages
+            stats["reconnects"] = self.client.reconnects
+            stats["buffer_overwritten"] = self.client.buffer.overwritten
+        return stats
+
+    def _register_metrics(self, metrics):
+        from quantjourney_bidask.metrics import stage_latency
+
+        self._m_received = metrics.counter(
+            "bidask_stream_bars_received_total", "Bar updates received from the feed.", "symbol"
+        )
+        self._m_dispatched = metrics.counter(
+            "bidask_stream_bars_dispatched_total", "Bar updates handed to callbacks.", "symbol"
+        )
+        metrics.counter(
+            "bidask_stream_dropped_total", "Bar updates dropped by full queues.",
+            fn=lambda: sum(s.dropped for s in self.shards),
+        )
+        metrics.counter(
+            "bidask_stream_conflated_total", "Bar updates replaced by a newer one.",
+            fn=lambda: sum(s.conflated for s in self.shards),
+        )
+        metrics.counter(
+            "bidask_stream_callback_errors_total", "Exceptions raised by stream callbacks.",
+            fn=lambda: sum(s.callback_errors for s in self.shards),
+        )
+        metrics.gauge(
+            "bidask_stream_queue_depth", "Bar updates waiting for a worker.",
+            fn=lambda: sum(len(s) for s in self.shards),
+        )
+        self._m_latency = stage_latency(metrics)
+
+    # --- I/O thread ---
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._main())
+        except BaseException as e:  # noqa: BLE001 - reported to start()
+            self._start_error = e
+        finally:
+            self._started.set()
+            self._loop.close()
+
+    async def _main(self):
+        if self.synthetic:
+            self._started.set()
+            await self._synthetic()
+            return
+        self.client = StreamClient(
+            self.exchange,
+            interval=self.interval,
+            url=self.url,
+            on_update=self._on_update,
+            connect_timeout=self.connect_timeout,
+        )
+        self.client.subscribe(self.symbols)
+        await self.client.connect()
+        self._started.set()
+        await self.client.run()
+
+    def _on_update(self, seq: int):
+        row = self.client.buffer.row(seq)
+        symbol = self.client.symbol_names[row["symbol_id"]]
+        self._publish(symbol, row)
+
+    def _publish(self, symbol: str, row: Dict):
+        bid, ask = row["bid"], row["ask"]
+        has_quote = bid == bid and ask == ask and bid > 0 and ask > 0
+        bar = {
+            "symbol": symbol,
+            "timestamp": pd.Timestamp(row["open_time"], unit="ms", tz="UTC"),
+            "open": row["open"],
+            "high": row["high"],
+            "low": row["low"],
+            "close": row["close"],
+            "volume": row["volume"],
+            "is_closed": row["is_closed"],
+            "bid": bid if has_quote else None,
+            "ask": ask if has_quote else None,
+            "spread_bps": (ask - bid) / ((ask + bid) / 2) * 10000 if has_quote else None,
+            "recv_ns": row["recv_ns"],
+        }
+        self.shards[self._shard_of[symbol]].put(bar)
+        self.received += 1
+        if self.metrics is not None:
+            self._m_latency.observe_ns(time.perf_counter_ns() - row["recv_ns"], "bar_build")
+            self._m_received.inc(1, symbol)
+
+    async def _synthetic(self):
+        step_ms = interval_seconds(self.interval) * 1000
+        open_time = int(time.time() * 1000) // step_ms * step_ms
+        prices = np.full(len(self.symbols), 100.0)
+        block, i = None, 0
+        while self._running.is_set():
+            if block is None or i == block["close"].shape[1]:
+                block = simulate_ohlc_arrays(
+                    1000,
+                    spread=0.0002,
+                    volatility=0.0005,
+                    n_symbols=len(self.symbols),
+                    initial_price=prices,
+                )
+                prices = block["mid"][:, -1]
+                i = 0
+            recv_ns = time.perf_counter_ns()
+            for k, symbol in enumerate(self.symbols):
+                mid = block["mid"][k, i]
+                self._publish(
+                    symbol,
+                    {
+                        "open_time": open_time,
+                        "open": block["open"][k, i],
+                        "high": block["high"][k, i],
+                        "low": block["low"][k, i],
+                        "close": block["close"][k, i],
+                        "volume": block["volume"][k, i],
+                        "is_closed": True,
+                        "bid": mid * (1 - block["spread"][k] / 2),
+                        "ask": mid * (1 + block["spread"][k] / 2),
+                        "recv_ns": recv_ns,
+                    },
+                )
+            i += 1
+            open_time += step_ms
+            await asyncio.sleep(self.tick_seconds)
+
+    # --- Worker threads ---
+    def _worker(self, shard: _Shard):
+        while self._running.is_set():
+            bar = shard.take(0.1)
+            if bar is None:
+                continue
+            t0 = time.perf_counter_ns()
+            shard.latency_ns.append(t0 - bar["recv_ns"])
+            for callback in self.callbacks:
+                try:
+                    callback(bar)
+                except Exception as e:
+                    shard.callback_errors += 1
+                    logger.error(f"Error in stream callback: {e}")
+                if self.metrics is not None:
+                    t1 = time.perf_counter_ns()
+                    self._m_latency.observe_ns(t1 - t0, "callback")
+                    t0 = t1
+            shard.dispatched += 1
+            if self.metrics is not None:
+                self._m_latency.observe_ns(shard.latency_ns[-1], "receive")
+                self._m_dispatched.inc(1, bar["symbol"])
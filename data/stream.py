@@ -0,0 +1,809 @@
+"""
+Push-based websocket streaming for quantjourney_bidask examples and tests.
+
+Keeps one persistent websocket connection per exchange and multiplexes any
+number of symbol subscriptions over it. Kline and best bid/ask messages are
+parsed straight into a preallocated columnar ring buffer, and the connection
+is re-established (with all subscriptions replayed) whenever it drops.
+
+The websocket protocol (RFC 6455) is implemented on top of asyncio streams,
+so the client shares the event loop of the rest of the stream stack instead
+of running the blocking ``websocket-client`` in extra threads. Handshakes
+are validated on both sides and frames that break the framing rules (e.g.
+fragmented control frames) fail the connection with a protocol error.
+`ReplayServer` is a local stand-in for an exchange endpoint that replays
+recorded messages, used by the tests and benchmarks.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import ssl
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OP_CONT, _OP_TEXT, _OP_BINARY = 0x0, 0x1, 0x2
+_OP_CLOSE, _OP_PING, _OP_PONG = 0x8, 0x9, 0xA
+_OPCODES = {_OP_CONT, _OP_TEXT, _OP_BINARY, _OP_CLOSE, _OP_PING, _OP_PONG}
+_CLOSE_PROTOCOL_ERROR = 1002
+_CLOSE_TOO_BIG = 1009
+MAX_MESSAGE_SIZE = 1 << 20  # bytes; exchange messages are a few hundred
+
+
+class ConnectionClosed(Exception):
+    """Raised when the peer closes the websocket or the socket drops."""
+
+
+class ProtocolError(ConnectionClosed):
+    """Raised when the peer breaks the websocket framing rules."""
+
+
+class HandshakeError(ConnectionError):
+    """Raised when the opening handshake is rejected or malformed."""
+
+
+def _accept_key(key: str) -> str:
+    digest = hashlib.sha1((key + _WS_GUID).encode()).digest()  # noqa: S324
+    return base64.b64encode(digest).decode()
+
+
+def _apply_mask(payload: bytes, mask: bytes) -> bytes:
+    n = len(payload)
+    if n == 0:
+        return payload
+    key = (mask * (n // 4 + 1))[:n]
+    masked = int.from_bytes(payload, "little") ^ int.from_bytes(key, "little")
+    return masked.to_bytes(n, "little")
+
+
+class WebSocket:
+    """
+    Minimal websocket connection over an asyncio reader/writer pair.
+
+    Frames and fragmented messages larger than ``max_size`` bytes are
+    refused (close code 1009) before their payload is read.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        is_client: bool,
+        max_size: int = MAX_MESSAGE_SIZE,
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.is_client = is_client
+        self.max_size = max_size
+        self.closed = False
+
+    async def send(self, text: str):
+        """Send one text frame."""
+        await self._write_frame(_OP_TEXT, text.encode())
+
+    async def recv(self) -> str:
+        """Return the next text message, answering pings transparently."""
+        chunks: List[bytes] = []
+        while True:
+            fin, opcode, payload = await self._read_frame()
+            if opcode == _OP_CONT and not chunks:
+                await self._fail("continuation frame without a message to continue")
+            if opcode in (_OP_TEXT, _OP_BINARY) and chunks:
+                await self._fail("new message before the fragmented one finished")
+            if opcode < _OP_CLOSE and sum(map(len, chunks)) + len(payload) > self.max_size:
+                await self._fail("message exceeds max_size", _CLOSE_TOO_BIG)
+            if opcode == _OP_PING:
+                await self._write_frame(_OP_PONG, payload)
+                continue
+            if opcode == _OP_PONG:
+                continue
+            if opcode == _OP_CLOSE:
+                if not self.closed:
+                    self.closed = True
+                    try:
+                        await self._write_frame(_OP_CLOSE, payload[:2])
+                    except (ConnectionError, RuntimeError):
+                        pass
+                raise ConnectionClosed("closed by peer")
+            chunks.append(payload)
+            if fin:
+                return b"".join(chunks).decode()
+
+    async def close(self, code: int = 1000):
+        """Send a close frame and shut the transport down."""
+        if not self.closed:
+            self.closed = True
+            try:
+                await self._write_frame(_OP_CLOSE, struct.pack("!H", code))
+            except (ConnectionError, RuntimeError):
+                pass
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+    async def _fail(self, reason: str, code: int = _CLOSE_PROTOCOL_ERROR):
+        """Close with ``code`` (protocol error by default) and raise `ProtocolError`."""
+        if not self.closed:
+            self.closed = True
+            try:
+                await self._write_frame(_OP_CLOSE, struct.pack("!H", code))
+            except (ConnectionError, RuntimeError):
+                pass
+        self.writer.close()
+        raise ProtocolError(reason)
+
+    async def _read_frame(self):
+        try:
+            b0, b1 = await self.reader.readexactly(2)
+            fin, opcode, masked = bool(b0 & 0x80), b0 & 0x0F, bool(b1 & 0x80)
+            length = b1 & 0x7F
+            if length == 126:
+                (length,) = struct.unpack("!H", await self.reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", await self.reader.readexactly(8))
+            code = _CLOSE_PROTOCOL_ERROR
+            if b0 & 0x70:
+                reason = "reserved bits set without a negotiated extension"
+            elif opcode not in _OPCODES:
+                reason = f"unknown opcode {opcode:#x}"
+            elif opcode >= _OP_CLOSE and (not fin or length > 125):
+                reason = "fragmented or oversized control frame"
+            elif masked == self.is_client:
+                reason = "masked frame from server" if self.is_client else "unmasked frame from client"
+            elif length > self.max_size:
+                reason, code = f"{length}-byte frame exceeds max_size", _CLOSE_TOO_BIG
+            else:
+                reason = None
+            if reason is None:
+                mask = await self.reader.readexactly(4) if masked else None
+                payload = await self.reader.readexactly(length)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self.closed = True
+            raise ConnectionClosed(str(e)) from e
+        if reason is not None:
+            await self._fail(reason, code)
+        if mask is not None:
+            payload = _apply_mask(payload, mask)
+        return fin, opcode, payload
+
+    async def _write_frame(self, opcode: int, payload: bytes):
+        n = len(payload)
+        mask_bit = 0x80 if self.is_client else 0
+        header = bytes([0x80 | opcode])
+        if n < 126:
+            header += bytes([mask_bit | n])
+        elif n < 1 << 16:
+            header += bytes([mask_bit | 126]) + struct.pack("!H", n)
+        else:
+            header += bytes([mask_bit | 127]) + struct.pack("!Q", n)
+        if self.is_client:
+            mask = os.urandom(4)
+            header += mask
+            payload = _apply_mask(payload, mask)
+        self.writer.write(header + payload)
+        await self.writer.drain()
+
+
+async def connect(url: str, timeout: float = 10.0, max_size: int = MAX_MESSAGE_SIZE) -> WebSocket:
+    """Open a client websocket to ``ws://`` or ``wss://`` ``url``."""
+    parts = urlsplit(url)
+    secure = parts.scheme == "wss"
+    host = parts.hostname
+    port = parts.port or (443 if secure else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(
+            host,
+            port,
+            ssl=ssl.create_default_context() if secure else None,
+            server_hostname=host if secure else None,
+        ),
+        timeout,
+    )
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(
+        (
+            f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode()
+    )
+    await writer.drain()
+    try:
+        response = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+            asyncio.TimeoutError, ConnectionError) as e:
+        writer.close()
+        raise HandshakeError(f"Websocket handshake failed: no valid response ({e!r})") from e
+    status, headers = _parse_head(response)
+    parts = status.split(" ")
+    if len(parts) < 2 or parts[1] != "101":
+        writer.close()
+        raise HandshakeError(f"Websocket handshake failed: {status}")
+    if (headers.get("upgrade", "").lower() != "websocket"
+            or headers.get("sec-websocket-accept") != _accept_key(key)):
+        writer.close()
+        raise HandshakeError("Websocket handshake failed: invalid upgrade response")
+    return WebSocket(reader, writer, is_client=True, max_size=max_size)
+
+
+def _parse_head(head: bytes):
+    """Start line and lower-cased headers of an HTTP request or response."""
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {
+        k.strip().lower(): v.strip()
+        for k, _, v in (line.partition(":") for line in lines[1:] if line)
+    }
+    return lines[0], headers
+
+
+async def _accept(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Server side of the handshake; rejects bad requests with a 400 and `HandshakeError`."""
+    try:
+        request = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError) as e:
+        writer.close()
+        raise HandshakeError(f"Websocket handshake failed: incomplete request ({e!r})") from e
+    start, headers = _parse_head(request)
+    key = headers.get("sec-websocket-key")
+    if (not start.startswith("GET ")
+            or headers.get("upgrade", "").lower() != "websocket"
+            or headers.get("sec-websocket-version") != "13"
+            or not key):
+        writer.write(
+            b"HTTP/1.1 400 Bad Request\r\nSec-WebSocket-Version: 13\r\n"
+            b"Content-Length: 0\r\nConnection: close\r\n\r\n"
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+        raise HandshakeError(f"Websocket handshake failed: {start}")
+    writer.write(
+        (
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Accept: {_accept_key(key)}\r\n\r\n"
+        ).encode()
+    )
+    await writer.drain()
+    return WebSocket(reader, writer, is_client=False)
+
+
+class BarBuffer:
+    """
+    Preallocated columnar ring buffer of bar updates.
+
+    Each parsed kline update is written into fixed NumPy columns; `drain`
+    returns everything written since the previous drain. When the consumer
+    falls more than ``capacity`` rows behind, the oldest rows are overwritten
+    and counted in ``overwritten``.
+    """
+
+    COLUMNS = {
+        "symbol_id": np.int32,
+        "open_time": np.int64,
+        "event_time": np.int64,
+        "recv_ns": np.int64,
+        "open": np.float64,
+        "high": np.float64,
+        "low": np.float64,
+        "close": np.float64,
+        "volume": np.float64,
+        "bid": np.float64,
+        "ask": np.float64,
+        "is_closed": np.bool_,
+    }
+
+    def __init__(self, capacity: int = 65536):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1.")
+        self.capacity = capacity
+        self.columns = {
+            name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()
+        }
+        self.head = 0  # total rows written
+        self.tail = 0  # first row not yet drained
+        self.overwritten = 0
+
+    def __len__(self) -> int:
+        return self.head - self.tail
+
+    def append(
+        self,
+        symbol_id,
+        open_time,
+        event_time,
+        recv_ns,
+        open_,
+        high,
+        low,
+        close,
+        volume,
+        bid,
+        ask,
+        is_closed,
+    ) -> int:
+        """Write one row and return its sequence number."""
+        seq = self.head
+        i = seq % self.capacity
+        c = self.columns
+        c["symbol_id"][i] = symbol_id
+        c["open_time"][i] = open_time
+        c["event_time"][i] = event_time
+        c["recv_ns"][i] = recv_ns
+        c["open"][i] = open_
+        c["high"][i] = high
+        c["low"][i] = low
+        c["close"][i] = close
+        c["volume"][i] = volume
+        c["bid"][i] = bid
+        c["ask"][i] = ask
+        c["is_closed"][i] = is_closed
+        self.head = seq + 1
+        if self.head - self.tail > self.capacity:
+            self.overwritten += self.head - self.tail - self.capacity
+            self.tail = self.head - self.capacity
+        return seq
+
+    def row(self, seq: int) -> Dict:
+        """Return row ``seq`` as a dict (only valid until it is overwritten)."""
+        i = seq % self.capacity
+        return {name: col[i].item() for name, col in self.columns.items()}
+
+    def drain(self) -> Dict[str, np.ndarray]:
+        """Return copies of all undrained rows, oldest first."""
+        start, stop = self.tail, self.head
+        self.tail = stop
+        i0, i1 = start % self.capacity, stop % self.capacity
+        if stop - start == 0:
+            return {name: col[:0].copy() for name, col in self.columns.items()}
+        if i0 < i1:
+            return {name: col[i0:i1].copy() for name, col in self.columns.items()}
+        return {
+            name: np.concatenate((col[i0:], col[:i1]))
+            for name, col in self.columns.items()
+        }
+
+
+class BinanceAdapter:
+    """Binance combined-stream protocol: kline and bookTicker channels."""
+
+    url = "wss://stream.binance.com:9443/stream"
+
+    def streams(self, symbol: str, interval: str) -> List[str]:
+        s = symbol.lower()
+        return [f"{s}@kline_{interval}", f"{s}@bookTicker"]
+
+    def subscribe_message(self, streams: Sequence[str], request_id: int) -> str:
+        return json.dumps(
+            {"method": "SUBSCRIBE", "params": list(streams), "id": request_id}
+        )
+
+    def unsubscribe_message(self, streams: Sequence[str], request_id: int) -> str:
+        return json.dumps(
+            {"method": "UNSUBSCRIBE", "params": list(streams), "id": request_id}
+        )
+
+    def parse(self, text: str, client: "StreamClient"):
+        msg = json.loads(text)
+        data = msg.get("data")
+        if data is None:  # subscription acknowledgement
+            return
+        if data.get("e") == "kline":
+            k = data["k"]
+            client._on_kline(
+                data["s"],
+                k["t"],
+                data["E"],
+                float(k["o"]),
+                float(k["h"]),
+                float(k["l"]),
+                float(k["c"]),
+                float(k["v"]),
+                k["x"],
+            )
+        elif "b" in data and "a" in data:
+            client._on_quote(data["s"], float(data["b"]), float(data["a"]))
+
+
+EXCHANGES = {"binance": BinanceAdapter}
+
+
+class StreamClient:
+    """
+    Multi-symbol streaming client holding one connection per exchange.
+
+    Subscriptions are multiplexed over a single websocket; kline updates are
+    written to ``buffer`` (a `BarBuffer`) together with the latest bid/ask of
+    the symbol, and ``on_update(seq)`` is called with the sequence number of
+    every new row. After a disconnect the client reconnects with exponential
+    backoff and resubscribes to every stream. `subscribe` may be called
+    from any thread while `run` is active on its event loop.
+
+    Args:
+        exchange : str, default "binance"
+            Key into `EXCHANGES`.
+        interval : str, default "1m"
+            Kline interval.
+        url : str, optional
+            Override the exchange endpoint (e.g. a local `ReplayServer`).
+        capacity : int, default 65536
+            Rows in the ring buffer.
+        on_update : callable, optional
+            Called with the sequence number of each new buffer row.
+        record_path : str, optional
+            Append every raw message to this JSONL file for later replay.
+    """
+
+    def __init__(
+        self,
+        exchange: str = "binance",
+        interval: str = "1m",
+        url: Optional[str] = None,
+        capacity: int = 65536,
+        on_update: Optional[Callable[[int], None]] = None,
+        connect_timeout: float = 10.0,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        record_path: Optional[str] = None,
+    ):
+        key = exchange.lower()
+        if key not in EXCHANGES:
+            raise ValueError(f"Unsupported exchange: {exchange}")
+        self.adapter = EXCHANGES[key]()
+        self.exchange = key
+        self.interval = interval
+        self.url = url or self.adapter.url
+        self.buffer = BarBuffer(capacity)
+        self.on_update = on_update
+        self.connect_timeout = connect_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.record_path = record_path
+
+        self.symbols: Dict[str, int] = {}
+        self.symbol_names: List[str] = []
+        self._bid = np.full(0, np.nan)
+        self._ask = np.full(0, np.nan)
+        self._ws: Optional[WebSocket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._request_id = 0
+        self._record = None
+
+        self.messages = 0
+        self.parse_errors = 0
+        self.reconnects = 0
+
+    # --- Subscriptions ---
+    def subscribe(self, symbols: Iterable[str]):
+        """Add symbols; sent immediately when connected, else on connect."""
+        with self._lock:
+            new = [s for s in dict.fromkeys(s.upper() for s in symbols) if s not in self.symbols]
+            if not new:
+                return
+            # Grow the quote arrays before publishing the ids the receive path looks up.
+            self._bid = np.append(self._bid, np.full(len(new), np.nan))
+            self._ask = np.append(self._ask, np.full(len(new), np.nan))
+            for s in new:
+                self.symbol_names.append(s)
+                self.symbols[s] = len(self.symbol_names) - 1
+        loop = self._loop
+        if loop is not None and self._ws is not None and not self._ws.closed:
+            asyncio.run_coroutine_threadsafe(self._send_subscribe(new), loop)
+
+    def _streams(self, symbols: Iterable[str]) -> List[str]:
+        return [st for s in symbols for st in self.adapter.streams(s, self.interval)]
+
+    async def _send_subscribe(self, symbols: Iterable[str]):
+        streams = self._streams(symbols)
+        if streams:
+            self._request_id += 1
+            await self._ws.send(self.adapter.subscribe_message(streams, self._request_id))
+
+    # --- Connection management ---
+    async def connect(self):
+        """Connect and (re)subscribe to every registered symbol."""
+        self._ws = await connect(self.url, timeout=self.connect_timeout)
+        await self._send_subscribe(list(self.symbol_names))
+        logger.info(
+            f"Streaming {len(self.symbol_names)} symbols from {self.exchange} "
+            f"over {self.url}"
+        )
+
+    async def run(self, duration: Optional[float] = None):
+        """Receive messages until `stop` is called or ``duration`` elapses."""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        deadline = None if duration is None else loop.time() + duration
+        delay = self.reconnect_delay
+        self._stopping = False
+        if self.record_path:
+            self._record = open(self.record_path, "a")  # noqa: SIM115
+        try:
+            while not self._stopping:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                try:
+                    if self._ws is None or self._ws.closed:
+                        await asyncio.wait_for(self.connect(), remaining)
+                        delay = self.reconnect_delay
+                    await self._receive(deadline)
+                except asyncio.TimeoutError:
+                    break
+                except (ConnectionClosed, ConnectionError, OSError) as e:
+                    if self._stopping:
+                        break
+                    self.reconnects += 1
+                    if self._ws is not None:
+                        self._ws.writer.close()
+                        self._ws = None
+                    logger.warning(f"Stream disconnected ({e}), reconnecting in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            self._loop = None
+            await self.close()
+            if self._record is not None:
+                self._record.close()
+                self._record = None
+
+    async def _receive(self, deadline: Optional[float]):
+        loop = asyncio.get_running_loop()
+        ws = self._ws
+        while not self._stopping:
+            if deadline is None:
+                text = await ws.recv()
+            else:
+                text = await asyncio.wait_for(ws.recv(), deadline - loop.time())
+            self.messages += 1
+            if self._record is not None:
+                self._record.write(text + "\n")
+            try:
+                self.adapter.parse(text, self)
+            except (KeyError, ValueError, TypeError) as e:
+                self.parse_errors += 1
+                logger.debug(f"Unparseable message: {e}")
+
+    def stop(self):
+        """Ask `run` to return after the current message."""
+        self._stopping = True
+        if self._ws is not None:
+            asyncio.ensure_future(self._ws.close())
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    # --- Parser callbacks ---
+    def _on_kline(
+        self, symbol, open_time, event_time, o, h, lo, c, v, is_closed
+    ):
+        sid = self.symbols.get(symbol.upper())
+        if sid is None:
+            return
+        seq = self.buffer.append(
+            sid,
+            open_time,
+            event_time,
+            time.perf_counter_ns(),
+            o,
+            h,
+            lo,
+            c,
+            v,
+            self._bid[sid],
+            self._ask[sid],
+            is_closed,
+        )
+        if self.on_update is not None:
+            self.on_update(seq)
+
+    def _on_quote(self, symbol, bid, ask):
+        sid = self.symbols.get(symbol.upper())
+        if sid is not None:
+            with self._lock:  # not lost to a concurrent `subscribe` copying the arrays
+                self._bid[sid] = bid
+                self._ask[sid] = ask
+
+    def to_frame(self, rows: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Convert drained buffer rows into a DataFrame with symbol names."""
+        names = np.asarray(self.symbol_names, dtype=object)
+        df = pd.DataFrame(
+            {k: v for k, v in rows.items() if k not in ("symbol_id", "open_time")}
+        )
+        df.insert(0, "symbol", names[rows["symbol_id"]] if len(names) else [])
+        df.insert(0, "timestamp", pd.to_datetime(rows["open_time"], unit="ms", utc=True))
+        return df
+
+
+# --- Local stand-in exchange ---------------------------------------------------
+def load_messages(path: str) -> List[str]:
+    """Load raw messages recorded with ``StreamClient(record_path=...)``."""
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def kline_messages(df: pd.DataFrame, interval: str = "1m") -> List[str]:
+    """
+    Build Binance combined-stream kline messages from an OHLC panel.
+
+    ``df`` needs ``timestamp``, ``symbol``, ``open``, ``high``, ``low``,
+    ``close`` and ``volume`` columns (e.g. the output of
+    ``data.synthetic.simulate_ohlc``); messages are ordered by timestamp.
+    """
+    df = df.sort_values("timestamp", kind="stable")
+    # Timedelta division is independent of the datetime resolution (ns/us/s).
+    epoch = pd.Timestamp(0, tz="UTC")
+    open_ms = (pd.to_datetime(df["timestamp"], utc=True) - epoch) // pd.Timedelta(1, "ms")
+    messages = []
+    for t, sym, o, h, lo, c, v in zip(
+        open_ms.to_numpy(),
+        df["symbol"].to_numpy(),
+        df["open"].to_numpy(),
+        df["high"].to_numpy(),
+        df["low"].to_numpy(),
+        df["close"].to_numpy(),
+        df["volume"].to_numpy(),
+    ):
+        messages.append(
+            json.dumps(
+                {
+                    "stream": f"{sym.lower()}@kline_{interval}",
+                    "data": {
+                        "e": "kline",
+                        "E": int(t),
+                        "s": sym,
+                        "k": {
+                            "t": int(t),
+                            "s": sym,
+                            "i": interval,
+                            "o": repr(float(o)),
+                            "h": repr(float(h)),
+                            "l": repr(float(lo)),
+                            "c": repr(float(c)),
+                            "v": repr(float(v)),
+                            "x": True,
+                        },
+                    },
+                }
+            )
+        )
+    return messages
+
+
+class ReplayServer:
+    """
+    Local websocket server replaying recorded exchange messages.
+
+    Speaks the Binance combined-stream subscription protocol: a client sends
+    ``SUBSCRIBE`` requests and receives the recorded messages of the streams
+    it subscribed to. The replay position is shared across connections, so a
+    client that reconnects continues where it left off.
+
+    Args:
+        messages : sequence of str
+            Raw messages in combined-stream format (``{"stream", "data"}``).
+        interval : float, default 0.0
+            Seconds to sleep between messages (0 replays as fast as possible).
+        drop_after : int, optional
+            Abort each connection after this many messages, to exercise
+            client reconnection.
+    """
+
+    def __init__(
+        self,
+        messages: Sequence[str],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        interval: float = 0.0,
+        drop_after: Optional[int] = None,
+    ):
+        self.messages = [(json.loads(m).get("stream"), m) for m in messages]
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.drop_after = drop_after
+        self.connections = 0
+        self.rejected = 0
+        self.subscriptions: List[List[str]] = []
+        self.sent = 0
+        self._cursor = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/stream"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            ws = await _accept(reader, writer)
+        except HandshakeError as e:
+            self.rejected += 1
+            logger.warning(f"Rejected connection: {e}")
+            return
+        self.connections += 1
+        subscribed = set()
+        ready = asyncio.Event()
+
+        async def control():
+            while True:
+                request = json.loads(await ws.recv())
+                params = request.get("params", [])
+                if request.get("method") == "SUBSCRIBE":
+                    subscribed.update(params)
+                    self.subscriptions.append(list(params))
+                elif request.get("method") == "UNSUBSCRIBE":
+                    subscribed.difference_update(params)
+                await ws.send(json.dumps({"result": None, "id": request.get("id")}))
+                ready.set()
+
+        control_task = asyncio.ensure_future(control())
+        try:
+            await ready.wait()
+            sent_here = 0
+            while self._cursor < len(self.messages):
+                stream, text = self.messages[self._cursor]
+                self._cursor += 1
+                if stream is not None and stream not in subscribed:
+                    continue
+                if self.drop_after is not None and sent_here >= self.drop_after:
+                    self._cursor -= 1
+                    writer.transport.abort()
+                    return
+                await ws.send(text)
+                sent_here += 1
+                self.sent += 1
+                if self.interval:
+                    await asyncio.sleep(self.interval)
+                else:
+                    await asyncio.sleep(0)
+            # Keep the connection open, like an idle exchange stream.
+            await control_task
+        except (ConnectionClosed, ConnectionError):
+            pass
+        finally:
+            control_task.cancel()
+            writer.close()
@@ -413,9 +413,12 @@ def setup_live_comparison():
 
     return monitor
 
-# Usage:
+# Usage: feed closed bars from the real-time stream into the monitor
+# from data.fetch import DataFetcher
 # monitor = setup_live_comparison()
-# monitor.start()
+# fetcher = DataFetcher()
+# fetcher.start_realtime_crypto_stream(symbols=monitor.symbols, interval="1m")
+# fetcher.add_stream_callback(monitor.on_bar)
     '''
 
     print(example_code)
@@ -18,16 +18,16 @@ import matplotlib.pyplot as plt
 
 # Add parent directory to path for both installed and development mode
 try:
-    from quantjourney_bidask import edge_rolling
+    from quantjourney_bidask import edge_zscore
 except ImportError:
     # Development mode - add parent directory to path
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from quantjourney_bidask import edge_rolling
+    from quantjourney_bidask import edge_zscore
 
 from data.fetch import get_crypto_data
 
 
-def liquidity_risk_monitor(df, window=24, spread_zscore_threshold=2):
+def liquidity_risk_monitor(df, window=24, spread_zscore_threshold=2, zscore_window=None):
     """Monitor liquidity risk by flagging periods with high bid-ask spread z-scores.
 
     Parameters
@@ -38,6 +38,9 @@ def liquidity_risk_monitor(df, window=24, spread_zscore_threshold=2):
         Rolling window size for spread estimation (in periods).
     spread_zscore_threshold : float
         Z-score threshold for flagging high liquidity risk.
+    zscore_window : int, optional
+        Trailing spread estimates used for the z-score; all past estimates
+        if None. Only past data is used, so the flags are free of look-ahead.
 
     Returns
     -------
@@ -46,9 +49,13 @@ def liquidity_risk_monitor(df, window=24, spread_zscore_threshold=2):
 
     """
     df = df.copy()
-    df["spread"] = edge_rolling(df, window=window)
-    df["spread_zscore"] = (df["spread"] - df["spread"].mean()) / df["spread"].std()
-    df["risk_flag"] = df["spread_zscore"] > spread_zscore_threshold
+    risk = edge_zscore(
+        df,
+        window=window,
+        zscore_window=zscore_window,
+        threshold=spread_zscore_threshold,
+    )
+    df[["spread", "spread_zscore", "risk_flag"]] = risk
     return df
 
 
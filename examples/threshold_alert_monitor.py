@@ -22,7 +22,7 @@ import pandas as pd
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data.fetch import get_stock_data
-from quantjourney_bidask import edge_rolling
+from quantjourney_bidask import edge_rolling, spread_thresholds
 
 
 def spread_monitor(df, window=24, low_percentile=25, high_percentile=75):
@@ -49,17 +49,16 @@ def spread_monitor(df, window=24, low_percentile=25, high_percentile=75):
     df = df.copy()
     df["spread"] = edge_rolling(df, window=window)
 
-    # Compute rolling percentiles for thresholds
-    df["low_threshold"] = (
-        df["spread"]
-        .rolling(window=window * 2, min_periods=window)
-        .quantile(low_percentile / 100)
-    )
-    df["high_threshold"] = (
-        df["spread"]
-        .rolling(window=window * 2, min_periods=window)
-        .quantile(high_percentile / 100)
+    # Compute rolling percentiles for thresholds (one streaming pass)
+    thresholds = spread_thresholds(
+        df["spread"],
+        window=window * 2,
+        low_percentile=low_percentile,
+        high_percentile=high_percentile,
+        min_periods=window,
     )
+    df["low_threshold"] = thresholds["low_threshold"]
+    df["high_threshold"] = thresholds["high_threshold"]
 
     # Assign status
     df["spread_status"] = "normal"
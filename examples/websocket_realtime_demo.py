@@ -2,13 +2,9 @@
 """
 Real-Time Spread Monitor with WebSocket Data and Synthetic Simulation.
 
-NOTE: This example was designed for an advanced DataFetcher interface.
-For working websocket examples, see:
-- animated_spread_monitor.py (has working websocket demo)
-- simple_data_example.py (basic websocket usage)
-
-This file demonstrates the architecture for production real-time monitoring
-but requires additional methods in the DataFetcher class.
+Uses the DataFetcher real-time stream API (start_realtime_crypto_stream,
+add_stream_callback, stop_realtime_crypto_stream): network I/O runs on a
+background asyncio thread and callbacks on a worker pool, see data/realtime.py.
 
 Author: Jakub Polec
 Date: 2025-06-28
@@ -204,6 +200,8 @@ class RealTimeSpreadMonitor:
                     exchange="binance",
                     is_synthetic_stream=False,
                     use_ccxt=True,
+                    conflate=True,
+                    min_interval=0.5,
                 )
                 logger.info(
                     "CCXT mode enabled for 1-second real-time data with order book spreads."
@@ -376,9 +374,8 @@ class AnimatedSpreadVisualizer:
             f"Updated data for {symbol}: timestamp={spread_data['timestamp']}, price={spread_data['price']:.4f}, spread={spread_data['spread_bps']:.2f}bps"
         )
 
-        # Request a redraw of the canvas - more responsive for real-time data
-        if hasattr(self, "fig") and self.fig.canvas:
-            self.fig.canvas.draw_idle()
+        # No redraw here: the FuncAnimation repaints on its own timer, so
+        # bursts of updates are conflated into one frame.
 
         logger.debug(
             f"Data updated for {symbol}. Points: {len(history['timestamps'])}, "
@@ -11,9 +11,23 @@ Part of the QuantJourney framework - The framework with advanced quantitative
 finance tools and insights.
 """
 
-from .edge import edge
+from ._moments import NAN_REASONS
+from .alerts import AlertEngine
+from .bars import BarBuilder, trades_to_bars
+from .cache import EstimateCache
+from .edge import edge, edge_components
+from .edge_ewm import EdgeEWM, edge_ewm
 from .edge_expanding import edge_expanding
-from .edge_rolling import edge_rolling
+from .edge_index import EdgeIndex
+from .edge_many import edge_many
+from .edge_rolling import EdgeRollingState, edge_rolling, edge_rolling_update
+from .edge_stream import EdgeStream
+from .edge_table import EdgeRollingTable
+from .edge_zscore import EdgeZScore, edge_zscore
+from .metrics import MetricsRegistry, MetricsServer
+from .monitor import LiveSpreadMonitor
+from .quantiles import RollingQuantile, rolling_quantile, spread_thresholds
+from .shared_panel import SharedPanel
 
 # Import version from package metadata
 try:
@@ -31,4 +45,31 @@ except ImportError:
     __email__ = "jakub@quantjourney.pro"
     __license__ = "MIT"
 
-__all__ = ["edge", "edge_rolling", "edge_expanding"]
+__all__ = [
+    "edge",
+    "edge_components",
+    "edge_many",
+    "NAN_REASONS",
+    "edge_rolling",
+    "edge_rolling_update",
+    "EdgeRollingState",
+    "edge_expanding",
+    "edge_ewm",
+    "EdgeEWM",
+    "EdgeIndex",
+    "EdgeRollingTable",
+    "EdgeStream",
+    "EstimateCache",
+    "EdgeZScore",
+    "edge_zscore",
+    "LiveSpreadMonitor",
+    "MetricsRegistry",
+    "MetricsServer",
+    "RollingQuantile",
+    "rolling_quantile",
+    "spread_thresholds",
+    "SharedPanel",
+    "AlertEngine",
+    "BarBuilder",
+    "trades_to_bars",
+]
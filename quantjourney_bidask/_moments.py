@@ -0,0 +1,418 @@
+"""
+Mergeable moment sums for the EDGE estimator.
+
+Every quantity the EDGE estimator averages over a sample (the tau/po/pc
+probabilities, the means of r1/r3/r5, and the first and second moments of
+the GMM conditions x1 and x2) can be rebuilt from a fixed set of additive
+sums over the bar-to-bar transitions of the sample. This module computes the
+contribution of one transition to those sums and turns a vector of sums back
+into a spread, which lets windowed, streaming and indexed estimators add and
+remove bars in constant time instead of re-running `edge` on every window.
+
+Layout of a moment vector (``N_MOMENTS`` entries, NaN observations simply
+do not contribute and are tracked by the ``n_*`` counts)::
+
+    0  n_tau   1  s_tau
+    2  n_po1   3  s_po1   4  n_po2   5  s_po2
+    6  n_pc1   7  s_pc1   8  n_pc2   9  s_pc2
+    10 n_r1    11 s_r1    12 n_r3    13 s_r3    14 n_r5    15 s_r5
+    16 n_x                                  (observations valid for x1, x2)
+    17..30 x1 block, 31..44 x2 block
+
+Each x block holds the sums of p, q, P, Q, pp, pq, qq, PP, PQ, QQ, pP, pQ,
+qP, qQ for ``x = A*(p - a*q) + B*(P - b*Q)`` with ``A = -4/po``,
+``B = -4/pc`` and ``a``, ``b`` the tau-scaled means of the de-meaned
+returns: x1 uses (r1*r2, tau*r2, r3*r4, tau*r4), x2 uses (r1*r5, tau*r5,
+r5*r4, tau*r4).
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+from numba import jit
+
+N_MOMENTS = 45
+_X1 = 17
+_X2 = 31
+
+# Estimator components written by `_components_from_moments`, in order.
+COMPONENTS = ("s2", "pt", "po", "pc", "e1", "e2", "v1", "v2", "n_obs", "reason")
+N_COMPONENTS = len(COMPONENTS)
+_REASON = N_COMPONENTS - 1
+# Why an estimate is NaN, indexed by the ``reason`` component (0 = valid).
+NAN_REASONS = (
+    "ok",
+    "insufficient_bars",
+    "tau_sum_below_2",
+    "po_zero",
+    "pc_zero",
+    "pt_below_min",
+    "no_valid_returns",
+    "s2_nan",
+    "not_evaluated",
+)
+REASON_INSUFFICIENT_BARS = 1
+REASON_NOT_EVALUATED = 8
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _log_price(x):
+    """Log-price, NaN for non-positive or non-finite prices."""
+    if x > 0.0 and x < np.inf:
+        return np.log(x)
+    return np.nan
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _add_pair(out, i, a, b):
+    """Add a 0/1 indicator ``a * b`` (NaN-aware) to count/sum slots i, i+1."""
+    if a == a and b == b:
+        out[i] += 1.0
+        out[i + 1] += a * b
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _add_block(out, i, p, q, pp_, qq_):
+    """Add one observation of (p, q, P, Q) to the x block starting at i."""
+    out[i] += p
+    out[i + 1] += q
+    out[i + 2] += pp_
+    out[i + 3] += qq_
+    out[i + 4] += p * p
+    out[i + 5] += p * q
+    out[i + 6] += q * q
+    out[i + 7] += pp_ * pp_
+    out[i + 8] += pp_ * qq_
+    out[i + 9] += qq_ * qq_
+    out[i + 10] += p * pp_
+    out[i + 11] += p * qq_
+    out[i + 12] += q * pp_
+    out[i + 13] += q * qq_
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _transition_moments(o0, h0, l0, c0, o1, h1, l1, c1, out):
+    """
+    Write the moment contribution of the transition between two bars.
+
+    Takes the log open/high/low/close of bar t-1 and bar t and overwrites
+    ``out`` (length ``N_MOMENTS``) with the contribution of that transition,
+    mirroring the NaN handling of `edge`.
+    """
+    for k in range(N_MOMENTS):
+        out[k] = 0.0
+
+    m0 = (h0 + l0) / 2.0
+    m1 = (h1 + l1) / 2.0
+    r1 = m1 - o1
+    r2 = o1 - m0
+    r3 = m1 - c0
+    r4 = c0 - m0
+    r5 = o1 - c0
+
+    if h1 == h1 and l1 == l1 and c0 == c0:
+        tau = 1.0 if (h1 != l1 or l1 != c0) else 0.0
+    else:
+        tau = np.nan
+
+    if tau == tau:
+        out[0] = 1.0
+        out[1] = tau
+        if o1 == o1 and h1 == h1:
+            _add_pair(out, 2, tau, 1.0 if o1 != h1 else 0.0)
+        if o1 == o1 and l1 == l1:
+            _add_pair(out, 4, tau, 1.0 if o1 != l1 else 0.0)
+        if c0 == c0 and h0 == h0:
+            _add_pair(out, 6, tau, 1.0 if c0 != h0 else 0.0)
+        if c0 == c0 and l0 == l0:
+            _add_pair(out, 8, tau, 1.0 if c0 != l0 else 0.0)
+
+    if r1 == r1:
+        out[10] = 1.0
+        out[11] = r1
+    if r3 == r3:
+        out[12] = 1.0
+        out[13] = r3
+    if r5 == r5:
+        out[14] = 1.0
+        out[15] = r5
+
+    if tau == tau and r1 == r1 and r2 == r2 and r3 == r3 and r4 == r4 and r5 == r5:
+        out[16] = 1.0
+        _add_block(out, _X1, r1 * r2, tau * r2, r3 * r4, tau * r4)
+        _add_block(out, _X2, r1 * r5, tau * r5, r5 * r4, tau * r4)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _moments_from_prices(open_p, high, low, close):
+    """Per-transition moment contributions of an OHLC series, shape (n-1, K)."""
+    n = open_p.shape[0]
+    out = np.zeros((max(n - 1, 0), N_MOMENTS))
+    if n < 2:
+        return out
+    o0 = _log_price(open_p[0])
+    h0 = _log_price(high[0])
+    l0 = _log_price(low[0])
+    c0 = _log_price(close[0])
+    for t in range(1, n):
+        o1 = _log_price(open_p[t])
+        h1 = _log_price(high[t])
+        l1 = _log_price(low[t])
+        c1 = _log_price(close[t])
+        _transition_moments(o0, h0, l0, c0, o1, h1, l1, c1, out[t - 1])
+        o0, h0, l0, c0 = o1, h1, l1, c1
+    return out
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _mean(s, n):
+    return s / n if n > 0.0 else np.nan
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _block_moments(m, i, a, b, A, B, n):
+    """First and second moment of ``A*(p - a*q) + B*(P - b*Q)`` from sums."""
+    sp, sq, sP, sQ = m[i], m[i + 1], m[i + 2], m[i + 3]
+    spp, spq, sqq = m[i + 4], m[i + 5], m[i + 6]
+    sPP, sPQ, sQQ = m[i + 7], m[i + 8], m[i + 9]
+    spP, spQ, sqP, sqQ = m[i + 10], m[i + 11], m[i + 12], m[i + 13]
+    e = (A * (sp - a * sq) + B * (sP - b * sQ)) / n
+    e2 = (
+        A * A * (spp - 2.0 * a * spq + a * a * sqq)
+        + B * B * (sPP - 2.0 * b * sPQ + b * b * sQQ)
+        + 2.0 * A * B * (spP - b * spQ - a * sqP + a * b * sqQ)
+    ) / n
+    return e, e2 - e * e
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _spread_from_moments(m, min_pt, tau_sum=-1.0):
+    """
+    Squared spread estimate ``s2`` from a moment vector, NaN if invalid.
+
+    Applies the same data-quality checks as `edge` (at least two valid tau,
+    non-zero po and pc, pt >= min_pt). ``tau_sum`` is the undecayed number
+    of tau = 1 observations for the first check; by default ``m[1]``, which
+    only counts them when the sums are not decayed.
+    """
+    if tau_sum < 0.0:
+        tau_sum = m[1]
+    pt = _mean(m[1], m[0])
+    po = _mean(m[3], m[2]) + _mean(m[5], m[4])
+    pc = _mean(m[7], m[6]) + _mean(m[9], m[8])
+    if tau_sum < 2.0 or po == 0.0 or pc == 0.0 or pt < min_pt:
+        return np.nan
+    n = m[16]
+    if n <= 0.0:
+        return np.nan
+    a1 = _mean(m[11], m[10]) / pt
+    a3 = _mean(m[13], m[12]) / pt
+    a5 = _mean(m[15], m[14]) / pt
+    A = -4.0 / po
+    B = -4.0 / pc
+    e1, v1 = _block_moments(m, _X1, a1, a3, A, B, n)
+    e2, v2 = _block_moments(m, _X2, a1, a5, A, B, n)
+    vt = v1 + v2
+    if vt > 0.0:
+        return (v2 * e1 + v1 * e2) / vt
+    return (e1 + e2) / 2.0
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _components_from_moments(m, min_pt, out):
+    """
+    `_spread_from_moments` that also writes every intermediate to ``out``.
+
+    ``out`` (``N_COMPONENTS``) receives s2, the probabilities pt/po/pc, the
+    means e1/e2 and variances v1/v2 of the moment conditions, the number of
+    observations entering them and a `NAN_REASONS` code; quantities that
+    are never reached stay NaN. Returns s2.
+    """
+    for k in range(N_COMPONENTS):
+        out[k] = np.nan
+    pt = _mean(m[1], m[0])
+    po = _mean(m[3], m[2]) + _mean(m[5], m[4])
+    pc = _mean(m[7], m[6]) + _mean(m[9], m[8])
+    n = m[16]
+    out[1] = pt
+    out[2] = po
+    out[3] = pc
+    out[8] = n
+    if m[1] < 2.0:
+        out[_REASON] = 2
+    elif po == 0.0:
+        out[_REASON] = 3
+    elif pc == 0.0:
+        out[_REASON] = 4
+    elif pt < min_pt:
+        out[_REASON] = 5
+    elif n <= 0.0:
+        out[_REASON] = 6
+    else:
+        a1 = _mean(m[11], m[10]) / pt
+        a3 = _mean(m[13], m[12]) / pt
+        a5 = _mean(m[15], m[14]) / pt
+        A = -4.0 / po
+        B = -4.0 / pc
+        e1, v1 = _block_moments(m, _X1, a1, a3, A, B, n)
+        e2, v2 = _block_moments(m, _X2, a1, a5, A, B, n)
+        vt = v1 + v2
+        if vt > 0.0:
+            s2 = (v2 * e1 + v1 * e2) / vt
+        else:
+            s2 = (e1 + e2) / 2.0
+        out[0] = s2
+        out[4] = e1
+        out[5] = e2
+        out[6] = v1
+        out[7] = v2
+        out[_REASON] = 0 if s2 == s2 else 7
+    return out[0]
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _finalize(s2, sign):
+    """Spread from ``s2``: square root of the magnitude, optionally signed."""
+    if s2 != s2:
+        return np.nan
+    s = np.sqrt(np.abs(s2))
+    if sign and s2 < 0.0:
+        return -s
+    return s
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _push_bar(s, o, h, l, c, last, ring, sums, counts, scratch, min_pt, sign, min_periods):
+    """
+    Add one bar to the window state of series ``s`` and return its estimate.
+
+    State is laid out as arrays with a leading series axis so one set of
+    buffers can serve many symbols:
+
+    - ``last`` (S, 4): log open/high/low/close of the previous bar
+    - ``ring`` (S, W, 4): log OHLC of the last W bars, W = window, or 0 for
+      an expanding (never forgetting) window
+    - ``sums`` (S, K): running moment sums over the window
+    - ``counts`` (S, 2): bars seen, ring cursor (slot of the oldest bar)
+    - ``scratch`` (K,): work buffer
+
+    The transition leaving the window is recomputed from the two oldest bars
+    in the ring. When the ring wraps, the running sums are rebuilt from the
+    ring so that add/subtract rounding does not accumulate over long streams.
+    """
+    lo = _log_price(o)
+    lh = _log_price(h)
+    ll = _log_price(l)
+    lc = _log_price(c)
+    nb = counts[s, 0]
+    W = ring.shape[1]
+    if nb > 0:
+        _transition_moments(
+            last[s, 0], last[s, 1], last[s, 2], last[s, 3], lo, lh, ll, lc, scratch
+        )
+        for k in range(N_MOMENTS):
+            sums[s, k] += scratch[k]
+    if W > 0:
+        pos = counts[s, 1]
+        full = nb >= W
+        if full:
+            nxt = pos + 1 if pos + 1 < W else 0
+            _transition_moments(
+                ring[s, pos, 0], ring[s, pos, 1], ring[s, pos, 2], ring[s, pos, 3],
+                ring[s, nxt, 0], ring[s, nxt, 1], ring[s, nxt, 2], ring[s, nxt, 3],
+                scratch,
+            )
+            for k in range(N_MOMENTS):
+                sums[s, k] -= scratch[k]
+        ring[s, pos, 0] = lo
+        ring[s, pos, 1] = lh
+        ring[s, pos, 2] = ll
+        ring[s, pos, 3] = lc
+        pos += 1
+        if pos == W:
+            pos = 0
+            if full:
+                _rebuild_sums(ring[s], sums[s], scratch)
+        counts[s, 1] = pos
+    last[s, 0] = lo
+    last[s, 1] = lh
+    last[s, 2] = ll
+    last[s, 3] = lc
+    counts[s, 0] = nb + 1
+
+    bars = nb + 1
+    if W > 0 and bars > W:
+        bars = W
+    if bars < min_periods:
+        return np.nan
+    return _finalize(_spread_from_moments(sums[s], min_pt), sign)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _push_bar_components(s, o, h, l, c, last, ring, sums, counts, scratch,
+                         min_pt, sign, min_periods, out):
+    """`_push_bar` that also writes the components of the window to ``out``."""
+    # A min_periods no window can reach makes _push_bar skip its own estimate.
+    _push_bar(s, o, h, l, c, last, ring, sums, counts, scratch, min_pt, sign, 1 << 62)
+    bars = counts[s, 0]
+    W = ring.shape[1]
+    if W > 0 and bars > W:
+        bars = W
+    s2 = _components_from_moments(sums[s], min_pt, out)
+    if bars < min_periods:
+        out[_REASON] = REASON_INSUFFICIENT_BARS
+        return np.nan
+    return _finalize(s2, sign)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _sum_moments(open_p, high, low, close):
+    """Moment sums over all transitions of an OHLC series."""
+    sums = np.zeros(N_MOMENTS)
+    scratch = np.empty(N_MOMENTS)
+    n = open_p.shape[0]
+    if n < 2:
+        return sums
+    o0 = _log_price(open_p[0])
+    h0 = _log_price(high[0])
+    l0 = _log_price(low[0])
+    c0 = _log_price(close[0])
+    for t in range(1, n):
+        o1 = _log_price(open_p[t])
+        h1 = _log_price(high[t])
+        l1 = _log_price(low[t])
+        c1 = _log_price(close[t])
+        _transition_moments(o0, h0, l0, c0, o1, h1, l1, c1, scratch)
+        for k in range(N_MOMENTS):
+            sums[k] += scratch[k]
+        o0, h0, l0, c0 = o1, h1, l1, c1
+    return sums
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _rebuild_sums(bars, sums, scratch):
+    """Recompute moment sums over consecutive log-OHLC rows ``bars`` (W, 4)."""
+    for k in range(N_MOMENTS):
+        sums[k] = 0.0
+    for j in range(1, bars.shape[0]):
+        _transition_moments(
+            bars[j - 1, 0], bars[j - 1, 1], bars[j - 1, 2], bars[j - 1, 3],
+            bars[j, 0], bars[j, 1], bars[j, 2], bars[j, 3],
+            scratch,
+        )
+        for k in range(N_MOMENTS):
+            sums[k] += scratch[k]
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _push_bars(sid, o, h, l, c, last, ring, sums, counts, min_pt, sign, min_periods, out):
+    """Push a batch of bars (series ids ``sid``) in order, writing estimates to ``out``."""
+    scratch = np.empty(N_MOMENTS)
+    for i in range(sid.shape[0]):
+        out[i] = _push_bar(
+            sid[i], o[i], h[i], l[i], c[i], last, ring, sums, counts, scratch,
+            min_pt, sign, min_periods,
+        )
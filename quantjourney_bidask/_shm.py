@@ -0,0 +1,91 @@
+"""
+Named NumPy arrays in one `multiprocessing.shared_memory` block.
+
+A layout is a picklable tuple of ``(name, offset, shape, dtype)`` entries
+(offsets aligned to 64 bytes), so a parent process can create the block,
+pass ``(shm.name, layout)`` to workers and every process maps the same
+buffers without copying or pickling array data. With ``meta``, the layout
+and a JSON-serializable dict are also written to a header at the start of
+the block, so `read_header` can recover both from the block name alone.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import json
+import sys
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+_ALIGN = 64
+
+Layout = Tuple[Tuple[str, int, Tuple[int, ...], str], ...]
+
+
+def _aligned(nbytes: int) -> int:
+    return -(-nbytes // _ALIGN) * _ALIGN
+
+
+def create(specs: Dict[str, Tuple[Tuple[int, ...], object]],
+           meta: Optional[dict] = None) -> Tuple[shared_memory.SharedMemory, Layout]:
+    """New block holding one array per ``{name: (shape, dtype)}``, uninitialized."""
+    relative = []
+    offset = 0
+    for name, (shape, dtype) in specs.items():
+        dtype = np.dtype(dtype)
+        shape = tuple(int(d) for d in shape)
+        relative.append((name, offset, shape, dtype.str))
+        offset += _aligned(int(np.prod(shape, dtype=np.int64)) * dtype.itemsize)
+    header = b""
+    base = 0
+    if meta is not None:
+        header = json.dumps({"layout": relative, "meta": meta}).encode()
+        base = _aligned(8 + len(header))
+    shm = shared_memory.SharedMemory(create=True, size=max(base + offset, 1))
+    if meta is not None:
+        shm.buf[:8] = len(header).to_bytes(8, "little")
+        shm.buf[8:8 + len(header)] = header
+    return shm, _shift(relative, base)
+
+
+def read_header(shm: shared_memory.SharedMemory) -> Tuple[Layout, dict]:
+    """Layout and ``meta`` written by `create` at the start of ``shm``."""
+    size = int.from_bytes(bytes(shm.buf[:8]), "little")
+    header = json.loads(bytes(shm.buf[8:8 + size]).decode())
+    return _shift(header["layout"], _aligned(8 + size)), header["meta"]
+
+
+def _shift(relative, base: int) -> Layout:
+    return tuple((name, base + offset, tuple(shape), dtype) for name, offset, shape, dtype in relative)
+
+
+def attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing block without taking ownership of its cleanup."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def views(shm: shared_memory.SharedMemory, layout: Layout) -> Dict[str, np.ndarray]:
+    """Arrays of ``layout`` mapped onto ``shm`` (drop them before ``shm.close()``)."""
+    return {
+        name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        for name, offset, shape, dtype in layout
+    }
+
+
+def release(shm: shared_memory.SharedMemory, unlink: bool = False):
+    """Close ``shm`` (and remove the block with ``unlink=True``), tolerating repeats."""
+    try:
+        shm.close()
+    except BufferError:
+        pass  # a view is still alive; the mapping goes away with the process
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,245 @@
+"""
+Vectorized spread alert engine.
+
+Evaluates high/low spread thresholds for a whole vector of symbols in one
+compiled step per tick. Each symbol is in one of three states (NORMAL, HIGH,
+LOW); hysteresis keeps a symbol in its alert state until the spread has moved
+back past the threshold by a margin, and a cooldown limits how often a symbol
+can change state. Only state transitions are reported, so a persistent
+breach produces a single alert instead of one per tick.
+
+Thresholds are either fixed per symbol (in bps) or percentiles of each
+symbol's own recent spreads, maintained with the streaming quantiles of
+`RollingQuantile`. A spread is compared with the percentiles of the spreads
+before it and only then added to its window; NaN spreads are skipped.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from numba import jit
+
+from .quantiles import RollingQuantile, _rq_push_many
+
+logger = logging.getLogger(__name__)
+
+NORMAL = 0
+HIGH = 1
+LOW = -1
+STATE_NAMES = {NORMAL: "NORMAL", HIGH: "HIGH", LOW: "LOW"}
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _evaluate(values, high, low, hysteresis, cooldown, now, state, last_change,
+              out_idx, out_prev, out_threshold):
+    """
+    Update every symbol's alert state; returns the number of transitions.
+
+    Transitions are written to ``out_idx`` (symbol position), ``out_prev``
+    (previous state) and ``out_threshold`` (threshold crossed); the new
+    state is ``state[out_idx]``. NaN spreads leave the state unchanged.
+    """
+    n = 0
+    for i in range(values.shape[0]):
+        v = values[i]
+        if v != v:
+            continue
+        cur = state[i]
+        if cur == HIGH and v > high[i] - hysteresis[i]:
+            new = HIGH
+        elif cur == LOW and v < low[i] + hysteresis[i]:
+            new = LOW
+        elif v > high[i]:
+            new = HIGH
+        elif v < low[i]:
+            new = LOW
+        else:
+            new = NORMAL
+        if new == cur or now - last_change[i] < cooldown:
+            continue
+        if new == HIGH:
+            threshold = high[i]
+        elif new == LOW:
+            threshold = low[i]
+        elif cur == HIGH:
+            threshold = high[i] - hysteresis[i]
+        else:
+            threshold = low[i] + hysteresis[i]
+        state[i] = new
+        last_change[i] = now
+        out_idx[n] = i
+        out_prev[n] = cur
+        out_threshold[n] = threshold
+        n += 1
+    return n
+
+
+class AlertEngine:
+    """
+    Multi-symbol spread alerts with hysteresis, cooldown and deduplication.
+
+    Args:
+        symbols : sequence of str
+            Symbols, in the order of the spread vectors passed to `update`.
+        high_bps, low_bps : float or array-like, optional
+            Fixed thresholds in bps, for all symbols or per symbol.
+        hysteresis_bps : float or array-like, default 0.0
+            Margin by which the spread must come back inside a threshold
+            before an alert state is cleared.
+        cooldown : float, default 0.0
+            Minimum time between two transitions of one symbol, in the units
+            of ``now`` passed to `update` (ticks by default).
+        percentile_window : int, optional
+            Use percentiles of each symbol's previous ``percentile_window``
+            (non-NaN) spreads as thresholds instead of fixed bps levels.
+        low_percentile, high_percentile : float, default 25, 75
+            Percentiles (0-100) used when ``percentile_window`` is set.
+        min_periods : int, optional
+            Spreads needed before percentile thresholds apply; defaults to
+            ``percentile_window``.
+
+    Examples:
+        >>> engine = AlertEngine(monitor.symbols, high_bps=10, hysteresis_bps=1, cooldown=5)
+        >>> alerts = engine.update(monitor.spread_bps)
+        >>> for symbol, state in zip(alerts["symbol"], alerts["state"]):
+        ...     print(symbol, STATE_NAMES[state])
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        high_bps=None,
+        low_bps=None,
+        hysteresis_bps=0.0,
+        cooldown: float = 0.0,
+        percentile_window: Optional[int] = None,
+        low_percentile: float = 25,
+        high_percentile: float = 75,
+        min_periods: Optional[int] = None,
+    ):
+        self.symbols = np.asarray([s.upper() for s in symbols])
+        self.index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        n = len(self.symbols)
+        if percentile_window is not None and (high_bps is not None or low_bps is not None):
+            raise ValueError("Use either bps thresholds or percentile thresholds, not both.")
+        self.high_bps = self._vector(np.inf if high_bps is None else high_bps)
+        self.low_bps = self._vector(-np.inf if low_bps is None else low_bps)
+        self.hysteresis_bps = self._vector(hysteresis_bps)
+        if (self.hysteresis_bps < 0).any():
+            raise ValueError("hysteresis_bps must be non-negative.")
+        self.cooldown = float(cooldown)
+
+        self.quantiles: Optional[RollingQuantile] = None
+        if percentile_window is not None:
+            self.quantiles = RollingQuantile(
+                percentile_window,
+                (low_percentile / 100, high_percentile / 100),
+                n_series=n,
+                min_periods=min_periods,
+            )
+            self._series = np.arange(n, dtype=np.int64)
+
+        self.state = np.zeros(n, dtype=np.int8)
+        self._last_change = np.full(n, -np.inf)
+        self._idx = np.empty(n, dtype=np.int64)
+        self._prev = np.empty(n, dtype=np.int8)
+        self._threshold = np.empty(n)
+        self.ticks = 0
+        self.transitions = 0
+        self._callbacks: List[Callable[[Dict], None]] = []
+
+    def _vector(self, value) -> np.ndarray:
+        out = np.empty(len(self.symbols))
+        out[:] = value
+        return out
+
+    def set_threshold(self, symbol: str, high_bps: Optional[float] = None, low_bps: Optional[float] = None):
+        """Set fixed bps thresholds for one symbol (None disables that side)."""
+        if self.quantiles is not None:
+            raise ValueError("Thresholds are percentile-based for this engine.")
+        i = self.index[symbol.upper()]
+        self.high_bps[i] = np.inf if high_bps is None else high_bps
+        self.low_bps[i] = -np.inf if low_bps is None else low_bps
+
+    def add_callback(self, callback: Callable[[Dict], None]):
+        """Register ``callback(alert_dict)``, called once per state transition."""
+        if not callable(callback):
+            raise TypeError("Callback must be a callable function.")
+        self._callbacks.append(callback)
+
+    def update(self, spread_bps, now: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate one tick of spreads (bps, one per symbol; NaN = no update).
+
+        Returns:
+            dict of np.ndarray
+                The transitions of this tick: ``index`` (symbol position),
+                ``symbol``, ``state`` and ``previous`` (``HIGH``/``LOW``/
+                ``NORMAL`` codes), ``spread_bps`` and ``threshold_bps``.
+        """
+        values = np.ascontiguousarray(spread_bps, dtype=np.float64)
+        if values.shape != self.state.shape:
+            raise ValueError(f"Expected {len(self.state)} spreads, got {values.shape}.")
+        if now is None:
+            now = float(self.ticks)
+        n = _evaluate(
+            values, self.high_bps, self.low_bps, self.hysteresis_bps,
+            self.cooldown, float(now), self.state, self._last_change,
+            self._idx, self._prev, self._threshold,
+        )
+        if self.quantiles is not None:
+            # Thresholds for the next tick, from windows that now include this one.
+            sid = self._series[values == values]
+            q = self.quantiles
+            out = np.empty((len(sid), 2))
+            _rq_push_many(
+                sid, values[sid], q._ring, q._heaps, q._sizes, q._where,
+                q._counts, q.quantiles, q.min_periods, out,
+            )
+            self.low_bps[sid] = out[:, 0]
+            self.high_bps[sid] = out[:, 1]
+        self.ticks += 1
+        self.transitions += n
+        idx = self._idx[:n].copy()
+        alerts = {
+            "index": idx,
+            "symbol": self.symbols[idx],
+            "state": self.state[idx],
+            "previous": self._prev[:n].copy(),
+            "spread_bps": values[idx],
+            "threshold_bps": self._threshold[:n].copy(),
+        }
+        if n and self._callbacks:
+            self._notify(alerts, now)
+        return alerts
+
+    def reset(self):
+        """Return every symbol to NORMAL and clear percentile history."""
+        self.state[:] = NORMAL
+        self._last_change[:] = -np.inf
+        if self.quantiles is not None:
+            self.quantiles.reset()
+            self.high_bps[:] = np.inf
+            self.low_bps[:] = -np.inf
+
+    def _notify(self, alerts: Dict[str, np.ndarray], now: float):
+        for k in range(len(alerts["index"])):
+            alert = {
+                "symbol": str(alerts["symbol"][k]),
+                "type": STATE_NAMES[int(alerts["state"][k])],
+                "previous": STATE_NAMES[int(alerts["previous"][k])],
+                "spread_bps": float(alerts["spread_bps"][k]),
+                "threshold_bps": float(alerts["threshold_bps"][k]),
+                "time": now,
+            }
+            for callback in self._callbacks:
+                try:
+                    callback(alert)
+                except Exception as e:
+                    logger.error(f"Error in alert callback: {e}")
@@ -0,0 +1,325 @@
+"""
+Content-addressed cache of rolling and expanding EDGE estimates.
+
+Results are keyed by a fingerprint of the input itself (the OHLC columns,
+the index and any session-label column) plus the call parameters and
+`ESTIMATOR_VERSION`, so recomputing the same symbol and window returns the
+stored result, while any changed bar, parameter or estimator revision
+misses. Fingerprints come from a compiled 128-bit multiply-rotate hash over
+the raw 64-bit words of each buffer (several GB/s), not from pickling
+frames.
+
+Hits are served from an in-memory LRU bounded by a byte budget, then from
+an optional on-disk tier of ``.npz`` files (one per key, written
+atomically), which survives restarts and can be shared between processes.
+Cached arrays are read-only and every call returns a copy (shallow under
+pandas copy-on-write, deep otherwise), so a caller modifying its result
+cannot corrupt the cache.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+from numba import jit
+
+from .edge_expanding import edge_expanding
+from .edge_rolling import edge_rolling
+
+# Bump whenever a cached estimator can return different numbers for the same
+# input, so stale on-disk entries stop matching.
+ESTIMATOR_VERSION = 1
+
+# Parameters that only choose how a result is computed, never its values;
+# they are left out of the key so e.g. any ``n_jobs`` hits the same entry.
+EXECUTION_PARAMS = frozenset({"n_jobs"})
+
+Result = Union[pd.Series, pd.DataFrame]
+
+_P1 = np.uint64(0x9E3779B185EBCA87)
+_P2 = np.uint64(0xC2B2AE3D27D4EB4F)
+_P3 = np.uint64(0x165667B19E3779F9)
+_P4 = np.uint64(0x85EBCA77C2B2AE63)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _rotl(x, r):
+    return (x << np.uint64(r)) | (x >> np.uint64(64 - r))
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _avalanche(h):
+    h ^= h >> np.uint64(33)
+    h *= _P2
+    h ^= h >> np.uint64(29)
+    h *= _P3
+    h ^= h >> np.uint64(32)
+    return h
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _hash128(words):
+    """Two independent 64-bit multiply-rotate lanes over ``words`` (uint64)."""
+    n = np.uint64(words.shape[0])
+    a = _P3 ^ (n * _P1)
+    b = _P4 ^ (n * _P2)
+    for i in range(words.shape[0]):
+        w = words[i]
+        a = _rotl(a ^ (_rotl(w * _P2, 31) * _P1), 27) * _P1 + _P4
+        b = _rotl(b ^ (_rotl(w * _P4, 29) * _P3), 23) * _P3 + _P1
+    return _avalanche(a), _avalanche(b ^ a)
+
+
+def _words(values) -> np.ndarray:
+    """64-bit words of a 1-d buffer (hash of each value for object data)."""
+    arr = values.to_numpy() if isinstance(values, (pd.Series, pd.Index)) else np.asarray(values)
+    if arr.dtype.kind in "fiumM" and arr.dtype.itemsize == 8:
+        return np.ascontiguousarray(arr).view(np.uint64)
+    if arr.dtype.kind in "fiub":
+        return np.ascontiguousarray(arr, dtype=np.float64).view(np.uint64)
+    return pd.util.hash_pandas_object(pd.Series(arr), index=False).to_numpy()
+
+
+def _index_digest(index: pd.Index) -> bytes:
+    if isinstance(index, pd.RangeIndex):
+        return repr((index.start, index.stop, index.step)).encode()
+    if isinstance(index, pd.DatetimeIndex):
+        a, b = _hash128(index.asi8.view(np.uint64))
+        return repr((str(index.dtype), int(a), int(b))).encode()
+    a, b = _hash128(_words(index))
+    return repr((str(index.dtype), int(a), int(b))).encode()
+
+
+def fingerprint(df: pd.DataFrame, columns=("open", "high", "low", "close"), **params) -> str:
+    """
+    Content key of ``df[columns]``, its index and ``params``.
+
+    Array-like parameter values are hashed by content, other values by
+    ``repr``; `EXECUTION_PARAMS` are ignored. Column names are matched
+    case-insensitively.
+
+    Examples:
+        >>> fingerprint(df, window=21, step=1)
+        'f3c1...'
+    """
+    lower = {str(c).lower(): c for c in df.columns}
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"v{ESTIMATOR_VERSION}|{len(df)}|".encode())
+    h.update(_index_digest(df.index))
+    for col in columns:
+        a, b = _hash128(_words(df[lower[col.lower()]]))
+        h.update(f"|{col.lower()}:{a:016x}{b:016x}".encode())
+    for name in sorted(params.keys() - EXECUTION_PARAMS):
+        value = params[name]
+        if isinstance(value, (np.ndarray, pd.Index, pd.Series, list)):
+            a, b = _hash128(_words(value))
+            value = f"array[{len(value)}]:{a:016x}{b:016x}"
+        h.update(f"|{name}={value!r}".encode())
+    return h.hexdigest()
+
+
+def _nbytes(result: Result) -> int:
+    usage = result.memory_usage(index=True, deep=True)
+    return int(np.sum(usage))
+
+
+def _copy_on_write() -> bool:
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def _freeze(result: Result) -> Result:
+    for arr in ([result.to_numpy()] if isinstance(result, pd.Series)
+                else [result[c].to_numpy() for c in result.columns]):
+        if isinstance(arr, np.ndarray) and arr.base is None:
+            arr.flags.writeable = False
+    return result
+
+
+class EstimateCache:
+    """
+    LRU cache of estimator results with an optional disk tier.
+
+    Args:
+        max_bytes : int, default 256 MiB
+            Memory budget for cached results (values plus index); the least
+            recently used entries are evicted beyond it. A result larger
+            than the budget is returned but not kept in memory.
+        directory : str, optional
+            Directory of the on-disk tier. Entries are written there on
+            every miss and read back on memory misses; results with an
+            object (e.g. string) index stay memory-only.
+
+    Examples:
+        >>> cache = EstimateCache(max_bytes=512 * 2**20, directory="~/.cache/qj_edge")
+        >>> spreads = cache.edge_rolling(df, window=21)   # computed
+        >>> spreads = cache.edge_rolling(df, window=21)   # served from memory
+        >>> cache.stats()
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, directory: Optional[str] = None):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative.")
+        self.max_bytes = max_bytes
+        self.directory = None if directory is None else os.path.expanduser(directory)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Estimators ---
+    def edge_rolling(self, df: pd.DataFrame, window: int, **kwargs) -> Result:
+        """Cached `edge_rolling` (same arguments)."""
+        columns = ["open", "high", "low", "close"]
+        if isinstance(kwargs.get("segment_by"), str):
+            columns.append(kwargs["segment_by"])
+        return self.get_or_compute(
+            "edge_rolling", df, lambda: edge_rolling(df, window=window, **kwargs),
+            columns=columns, window=window, **kwargs,
+        )
+
+    def edge_expanding(self, df: pd.DataFrame, **kwargs) -> Result:
+        """Cached `edge_expanding` (same arguments)."""
+        return self.get_or_compute(
+            "edge_expanding", df, lambda: edge_expanding(df, **kwargs), **kwargs
+        )
+
+    def get_or_compute(self, name: str, df: pd.DataFrame, compute: Callable[[], Result],
+                       columns=("open", "high", "low", "close"), **params) -> Result:
+        """Result of ``compute()`` for estimator ``name`` on ``df`` with ``params``, cached."""
+        key = fingerprint(df, columns=columns, estimator=name, **params)
+        result = self.get(key)
+        if result is None:
+            with self._lock:
+                self.misses += 1
+            result = _freeze(compute())
+            self._put(key, result)
+            self._write(key, result)
+        # Without copy-on-write a shallow copy shares writable blocks with the cache.
+        return result.copy(deep=not _copy_on_write())
+
+    # --- Storage ---
+    def get(self, key: str) -> Optional[Result]:
+        """Cached result for ``key`` from memory, then disk; None if absent."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        result = self._read(key)
+        if result is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._put(key, result)
+        return result
+
+    def _put(self, key: str, result: Result):
+        size = _nbytes(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _write(self, key: str, result: Result):
+        if self.directory is None:
+            return
+        index = result.index
+        tz = ""
+        if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+            tz = str(index.tz)
+            index = index.tz_convert(None)  # UTC wall times survive DST changes
+        index_values = np.asarray(index)
+        if index_values.dtype == object:
+            return
+        if isinstance(result, pd.Series):
+            names = [result.name]
+            columns = [result.to_numpy()]
+        else:
+            names = list(result.columns)
+            columns = [result[c].to_numpy() for c in names]
+        fd, tmp = tempfile.mkstemp(suffix=".npz", dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                index=index_values,
+                tz=np.array(tz),
+                index_name=np.array([] if index.name is None else [str(index.name)]),
+                kind=np.array("series" if isinstance(result, pd.Series) else "frame"),
+                names=np.array([str(n) for n in names]),
+                **{f"col{i}": col for i, col in enumerate(columns)},
+            )
+        os.replace(tmp, self._path(key))
+
+    def _read(self, key: str) -> Optional[Result]:
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key), allow_pickle=False) as data:
+                index = pd.Index(data["index"], name=([str(v) for v in data["index_name"]] or [None])[0])
+                tz = str(data["tz"])
+                if tz:
+                    index = pd.DatetimeIndex(index).tz_localize("UTC").tz_convert(tz)
+                names = [str(n) for n in data["names"]]
+                columns = [data[f"col{i}"] for i in range(len(names))]
+                kind = str(data["kind"])
+        except (OSError, ValueError, KeyError):
+            return None  # unreadable or partial entry: recompute
+        if kind == "series":
+            result = pd.Series(columns[0], index=index, name=names[0])
+        else:
+            result = pd.DataFrame(dict(zip(names, columns)), index=index)
+        return _freeze(result)
+
+    # --- Housekeeping ---
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self, disk: bool = False):
+        """Drop the memory tier (and the disk tier's entries with ``disk=True``)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and the memory tier's size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -10,11 +10,22 @@ Author: Jakub Polec
 Date: 2025-06-28
 """
 import warnings
-from typing import Union, List, Any
+from typing import Union, List, Any, Dict
 import numpy as np
 from numba import jit
 
-@jit(nopython=True, cache=True)
+from . import timing
+from ._moments import (
+    COMPONENTS,
+    N_COMPONENTS,
+    REASON_INSUFFICIENT_BARS,
+    _components_from_moments,
+    _finalize,
+    _spread_from_moments,
+    _sum_moments,
+)
+
+@jit(nopython=True, nogil=True, cache=True)
 def _compute_spread_numba(r1, r2, r3, r4, r5, tau, po, pc, pt):
     """
     Core spread calculation using Numba for maximum performance.
@@ -49,6 +60,14 @@ def _compute_spread_numba(r1, r2, r3, r4, r5, tau, po, pc, pt):
     
     return s2
 
+
+@jit(nopython=True, nogil=True, cache=True)
+def _edge_compiled(o, h, l, c, min_pt, sign):
+    """Whole estimate from the moment sums of the series, without the GIL."""
+    if o.shape[0] < 3:
+        return np.nan
+    return _finalize(_spread_from_moments(_sum_moments(o, h, l, c), min_pt), sign)
+
 def edge(
     open_prices: Union[List[float], Any],
     high: Union[List[float], Any],
@@ -57,7 +76,9 @@ def edge(
     sign: bool = False,
     min_pt: float = 1e-6, # Keep this robustness check
     debug: bool = False,
-) -> float:
+    return_diagnostics: bool = False,
+    nogil: bool = False,
+) -> Union[float, Dict[str, float]]:
     """
     Estimate the effective bid-ask spread from OHLC prices.
 
@@ -79,6 +100,13 @@ def edge(
             Minimum probability threshold for tau to ensure reliable estimates.
         debug : bool, default False
             If True, prints intermediate values.
+        return_diagnostics : bool, default False
+            If True, returns the dict of `edge_components` instead.
+        nogil : bool, default False
+            If True, computes the estimate in one compiled pass over the
+            moment sums (as `edge_components`) that releases the GIL, so
+            threads can run estimates concurrently; equal to the default
+            path up to floating-point rounding (``debug`` is ignored).
 
     Returns:
         float
@@ -92,7 +120,23 @@ def edge(
         >>> low = np.array([99.5, 100.8, 98.9, 101.0, 100.1])
         >>> close = np.array([101.2, 102.5, 100.3, 102.8, 101.5])
     """
+    if return_diagnostics:
+        return edge_components(open_prices, high, low, close, sign=sign, min_pt=min_pt)
+    if nogil:
+        t = timing._start()
+        o = np.ascontiguousarray(open_prices, dtype=np.float64)
+        h = np.ascontiguousarray(high, dtype=np.float64)
+        l = np.ascontiguousarray(low, dtype=np.float64)  # noqa: E741
+        c = np.ascontiguousarray(close, dtype=np.float64)
+        if not (len(h) == len(o) and len(l) == len(o) and len(c) == len(o)):
+            raise ValueError("Input arrays must have the same length.")
+        t = timing._lap("edge.convert", t)
+        s = _edge_compiled(o, h, l, c, min_pt, sign)
+        timing._lap("edge.kernel", t)
+        return float(s)
+
     # --- 1. Input Validation and Conversion ---
+    t = timing._start()
     o_arr = np.asarray(open_prices, dtype=float)    # Convert to numpy array
     h_arr = np.asarray(high, dtype=float)           # Convert to numpy array
     l_arr = np.asarray(low, dtype=float)            # Convert to numpy array
@@ -105,6 +149,7 @@ def edge(
     if nobs < 3:    # If there are less than 3 observations, return NaN
         if debug: print("NaN reason: nobs < 3")
         return np.nan
+    t = timing._lap("edge.convert", t)
 
     # --- 2. Log-Price Calculation ---
     with warnings.catch_warnings():
@@ -115,6 +160,7 @@ def edge(
         l = np.log(np.where(l_arr > 0, l_arr, np.nan))  # Log-price of the low price
         c = np.log(np.where(c_arr > 0, c_arr, np.nan))  # Log-price of the close price
         m = (h + l) / 2.0     # Mid-price log
+    t = timing._lap("edge.log", t)
 
     # --- 3. Shift Arrays for Lagged Calculations (THE CRITICAL FIX) ---
     # All calculations from here on use N-1 observations.
@@ -134,6 +180,7 @@ def edge(
     r3 = m_t - c_tm1        # Mid-price - Previous close
     r4 = c_tm1 - m_tm1      # Previous close - Previous mid-price
     r5 = o_t - c_tm1        # Open price - Previous close
+    t = timing._lap("edge.returns", t)
 
     # --- 5. Compute Indicator Variables ---
     tau = np.where(np.isnan(h_t) | np.isnan(l_t) | np.isnan(c_tm1), np.nan, ((h_t != l_t) | (l_t != c_tm1)).astype(float))
@@ -141,6 +188,7 @@ def edge(
     po2 = tau * np.where(np.isnan(o_t) | np.isnan(l_t), np.nan, (o_t != l_t).astype(float))
     pc1 = tau * np.where(np.isnan(c_tm1) | np.isnan(h_tm1), np.nan, (c_tm1 != h_tm1).astype(float))
     pc2 = tau * np.where(np.isnan(c_tm1) | np.isnan(l_tm1), np.nan, (c_tm1 != l_tm1).astype(float))
+    t = timing._lap("edge.indicators", t)
     
     # --- 6. Compute Probabilities ---
     with warnings.catch_warnings():
@@ -148,6 +196,7 @@ def edge(
         pt = np.nanmean(tau)                        # Probability of a valid period
         po = np.nanmean(po1) + np.nanmean(po2)      # Probability of open price not equal to high
         pc = np.nanmean(pc1) + np.nanmean(pc2)      # Probability of close price not equal to high
+    t = timing._lap("edge.probabilities", t)
 
     if debug:
         print(f"Debug: tau_sum={np.nansum(tau):.2f}, po={po:.4f}, pc={pc:.4f}, pt={pt:.4f}")
@@ -159,6 +208,7 @@ def edge(
 
     # --- 8. Compute Spread (using the Numba-optimized function) ---
     s2 = _compute_spread_numba(r1, r2, r3, r4, r5, tau, po, pc, pt) # Spread estimate
+    t = timing._lap("edge.kernel", t)
     
     if np.isnan(s2):
         if debug: print("NaN reason: s2 calculation resulted in NaN")
@@ -171,4 +221,58 @@ def edge(
     if debug:
         print(f"Debug: s2={s2:.6e}, s={s:.6e}")
 
-    return float(s)
\ No newline at end of file
+    return float(s)
+
+
+def edge_components(
+    open_prices: Union[List[float], Any],
+    high: Union[List[float], Any],
+    low: Union[List[float], Any],
+    close: Union[List[float], Any],
+    sign: bool = False,
+    min_pt: float = 1e-6,
+) -> Dict[str, float]:
+    """
+    EDGE estimate together with the intermediate quantities behind it.
+
+    Computed in one compiled pass over the moment sums of the series (see
+    `_moments`), so the spread equals `edge` up to floating-point rounding.
+
+    Args:
+        open_prices, high, low, close : array-like
+            Vectors of OHLC prices, as in `edge`.
+        sign : bool, default False
+            If True, ``spread`` is signed.
+        min_pt : float, default 1e-6
+            Minimum probability threshold for tau.
+
+    Returns:
+        dict
+            ``spread``, ``s2``, the probabilities ``pt``/``po``/``pc``, the
+            means ``e1``/``e2`` and variances ``v1``/``v2`` of the two moment
+            conditions, ``n_obs`` (transitions entering them) and ``reason``,
+            an index into `NAN_REASONS` (0 when the estimate is valid).
+
+    Examples:
+        >>> d = edge_components(df.open, df.high, df.low, df.close)
+        >>> d["spread"], NAN_REASONS[d["reason"]]
+    """
+    o = np.ascontiguousarray(open_prices, dtype=np.float64)
+    h = np.ascontiguousarray(high, dtype=np.float64)
+    l = np.ascontiguousarray(low, dtype=np.float64)  # noqa: E741
+    c = np.ascontiguousarray(close, dtype=np.float64)
+    nobs = len(o)
+    if not (len(h) == nobs and len(l) == nobs and len(c) == nobs):
+        raise ValueError("Input arrays must have the same length.")
+
+    out = np.empty(N_COMPONENTS)
+    s2 = _components_from_moments(_sum_moments(o, h, l, c), min_pt, out)
+    spread = _finalize(s2, sign)
+    if nobs < 3:
+        out[-1] = REASON_INSUFFICIENT_BARS
+        spread = np.nan
+    result = {"spread": float(spread)}
+    result.update(zip(COMPONENTS, out.tolist()))
+    result["n_obs"] = int(result["n_obs"])
+    result["reason"] = int(result["reason"])
+    return result
@@ -0,0 +1,190 @@
+"""
+Exponentially weighted EDGE estimator.
+
+Every mean in the EDGE moment conditions (the tau/po/pc probabilities, the
+means of r1/r3/r5 and the first and second moments of x1 and x2) is a ratio
+of two of the additive sums in `_moments`. Decaying all sums by the same
+factor on every bar turns each of those means into an exponentially weighted
+average, so the estimate forgets old bars smoothly instead of dropping them
+out of a fixed window, and the state is just the previous bar and one
+vector of sums: constant time and memory per bar, whatever the half-life.
+
+Missing observations do not contribute but still age the older ones, as in
+pandas ``ewm(adjust=True, ignore_na=False)``. The check for at least two
+valid tau observations uses an undecayed count, as in `edge`.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import numpy as np
+import pandas as pd
+from numba import jit
+
+from ._moments import (
+    N_MOMENTS,
+    _finalize,
+    _log_price,
+    _spread_from_moments,
+    _transition_moments,
+)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _ewm_push(s, o, h, l, c, last, sums, counts, scratch, decay, min_pt, sign, min_periods):
+    """
+    Add one bar to the decayed moment sums of series ``s``; returns its estimate.
+
+    ``last`` (S, 4) holds the log OHLC of the previous bar, ``sums`` (S, K)
+    the decayed moment sums and ``counts`` (S, 2) the number of bars seen
+    and the undecayed number of tau = 1 transitions.
+    """
+    lo = _log_price(o)
+    lh = _log_price(h)
+    ll = _log_price(l)
+    lc = _log_price(c)
+    nb = counts[s, 0]
+    if nb > 0:
+        _transition_moments(
+            last[s, 0], last[s, 1], last[s, 2], last[s, 3], lo, lh, ll, lc, scratch
+        )
+        for k in range(N_MOMENTS):
+            sums[s, k] = decay * sums[s, k] + scratch[k]
+        counts[s, 1] += int(scratch[1])
+    last[s, 0] = lo
+    last[s, 1] = lh
+    last[s, 2] = ll
+    last[s, 3] = lc
+    counts[s, 0] = nb + 1
+    if nb + 1 < min_periods:
+        return np.nan
+    return _finalize(_spread_from_moments(sums[s], min_pt, float(counts[s, 1])), sign)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _ewm_push_many(sid, o, h, l, c, last, sums, counts, decay, min_pt, sign, min_periods, out):
+    scratch = np.empty(N_MOMENTS)
+    for i in range(sid.shape[0]):
+        out[i] = _ewm_push(
+            sid[i], o[i], h[i], l[i], c[i], last, sums, counts, scratch,
+            decay, min_pt, sign, min_periods,
+        )
+
+
+class EdgeEWM:
+    """
+    Incremental exponentially weighted EDGE spread estimate.
+
+    Args:
+        halflife : float
+            Half-life, in bars, of the weight of a bar-to-bar transition
+            (> 0).
+        sign : bool, default False
+            If True, returns signed estimates.
+        min_pt : float, default 1e-6
+            Minimum probability threshold for tau, as in `edge`.
+        min_periods : int, default 3
+            Minimum number of bars before an estimate is returned (>= 3).
+
+    Examples:
+        >>> stream = EdgeEWM(halflife=20)
+        >>> for o, h, l, c in bars:
+        ...     spread = stream.update(o, h, l, c)
+    """
+
+    def __init__(
+        self,
+        halflife: float,
+        sign: bool = False,
+        min_pt: float = 1e-6,
+        min_periods: int = 3,
+    ):
+        if not halflife > 0:
+            raise ValueError("halflife must be positive.")
+        self.halflife = float(halflife)
+        self.decay = 0.5 ** (1.0 / self.halflife)
+        self.sign = sign
+        self.min_pt = min_pt
+        self.min_periods = max(3, min_periods)
+        self.reset()
+
+    def reset(self):
+        """Forget all bars."""
+        self._last = np.full((1, 4), np.nan)
+        self._sums = np.zeros((1, N_MOMENTS))
+        self._counts = np.zeros((1, 2), dtype=np.int64)
+        self._scratch = np.empty(N_MOMENTS)
+        self.value = np.nan
+
+    @property
+    def n_bars(self) -> int:
+        """Number of bars pushed since creation or the last `reset`."""
+        return int(self._counts[0, 0])
+
+    def update(self, open_price: float, high: float, low: float, close: float) -> float:
+        """Add one bar and return the current spread estimate."""
+        self.value = _ewm_push(
+            0, float(open_price), float(high), float(low), float(close),
+            self._last, self._sums, self._counts, self._scratch,
+            self.decay, self.min_pt, self.sign, self.min_periods,
+        )
+        return self.value
+
+    def update_many(self, open_prices, high, low, close) -> np.ndarray:
+        """Add a batch of bars in order; returns the estimate after each bar."""
+        o = np.ascontiguousarray(open_prices, dtype=np.float64)
+        h = np.ascontiguousarray(high, dtype=np.float64)
+        l = np.ascontiguousarray(low, dtype=np.float64)  # noqa: E741
+        c = np.ascontiguousarray(close, dtype=np.float64)
+        n = len(o)
+        if not (len(h) == n and len(l) == n and len(c) == n):
+            raise ValueError("Input arrays must have the same length.")
+        out = np.empty(n)
+        _ewm_push_many(
+            np.zeros(n, dtype=np.int64), o, h, l, c,
+            self._last, self._sums, self._counts,
+            self.decay, self.min_pt, self.sign, self.min_periods, out,
+        )
+        if n:
+            self.value = out[-1]
+        return out
+
+
+def edge_ewm(
+    df: pd.DataFrame,
+    halflife: float,
+    sign: bool = False,
+    min_periods: int = 3,
+) -> pd.Series:
+    """
+    Exponentially weighted EDGE spread estimates.
+
+    Args:
+        df : pd.DataFrame
+            OHLC data (columns 'open', 'high', 'low', 'close'), in time order.
+        halflife : float
+            Half-life in bars (> 0) of the weights in every moment condition.
+        sign : bool, default False
+            If True, returns signed estimates.
+        min_periods : int, default 3
+            Minimum number of bars before an estimate is returned.
+
+    Returns:
+        pd.Series
+            Spread estimates aligned with ``df``.
+
+    Examples:
+        >>> spreads = edge_ewm(df, halflife=21)
+    """
+    df_proc = df.rename(columns=str.lower)
+    stream = EdgeEWM(halflife, sign=sign, min_periods=min_periods)
+    estimates = stream.update_many(
+        df_proc["open"].to_numpy(dtype=np.float64),
+        df_proc["high"].to_numpy(dtype=np.float64),
+        df_proc["low"].to_numpy(dtype=np.float64),
+        df_proc["close"].to_numpy(dtype=np.float64),
+    )
+    return pd.Series(estimates, index=df.index, name="EDGE_ewm")
@@ -13,6 +13,10 @@ over strict IEEE 754 compliance. It assumes the input data is **perfectly clean*
 where the standard `edge.py` version would produce a valid number. Use this
 version only when you have a robust data sanitization pipeline upstream.
 
+With ``nogil=True`` the log transform, indicators and kernel all run in one
+compiled fastmath pass that releases the GIL, so threads (e.g. `edge_many`)
+can compute estimates concurrently.
+
 For general-purpose, robust estimation, use the standard `edge.py` module.
 
 Author: Jakub Polec
@@ -23,9 +27,11 @@ import numpy as np
 from numba import jit, prange
 from typing import Union, List, Any
 
+from . import timing
+
 # This is the targeted kernel. We add `fastmath=True` for an extra performance
 # boost in this dense numerical section.
-@jit(nopython=True, cache=True, fastmath=True)
+@jit(nopython=True, nogil=True, cache=True, fastmath=True)
 def _compute_spread_numba_optimized(r1, r2, r3, r4, r5, tau, po, pc, pt):
     """
     Optimized core spread calculation using Numba with fastmath.
@@ -50,6 +56,44 @@ def _compute_spread_numba_optimized(r1, r2, r3, r4, r5, tau, po, pc, pt):
     
     return s2
 
+@jit(nopython=True, nogil=True, cache=True, fastmath=True)
+def _edge_hft_compiled(o_arr, h_arr, l_arr, c_arr, min_pt, sign):
+    """Whole estimate (log prices to spread) in one compiled pass, without the GIL."""
+    if o_arr.shape[0] < 3:
+        return np.nan
+    o = np.log(np.where(o_arr > 0, o_arr, np.nan))
+    h = np.log(np.where(h_arr > 0, h_arr, np.nan))
+    l = np.log(np.where(l_arr > 0, l_arr, np.nan))
+    c = np.log(np.where(c_arr > 0, c_arr, np.nan))
+    m = (h + l) / 2.0
+
+    o_t, h_t, l_t, m_t = o[1:], h[1:], l[1:], m[1:]
+    h_tm1, l_tm1, c_tm1, m_tm1 = h[:-1], l[:-1], c[:-1], m[:-1]
+    r1 = m_t - o_t
+    r2 = o_t - m_tm1
+    r3 = m_t - c_tm1
+    r4 = c_tm1 - m_tm1
+    r5 = o_t - c_tm1
+
+    tau = np.where(np.isnan(h_t) | np.isnan(l_t) | np.isnan(c_tm1), np.nan, ((h_t != l_t) | (l_t != c_tm1)) * 1.0)
+    po1 = tau * np.where(np.isnan(o_t) | np.isnan(h_t), np.nan, (o_t != h_t) * 1.0)
+    po2 = tau * np.where(np.isnan(o_t) | np.isnan(l_t), np.nan, (o_t != l_t) * 1.0)
+    pc1 = tau * np.where(np.isnan(c_tm1) | np.isnan(h_tm1), np.nan, (c_tm1 != h_tm1) * 1.0)
+    pc2 = tau * np.where(np.isnan(c_tm1) | np.isnan(l_tm1), np.nan, (c_tm1 != l_tm1) * 1.0)
+    pt = np.nanmean(tau)
+    po = np.nanmean(po1) + np.nanmean(po2)
+    pc = np.nanmean(pc1) + np.nanmean(pc2)
+    if np.nansum(tau) < 2 or po == 0.0 or pc == 0.0 or pt < min_pt:
+        return np.nan
+
+    s2 = _compute_spread_numba_optimized(r1, r2, r3, r4, r5, tau, po, pc, pt)
+    if np.isnan(s2):
+        return np.nan
+    s = np.sqrt(np.abs(s2))
+    if sign:
+        s *= np.sign(s2)
+    return s
+
 def edge(
     open_prices: Union[List[float], Any],
     high: Union[List[float], Any],
@@ -58,12 +102,31 @@ def edge(
     sign: bool = False,
     min_pt: float = 1e-6,
     debug: bool = False,
+    nogil: bool = False,
 ) -> float:
     """
     Estimate the effective bid-ask spread from OHLC prices.
     Public-facing function using the hybrid optimization strategy.
+
+    With ``nogil=True`` the whole estimate runs in one compiled pass that
+    releases the GIL (``debug`` is ignored), equal to the default path up
+    to floating-point rounding.
     """
+    if nogil:
+        t = timing._start()
+        o_arr = np.ascontiguousarray(open_prices, dtype=np.float64)
+        h_arr = np.ascontiguousarray(high, dtype=np.float64)
+        l_arr = np.ascontiguousarray(low, dtype=np.float64)
+        c_arr = np.ascontiguousarray(close, dtype=np.float64)
+        if not (len(h_arr) == len(o_arr) and len(l_arr) == len(o_arr) and len(c_arr) == len(o_arr)):
+            raise ValueError("Input arrays must have the same length.")
+        t = timing._lap("edge_hft.convert", t)
+        s = _edge_hft_compiled(o_arr, h_arr, l_arr, c_arr, min_pt, sign)
+        timing._lap("edge_hft.kernel", t)
+        return float(s)
+
     # --- 1. Input Validation and Conversion ---
+    t = timing._start()
     o_arr = np.asarray(open_prices, dtype=float)
     h_arr = np.asarray(high, dtype=float)
     l_arr = np.asarray(low, dtype=float)
@@ -76,6 +139,7 @@ def edge(
     if nobs < 3:
         if debug: print("NaN reason: nobs < 3")
         return np.nan
+    t = timing._lap("edge_hft.convert", t)
 
     # --- 2. Log-Price Calculation (NumPy is fastest for this) ---
     with warnings.catch_warnings():
@@ -85,6 +149,7 @@ def edge(
         l = np.log(np.where(l_arr > 0, l_arr, np.nan))
         c = np.log(np.where(c_arr > 0, c_arr, np.nan))
         m = (h + l) / 2.0
+    t = timing._lap("edge_hft.log", t)
 
     # --- 3. Shift and Vectorized Calculations (NumPy is fastest for this) ---
     o_t, h_t, l_t, m_t = o[1:], h[1:], l[1:], m[1:]
@@ -95,18 +160,21 @@ def edge(
     r3 = m_t - c_tm1
     r4 = c_tm1 - m_tm1
     r5 = o_t - c_tm1
+    t = timing._lap("edge_hft.returns", t)
 
     tau = np.where(np.isnan(h_t) | np.isnan(l_t) | np.isnan(c_tm1), np.nan, ((h_t != l_t) | (l_t != c_tm1)).astype(float))
     po1 = tau * np.where(np.isnan(o_t) | np.isnan(h_t), np.nan, (o_t != h_t).astype(float))
     po2 = tau * np.where(np.isnan(o_t) | np.isnan(l_t), np.nan, (o_t != l_t).astype(float))
     pc1 = tau * np.where(np.isnan(c_tm1) | np.isnan(h_tm1), np.nan, (c_tm1 != h_tm1).astype(float))
     pc2 = tau * np.where(np.isnan(c_tm1) | np.isnan(l_tm1), np.nan, (c_tm1 != l_tm1).astype(float))
+    t = timing._lap("edge_hft.indicators", t)
     
     with warnings.catch_warnings():
         warnings.simplefilter("ignore", RuntimeWarning)
         pt = np.nanmean(tau)
         po = np.nanmean(po1) + np.nanmean(po2)
         pc = np.nanmean(pc1) + np.nanmean(pc2)
+    t = timing._lap("edge_hft.probabilities", t)
 
     # --- 4. Final Checks and Kernel Call ---
     if np.nansum(tau) < 2 or po == 0.0 or pc == 0.0 or pt < min_pt:
@@ -115,6 +183,7 @@ def edge(
 
     # *** THE FIX: Call the correctly named JIT function ***
     s2 = _compute_spread_numba_optimized(r1, r2, r3, r4, r5, tau, po, pc, pt)
+    t = timing._lap("edge_hft.kernel", t)
     
     if np.isnan(s2):
         return np.nan
@@ -0,0 +1,86 @@
+"""
+Concurrent EDGE estimates for many independent frames on a thread pool.
+
+Single estimates use the fully compiled ``edge(..., nogil=True)`` path:
+after a few array conversions the whole estimate runs in one kernel that
+releases the GIL, so threads compute different frames in parallel without
+the process start-up and pickling of a process pool. Rolling estimates
+(``window=``) release the GIL only inside their compiled kernels; their
+pandas input handling and Series construction still hold it, so they
+overlap only partly.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .edge import edge
+from .edge_rolling import edge_rolling
+
+
+def _columns(df: pd.DataFrame):
+    lower = {str(c).lower(): c for c in df.columns}
+    return [df[lower[k]].to_numpy(dtype=np.float64) for k in ("open", "high", "low", "close")]
+
+
+def edge_many(
+    frames: Union[Sequence[pd.DataFrame], Mapping[str, pd.DataFrame]],
+    max_workers: Optional[int] = None,
+    window: Optional[int] = None,
+    sign: bool = False,
+    **kwargs,
+) -> Union[np.ndarray, pd.Series, List[pd.Series], dict]:
+    """
+    EDGE estimates of many OHLC frames, computed concurrently by threads.
+
+    Args:
+        frames : sequence or mapping of pd.DataFrame
+            OHLC frames (columns 'open', 'high', 'low', 'close'), e.g. one
+            per symbol.
+        max_workers : int, optional
+            Threads in the pool (the `ThreadPoolExecutor` default if None);
+            1 runs in the calling thread.
+        window : int, optional
+            If given, `edge_rolling` of every frame with this window (other
+            keyword arguments are passed on); otherwise one `edge` estimate
+            per frame over all its rows (compiled ``nogil`` path).
+        sign : bool, default False
+            If True, returns signed estimates.
+
+    Returns:
+        np.ndarray or list of pd.Series
+            One estimate (or rolling Series) per frame, in input order; a
+            pd.Series of estimates (or dict of Series) keyed like a mapping
+            input.
+
+    Examples:
+        >>> spreads = edge_many({s: fetch(s) for s in symbols}, max_workers=8)
+        >>> rolling = edge_many(frames, max_workers=8, window=21)
+    """
+    keys = list(frames.keys()) if isinstance(frames, Mapping) else None
+    items = list(frames.values()) if keys is not None else list(frames)
+    if window is None:
+        def task(df):
+            return edge(*_columns(df), sign=sign, nogil=True, **kwargs)
+    else:
+        def task(df):
+            return edge_rolling(df, window=window, sign=sign, **kwargs)
+
+    if max_workers == 1 or len(items) <= 1:
+        results = [task(df) for df in items]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(task, items))
+
+    if window is None:
+        if keys is not None:
+            return pd.Series(results, index=keys, name="EDGE", dtype=np.float64)
+        return np.asarray(results, dtype=np.float64)
+    return dict(zip(keys, results)) if keys is not None else results
@@ -3,18 +3,246 @@ Robust and efficient rolling window EDGE estimator implementation.
 This module provides a rolling window implementation of the EDGE estimator,
 ensuring compatibility with all pandas windowing features like 'step'.
 
+The whole series is processed in one compiled pass over running moment sums
+(see `_moments`), optionally split into sessions: the transition from the
+last bar of a session to the first bar of the next one is never used, and
+every window restarts at a session boundary. The state of that pass is
+small (the last ``window`` bars and the running sums), so
+`edge_rolling_update` can append new bars to a persisted state and produce
+exactly the values a full recompute would.
+
+The same property makes the pass splittable: every ``window`` bars the
+running sums are rebuilt from the ring of the last ``window`` bars, so the
+state at such a point depends on those bars only. With ``n_jobs``, the
+series is cut at rebuild points (or session starts), each chunk is seeded
+from the ``window`` bars before it and run in a worker process over
+shared-memory buffers; the stitched result is bit-identical to one pass.
+
 Author: Jakub Polec
 Date: 2025-06-28
 
-Part of the QuantJourney framework - The framework with advanced quantitative 
+Part of the QuantJourney framework - The framework with advanced quantitative
 finance tools and insights.
 """
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, Union
+
 import numpy as np
 import pandas as pd
-from typing import Union
+from numba import jit
+
+from . import _shm, timing
+from ._moments import (
+    COMPONENTS,
+    N_COMPONENTS,
+    N_MOMENTS,
+    REASON_INSUFFICIENT_BARS,
+    REASON_NOT_EVALUATED,
+    _log_price,
+    _push_bar,
+    _push_bar_components,
+    _rebuild_sums,
+)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _rolling_pass(o, h, l, c, starts, row0, step, need, min_pt, sign,
+                  last, ring, sums, counts, out, diag):
+    """
+    Rolling estimates of one series in a single pass.
+
+    ``starts[i]`` marks the first bar of a session: the window state is reset
+    there, so no window (and no bar-to-bar transition) spans two sessions.
+    Row ``i`` (global position ``row0 + i``) gets an estimate if that
+    position is a multiple of ``step`` and at least ``need`` bars of its
+    session have been seen. ``last``/``ring``/``sums``/``counts`` is the
+    `_push_bar` state of series 0, carried over between calls. If ``diag``
+    has rows, row ``i`` receives the estimator components of that window.
+    """
+    scratch = np.empty(N_MOMENTS)
+    with_diag = diag.shape[0] > 0
+    for i in range(o.shape[0]):
+        if starts[i]:
+            sums[0, :] = 0.0
+            counts[0, 0] = 0
+            counts[0, 1] = 0
+        if with_diag:
+            value = _push_bar_components(
+                0, o[i], h[i], l[i], c[i], last, ring, sums, counts, scratch,
+                min_pt, sign, 3, diag[i],
+            )
+        else:
+            value = _push_bar(
+                0, o[i], h[i], l[i], c[i], last, ring, sums, counts, scratch,
+                min_pt, sign, 3,
+            )
+        if (row0 + i) % step == 0 and counts[0, 0] >= need:
+            out[i] = value
+        else:
+            out[i] = np.nan
+            if with_diag:
+                if (row0 + i) % step != 0:
+                    diag[i, N_COMPONENTS - 1] = REASON_NOT_EVALUATED
+                else:
+                    diag[i, N_COMPONENTS - 1] = REASON_INSUFFICIENT_BARS
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _seed_window(o, h, l, c, seen, last, ring, sums, counts):
+    """
+    `_rolling_pass` state right after a sum rebuild.
+
+    ``o``/``h``/``l``/``c`` are the ``W`` bars (W = ring width) preceding the
+    rebuild point and ``seen`` the bars of the session consumed so far (a
+    multiple of W, at least 2W): the ring holds their log prices oldest
+    first, the cursor is at slot 0 and the sums are rebuilt from the ring,
+    exactly as the serial pass leaves them.
+    """
+    W = ring.shape[1]
+    for j in range(W):
+        ring[0, j, 0] = _log_price(o[j])
+        ring[0, j, 1] = _log_price(h[j])
+        ring[0, j, 2] = _log_price(l[j])
+        ring[0, j, 3] = _log_price(c[j])
+    for k in range(4):
+        last[0, k] = ring[0, W - 1, k]
+    counts[0, 0] = seen
+    counts[0, 1] = 0
+    _rebuild_sums(ring[0], sums[0], np.empty(N_MOMENTS))
+
+
+def _chunk_bounds(starts: np.ndarray, window: int, n_chunks: int) -> np.ndarray:
+    """
+    Chunk edges near ``n_chunks`` equal parts where the pass can restart.
+
+    An edge is either a session start or a session position that is a
+    multiple of ``window`` and at least ``2 * window`` (a sum rebuild point).
+    """
+    n = len(starts)
+    session = np.flatnonzero(starts)
+    bounds = [0]
+    for target in np.linspace(0, n, n_chunks + 1)[1:-1].astype(np.int64):
+        i = np.searchsorted(session, target, side="right") - 1
+        q = target - session[i]
+        if q:
+            q = max(2 * window, -(-q // window) * window)
+        edge = session[i] + q
+        if i + 1 < len(session):
+            edge = min(edge, session[i + 1])
+        if bounds[-1] < edge < n:
+            bounds.append(int(edge))
+    bounds.append(n)
+    return np.asarray(bounds, dtype=np.int64)
+
+
+def _rolling_chunk(shm_name, layout, a, b, seen, window, step, need, sign):
+    """Worker: run rows ``[a, b)`` of the shared buffers, ``seen`` bars into their session."""
+    shm = _shm.attach(shm_name)
+    try:
+        arrays = _shm.views(shm, layout)
+        o, h, l, c = (arrays[k] for k in ("open", "high", "low", "close"))
+        state = EdgeRollingState(window, sign, step, need)
+        if seen:
+            _seed_window(
+                o[a - window:a], h[a - window:a], l[a - window:a], c[a - window:a],
+                seen, state._last, state._ring, state._sums, state._counts,
+            )
+        diag = arrays["diag"][a:b] if "diag" in arrays else np.empty((0, N_COMPONENTS))
+        _rolling_pass(
+            o[a:b], h[a:b], l[a:b], c[a:b], arrays["starts"][a:b], a, step, need, 1e-6,
+            sign, state._last, state._ring, state._sums, state._counts,
+            arrays["out"][a:b], diag,
+        )
+        del arrays, o, h, l, c, diag
+    finally:
+        _shm.release(shm)
+
+
+def _parallel_pass(df_proc: pd.DataFrame, starts: np.ndarray, state: "EdgeRollingState",
+                   diag: np.ndarray, n_jobs: int) -> np.ndarray:
+    """`EdgeRollingState._run` of a fresh state, split over ``n_jobs`` processes."""
+    n = len(df_proc)
+    bounds = _chunk_bounds(starts, state.window, n_jobs)
+    if len(bounds) <= 2:
+        return state._run(df_proc, starts, diag)
+    specs = {k: ((n,), np.float64) for k in ("open", "high", "low", "close", "out")}
+    specs["starts"] = ((n,), np.bool_)
+    if diag.shape[0]:
+        specs["diag"] = (diag.shape, np.float64)
+    shm, layout = _shm.create(specs)
+    try:
+        arrays = _shm.views(shm, layout)
+        for k in ("open", "high", "low", "close"):
+            arrays[k][:] = df_proc[k].to_numpy(dtype=np.float64)
+        arrays["starts"][:] = starts
+        session = np.flatnonzero(starts)
+        first = session[np.searchsorted(session, bounds[:-1], side="right") - 1]
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(bounds) - 1)) as pool:
+            futures = [
+                pool.submit(
+                    _rolling_chunk, shm.name, layout, int(a), int(b), int(a - s0),
+                    state.window, state.step, state.need, state.sign,
+                )
+                for a, b, s0 in zip(bounds[:-1], bounds[1:], first)
+            ]
+            for future in futures:
+                future.result()
+        out = arrays["out"].copy()
+        if diag.shape[0]:
+            diag[:] = arrays["diag"]
+        del arrays
+    finally:
+        _shm.release(shm, unlink=True)
+    state.rows = n
+    return out
+
+
+def _session_starts(df: pd.DataFrame, sessions=None, segment_by=None) -> np.ndarray:
+    """Boolean array marking the first row of each session (row 0 always)."""
+    n = len(df)
+    starts = np.zeros(n, dtype=np.bool_)
+    if n:
+        starts[0] = True
+    if sessions is not None and segment_by is not None:
+        raise ValueError("Specify at most one of sessions and segment_by.")
+
+    if segment_by is not None:
+        if isinstance(segment_by, str):
+            labels = df[segment_by]
+        else:
+            labels = pd.Series(np.asarray(segment_by), index=df.index)
+        if len(labels) != n:
+            raise ValueError("segment_by must have one label per row.")
+        codes = pd.factorize(labels)[0]
+        starts[1:] |= codes[1:] != codes[:-1]
+    elif isinstance(sessions, (str, pd.DateOffset, pd.Timedelta)):
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("Calendar or gap sessions require a DatetimeIndex.")
+        index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        if isinstance(sessions, pd.Timedelta):
+            # A gap longer than ``sessions`` between two bars opens a new session.
+            starts[1:] |= np.asarray((index[1:] - index[:-1]) > sessions)
+        else:
+            codes = index.to_period(sessions).asi8
+            starts[1:] |= codes[1:] != codes[:-1]
+    elif sessions is not None:
+        offsets = np.asarray(sessions, dtype=np.int64)
+        if len(offsets) and (offsets.min() < 0 or offsets.max() >= n):
+            raise ValueError("Session offsets must be valid row positions.")
+        starts[offsets] = True
+    return starts
+
+
+def _diagnostics_frame(spread: np.ndarray, diag: np.ndarray, index: pd.Index) -> pd.DataFrame:
+    """Estimates plus one column per estimator component."""
+    frame = pd.DataFrame(diag, index=index, columns=list(COMPONENTS))
+    frame.insert(0, "spread", spread)
+    frame["n_obs"] = frame["n_obs"].astype(np.int64)
+    frame["reason"] = frame["reason"].astype(np.int8)
+    return frame
 
-# Import the core, fast estimator
-from .edge import edge as edge_single
 
 def edge_rolling(
     df: pd.DataFrame,
@@ -22,43 +250,214 @@ def edge_rolling(
     sign: bool = False,
     step: int = 1,
     min_periods: int = None,
+    sessions=None,
+    segment_by=None,
+    return_diagnostics: bool = False,
+    n_jobs: Optional[int] = None,
     **kwargs, # Accept other kwargs to match test signature
-) -> pd.Series:
+) -> Union[pd.Series, pd.DataFrame]:
     """
-    Computes rolling EDGE estimates using a fast loop that calls the core estimator.
+    Computes rolling EDGE estimates in a single compiled pass.
+
+    Args:
+        df : pd.DataFrame
+            OHLC data (columns 'open', 'high', 'low', 'close').
+        window : int
+            Number of bars per window (>= 3). An estimate needs a full window.
+        sign : bool, default False
+            If True, returns signed estimates.
+        step : int, default 1
+            Evaluate every ``step``-th row only (others are NaN), as in pandas.
+        min_periods : int, optional
+            Minimum bars seen (per session) before an estimate; defaults to
+            ``window``.
+        sessions : str, pd.DateOffset, pd.Timedelta or sequence of int, optional
+            Session boundaries: a calendar rule applied to the (wall-clock)
+            DatetimeIndex (e.g. ``"D"``), a maximum gap between consecutive
+            bars, or the row offsets where sessions start.
+        segment_by : str or array-like, optional
+            Column name or per-row labels (e.g. ``df.index.date``); a new
+            session starts wherever the label changes.
+        return_diagnostics : bool, default False
+            If True, returns a DataFrame with the estimate (``spread``) and,
+            for every window, the components of `edge_components` computed
+            in the same pass; rows skipped by ``step`` have ``reason``
+            ``"not_evaluated"``.
+        n_jobs : int, optional
+            Worker processes for long series (-1: one per CPU). The series
+            is split into chunks that restart exactly where the serial pass
+            rebuilds its sums, computed over shared memory; the result is
+            bit-identical to the serial one. Worth it from a few million
+            bars; the default runs in-process.
+
+    With ``sessions`` or ``segment_by``, transitions across a boundary are
+    masked and windows restart at each session, so the first ``window - 1``
+    rows of every session have no estimate.
+
+    Examples:
+        >>> spreads = edge_rolling(df, window=30, sessions="D")
     """
 
     # --- 1. Validation ---
     if not isinstance(window, int) or window < 3:
         raise ValueError("Window must be an integer >= 3.")
+    if not isinstance(step, int) or step < 1:
+        raise ValueError("Step must be a positive integer.")
+    if n_jobs is not None and (not isinstance(n_jobs, int) or n_jobs == 0 or n_jobs < -1):
+        raise ValueError("n_jobs must be a positive integer or -1.")
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
     if min_periods is None:
         min_periods = window
     # The core estimator needs at least 3 data points to work.
     min_periods = max(3, min_periods)
 
     # --- 2. Data Preparation ---
-    df_proc = df.rename(columns=str.lower).copy()
-    open_p = df_proc["open"].values
-    high_p = df_proc["high"].values
-    low_p = df_proc["low"].values
-    close_p = df_proc["close"].values
+    t = timing._start()
+    df_proc = df.rename(columns=str.lower)
+    t = timing._lap("edge_rolling.prepare", t)
+    starts = _session_starts(df, sessions, segment_by)
+    t = timing._lap("edge_rolling.sessions", t)
+
+    # --- 3. Single compiled pass over running moment sums ---
+    state = EdgeRollingState(window, sign, step, max(window, min_periods))
+    diag = np.empty((len(df_proc) if return_diagnostics else 0, N_COMPONENTS))
+    if n_jobs is not None and n_jobs > 1:
+        estimates = _parallel_pass(df_proc, starts, state, diag, n_jobs)
+    else:
+        estimates = state._run(df_proc, starts, diag)
+    t = timing._lap("edge_rolling.kernel", t)
+    if return_diagnostics:
+        result = _diagnostics_frame(estimates, diag, df_proc.index)
+    else:
+        result = pd.Series(estimates, index=df_proc.index, name=f"EDGE_rolling_{window}")
+    timing._lap("edge_rolling.series", t)
+    return result
 
-    n = len(df_proc)
-    estimates = np.full(n, np.nan)
-
-    # --- 3. Loop and Apply (This logic now perfectly matches the test) ---
-    for i in range(0, n, step):
-        t1 = i + 1
-        t0 = t1 - window
-
-        # Only calculate if the window is full enough
-        if t1 >= min_periods and t0 >= 0:
-            estimates[i] = edge_single(
-                open_p[t0:t1],
-                high_p[t0:t1],
-                low_p[t0:t1],
-                close_p[t0:t1],
-                sign=sign,
-            )
 
-    return pd.Series(estimates, index=df_proc.index, name=f"EDGE_rolling_{window}")
\ No newline at end of file
+class EdgeRollingState:
+    """
+    Tail state of a rolling EDGE computation, for appending new bars.
+
+    Holds the log prices of the last ``window`` bars, the running moment
+    sums and the position in the series (plus the last index value and
+    session label when sessions are used): O(window) memory however long the
+    history. Instances are plain Python objects and can be pickled.
+    """
+
+    def __init__(self, window: int, sign: bool, step: int, need: int,
+                 sessions=None, segment_by: Optional[str] = None):
+        self.window = window
+        self.sign = sign
+        self.step = step
+        self.need = need
+        self.sessions = sessions
+        self.segment_by = segment_by
+        self.rows = 0
+        self.last_index = None
+        self.last_label = None
+        self._last = np.full((1, 4), np.nan)
+        self._ring = np.zeros((1, window, 4))
+        self._sums = np.zeros((1, N_MOMENTS))
+        self._counts = np.zeros((1, 2), dtype=np.int64)
+
+    def copy(self) -> "EdgeRollingState":
+        new = copy.copy(self)
+        new._last = self._last.copy()
+        new._ring = self._ring.copy()
+        new._sums = self._sums.copy()
+        new._counts = self._counts.copy()
+        return new
+
+    def _starts(self, df: pd.DataFrame) -> np.ndarray:
+        """Session starts of ``df`` given the bars already consumed."""
+        if self.rows == 0:
+            return _session_starts(df, self.sessions, self.segment_by)
+        if self.sessions is None and self.segment_by is None:
+            return np.zeros(len(df), dtype=np.bool_)
+        # Prepend the previous last row so the first new bar is compared with it.
+        head = pd.DataFrame(index=pd.Index([self.last_index]).append(df.index))
+        if self.segment_by is not None:
+            head[self.segment_by] = [self.last_label, *df[self.segment_by]]
+        return _session_starts(head, self.sessions, self.segment_by)[1:]
+
+    def _run(self, df_proc: pd.DataFrame, starts: np.ndarray, diag=None) -> np.ndarray:
+        out = np.empty(len(df_proc))
+        if diag is None:
+            diag = np.empty((0, N_COMPONENTS))
+        _rolling_pass(
+            df_proc["open"].to_numpy(dtype=np.float64),
+            df_proc["high"].to_numpy(dtype=np.float64),
+            df_proc["low"].to_numpy(dtype=np.float64),
+            df_proc["close"].to_numpy(dtype=np.float64),
+            starts, self.rows, self.step, self.need, 1e-6, self.sign,
+            self._last, self._ring, self._sums, self._counts, out, diag,
+        )
+        self.rows += len(df_proc)
+        return out
+
+
+def edge_rolling_update(
+    state: Optional[EdgeRollingState],
+    new_bars: pd.DataFrame,
+    window: Optional[int] = None,
+    sign: bool = False,
+    step: int = 1,
+    min_periods: Optional[int] = None,
+    sessions=None,
+    segment_by: Optional[str] = None,
+) -> Tuple[pd.Series, EdgeRollingState]:
+    """
+    Append bars to a rolling EDGE computation in O(len(new_bars)).
+
+    Args:
+        state : EdgeRollingState or None
+            State returned by a previous call, or None to start a new series
+            (then ``window`` and the other options apply, as in
+            `edge_rolling`; later calls take them from the state).
+        new_bars : pd.DataFrame
+            OHLC bars following the ones already consumed.
+        sessions : str, pd.DateOffset or pd.Timedelta, optional
+            Calendar rule or maximum gap, as in `edge_rolling`.
+        segment_by : str, optional
+            Column with session labels, as in `edge_rolling`.
+
+    Returns:
+        (pd.Series, EdgeRollingState)
+            Estimates for ``new_bars`` only, and the updated state (the
+            input state is left unchanged). Chaining calls gives exactly the
+            values of one `edge_rolling` call over the concatenated bars.
+
+    Examples:
+        >>> history, state = edge_rolling_update(None, df, window=21)
+        >>> tonight, state = edge_rolling_update(state, new_day)
+    """
+    if state is None:
+        if not isinstance(window, int) or window < 3:
+            raise ValueError("Window must be an integer >= 3.")
+        if not isinstance(step, int) or step < 1:
+            raise ValueError("Step must be a positive integer.")
+        if sessions is not None and not isinstance(sessions, (str, pd.DateOffset, pd.Timedelta)):
+            raise ValueError("Incremental updates support calendar or gap sessions only.")
+        if segment_by is not None and not isinstance(segment_by, str):
+            raise ValueError("Incremental updates need segment_by as a column name.")
+        min_periods = max(3, window if min_periods is None else min_periods)
+        state = EdgeRollingState(
+            window, sign, step, max(window, min_periods), sessions, segment_by
+        )
+    else:
+        state = state.copy()
+    t = timing._start()
+    df_proc = new_bars.rename(columns=str.lower)
+    t = timing._lap("edge_rolling_update.prepare", t)
+    starts = state._starts(new_bars)
+    t = timing._lap("edge_rolling_update.sessions", t)
+    estimates = state._run(df_proc, starts)
+    t = timing._lap("edge_rolling_update.kernel", t)
+    if len(new_bars):
+        state.last_index = new_bars.index[-1]
+        if state.segment_by is not None:
+            state.last_label = new_bars[state.segment_by].iloc[-1]
+    result = pd.Series(estimates, index=df_proc.index, name=f"EDGE_rolling_{state.window}")
+    timing._lap("edge_rolling_update.series", t)
+    return result, state
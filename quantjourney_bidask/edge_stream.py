@@ -0,0 +1,102 @@
+"""
+Streaming EDGE estimator.
+
+Maintains the moment sums of the EDGE estimator over a sliding (or
+expanding) window of bars, so that each new bar updates the estimate in
+constant time instead of re-running `edge` over the whole window. Results
+match `edge` / `edge_rolling` / `edge_expanding` to floating-point rounding.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+from typing import Optional
+
+import numpy as np
+
+from ._moments import N_MOMENTS, _push_bar, _push_bars
+
+
+class EdgeStream:
+    """
+    Incremental EDGE spread estimate over the most recent bars.
+
+    Args:
+        window : int, optional
+            Number of bars in the sliding window (>= 3). If None, the
+            estimate expands over every bar seen so far.
+        sign : bool, default False
+            If True, returns signed estimates.
+        min_pt : float, default 1e-6
+            Minimum probability threshold for tau, as in `edge`.
+        min_periods : int, optional
+            Minimum number of bars before an estimate is returned. Defaults
+            to ``window`` (or 3 for an expanding window); never below 3.
+
+    Examples:
+        >>> stream = EdgeStream(window=21)
+        >>> for o, h, l, c in bars:
+        ...     spread = stream.update(o, h, l, c)
+    """
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        sign: bool = False,
+        min_pt: float = 1e-6,
+        min_periods: Optional[int] = None,
+    ):
+        if window is not None and (not isinstance(window, int) or window < 3):
+            raise ValueError("Window must be an integer >= 3.")
+        if min_periods is None:
+            min_periods = window if window is not None else 3
+        self.window = window
+        self.sign = sign
+        self.min_pt = min_pt
+        self.min_periods = max(3, min_periods)
+        self.reset()
+
+    def reset(self):
+        """Forget all bars."""
+        w = 0 if self.window is None else self.window
+        self._last = np.full((1, 4), np.nan)
+        self._ring = np.zeros((1, w, 4))
+        self._sums = np.zeros((1, N_MOMENTS))
+        self._counts = np.zeros((1, 2), dtype=np.int64)
+        self._scratch = np.empty(N_MOMENTS)
+        self.value = np.nan
+
+    @property
+    def n_bars(self) -> int:
+        """Number of bars pushed since creation or the last `reset`."""
+        return int(self._counts[0, 0])
+
+    def update(self, open_price: float, high: float, low: float, close: float) -> float:
+        """Add one bar and return the current spread estimate."""
+        self.value = _push_bar(
+            0, float(open_price), float(high), float(low), float(close),
+            self._last, self._ring, self._sums, self._counts, self._scratch,
+            self.min_pt, self.sign, self.min_periods,
+        )
+        return self.value
+
+    def update_many(self, open_prices, high, low, close) -> np.ndarray:
+        """Add a batch of bars in order; returns the estimate after each bar."""
+        o = np.ascontiguousarray(open_prices, dtype=np.float64)
+        h = np.ascontiguousarray(high, dtype=np.float64)
+        l = np.ascontiguousarray(low, dtype=np.float64)  # noqa: E741
+        c = np.ascontiguousarray(close, dtype=np.float64)
+        n = len(o)
+        if not (len(h) == n and len(l) == n and len(c) == n):
+            raise ValueError("Input arrays must have the same length.")
+        out = np.empty(n)
+        _push_bars(
+            np.zeros(n, dtype=np.int64), o, h, l, c,
+            self._last, self._ring, self._sums, self._counts,
+            self.min_pt, self.sign, self.min_periods, out,
+        )
+        if n:
+            self.value = out[-1]
+        return out
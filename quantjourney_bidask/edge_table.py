@@ -0,0 +1,136 @@
+"""
+Rolling EDGE estimates that accept revised bars.
+
+Exchanges sometimes revise a candle after it was first published. Bar ``i``
+only enters the transitions ``i-1 -> i`` and ``i -> i+1``, so only the
+``window`` rolling estimates ending at rows ``i .. i+window-1`` can change.
+`EdgeRollingTable` keeps the full history in an `EdgeIndex`, updates its
+segment tree in O(log n) per revision, and recomputes just those windows by
+sliding one set of moment sums across them in O(window), instead of
+re-running `edge_rolling` over the whole series.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numba import jit
+
+from ._moments import N_MOMENTS, _finalize, _spread_from_moments, _transition_moments
+from .edge_index import EdgeIndex
+from .edge_rolling import edge_rolling
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _repair_windows(bars, i, window, need, min_pt, sign, out):
+    """Recompute ``out[t]`` for the windows ending at t = i .. i+window-1."""
+    n = bars.shape[0]
+    t1 = min(n - 1, i + window - 1)
+    acc = np.zeros(N_MOMENTS)
+    scratch = np.empty(N_MOMENTS)
+    for j in range(max(0, i - window + 1), i):
+        _transition_moments(
+            bars[j, 0], bars[j, 1], bars[j, 2], bars[j, 3],
+            bars[j + 1, 0], bars[j + 1, 1], bars[j + 1, 2], bars[j + 1, 3],
+            scratch,
+        )
+        for k in range(N_MOMENTS):
+            acc[k] += scratch[k]
+    for t in range(i, t1 + 1):
+        if t > i:
+            # Slide: the transition into bar t enters, the one out of bar
+            # t - window leaves.
+            _transition_moments(
+                bars[t - 1, 0], bars[t - 1, 1], bars[t - 1, 2], bars[t - 1, 3],
+                bars[t, 0], bars[t, 1], bars[t, 2], bars[t, 3],
+                scratch,
+            )
+            for k in range(N_MOMENTS):
+                acc[k] += scratch[k]
+            j = t - window
+            if j >= 0:
+                _transition_moments(
+                    bars[j, 0], bars[j, 1], bars[j, 2], bars[j, 3],
+                    bars[j + 1, 0], bars[j + 1, 1], bars[j + 1, 2], bars[j + 1, 3],
+                    scratch,
+                )
+                for k in range(N_MOMENTS):
+                    acc[k] -= scratch[k]
+        if t + 1 >= need:
+            out[t] = _finalize(_spread_from_moments(acc, min_pt), sign)
+        else:
+            out[t] = np.nan
+
+
+class EdgeRollingTable:
+    """
+    Rolling EDGE estimates of one symbol that can be corrected in place.
+
+    Args:
+        df : pd.DataFrame
+            OHLC data (columns 'open', 'high', 'low', 'close'), sorted by its
+            index.
+        window : int
+            Number of bars per window (>= 3), as in `edge_rolling`.
+        sign : bool, default False
+            If True, keeps signed estimates.
+        min_periods : int, optional
+            Minimum bars before an estimate, as in `edge_rolling`.
+        block_size : int, default 64
+            Leaf size of the underlying `EdgeIndex`.
+
+    Examples:
+        >>> table = EdgeRollingTable(df, window=21)
+        >>> changed = table.correct(ts, open_, high, low, close)  # revised candle
+        >>> table.estimates
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        window: int,
+        sign: bool = False,
+        min_periods: Optional[int] = None,
+        block_size: int = 64,
+    ):
+        values = edge_rolling(df, window=window, sign=sign, min_periods=min_periods)
+        self.window = window
+        self.sign = sign
+        self._need = max(window, 3 if min_periods is None else max(3, min_periods))
+        self.edge_index = EdgeIndex(df, block_size=block_size)
+        self._values = values.to_numpy(copy=True)
+        self._name = values.name
+        self.corrections = 0
+
+    @property
+    def estimates(self) -> pd.Series:
+        """Current rolling estimates, aligned with the input index."""
+        return pd.Series(self._values.copy(), index=self.edge_index.index, name=self._name)
+
+    def correct(self, label, open_price: float, high: float, low: float, close: float) -> pd.Series:
+        """Replace the bar at index ``label``; returns the estimates that were recomputed."""
+        i = self.edge_index.index.get_loc(label)
+        if not isinstance(i, (int, np.integer)):
+            raise KeyError(f"Label is not unique: {label}")
+        return self.correct_iloc(int(i), open_price, high, low, close)
+
+    def correct_iloc(self, i: int, open_price: float, high: float, low: float, close: float) -> pd.Series:
+        """Replace bar ``i`` (position); returns the estimates that were recomputed."""
+        n = len(self._values)
+        if i < 0:
+            i += n
+        self.edge_index.update_bar(i, open_price, high, low, close)
+        _repair_windows(
+            self.edge_index._bars, i, self.window, self._need,
+            self.edge_index.min_pt, self.sign, self._values,
+        )
+        self.corrections += 1
+        stop = min(n, i + self.window)
+        return pd.Series(
+            self._values[i:stop].copy(), index=self.edge_index.index[i:stop], name=self._name
+        )
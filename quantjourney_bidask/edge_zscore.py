@@ -0,0 +1,321 @@
+"""
+Online z-scores of EDGE spread estimates and liquidity-risk flags.
+
+Computes rolling EDGE spreads and, in the same compiled pass, a causal
+z-score of each estimate over a trailing window that includes the current
+estimate: a fixed number of estimates (Welford updates with removal), an
+exponentially weighted window (incremental EW mean/variance) or all
+estimates so far (expanding Welford).
+Unlike a full-sample z-score, every value only uses data available at that
+bar, so the same numbers come out in a backtest and in a live feed.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from numba import jit
+
+from ._moments import N_COMPONENTS, N_MOMENTS, _push_bar, _push_bar_components
+from .edge_rolling import _diagnostics_frame
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _z_push(s, x, zring, zstats, zcounts, alpha, min_periods):
+    """
+    Add spread ``x`` to the z-score state of series ``s``; returns its z-score.
+
+    ``zstats`` (S, 3) holds (n, mean, M2) for Welford windows and
+    (n, mean, var) for EWM (``alpha > 0``). ``zring`` (S, W) keeps the last W
+    estimates of a rolling window (W = 0 for expanding or EWM); ``zcounts``
+    (S, 2) counts estimates seen and the ring cursor.
+    """
+    n = zstats[s, 0]
+    mean = zstats[s, 1]
+    m2 = zstats[s, 2]
+    valid = x == x
+    if alpha > 0.0:
+        if valid:
+            if n == 0.0:
+                mean = x
+                m2 = 0.0
+            else:
+                diff = x - mean
+                incr = alpha * diff
+                mean += incr
+                m2 = (1.0 - alpha) * (m2 + diff * incr)
+            n += 1.0
+        var = m2
+    else:
+        W = zring.shape[1]
+        if W > 0:
+            pos = zcounts[s, 1]
+            if zcounts[s, 0] >= W:
+                old = zring[s, pos]
+                if old == old:
+                    n -= 1.0
+                    if n == 0.0:
+                        mean = 0.0
+                        m2 = 0.0
+                    else:
+                        d = old - mean
+                        mean -= d / n
+                        m2 -= d * (old - mean)
+                        if m2 < 0.0:
+                            m2 = 0.0
+            zring[s, pos] = x
+            zcounts[s, 1] = 0 if pos + 1 == W else pos + 1
+        if valid:
+            n += 1.0
+            d = x - mean
+            mean += d / n
+            m2 += d * (x - mean)
+        var = m2 / (n - 1.0) if n > 1.0 else np.nan
+    zcounts[s, 0] += 1
+    zstats[s, 0] = n
+    zstats[s, 1] = mean
+    zstats[s, 2] = m2
+
+    if not valid or n < min_periods or not var > 0.0:
+        return np.nan
+    return (x - mean) / np.sqrt(var)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _edge_z_many(
+    sid, o, h, l, c,
+    last, ring, sums, counts, min_pt, sign, min_periods,
+    zring, zstats, zcounts, alpha, z_min_periods,
+    out_spread, out_z, diag,
+):
+    """
+    Fused pass: push each bar into its series' EDGE window and z-score state.
+
+    If ``diag`` has rows, row ``i`` receives the estimator components of
+    the window ending at bar ``i``.
+    """
+    scratch = np.empty(N_MOMENTS)
+    with_diag = diag.shape[0] > 0
+    for i in range(sid.shape[0]):
+        s = sid[i]
+        if with_diag:
+            spread = _push_bar_components(
+                s, o[i], h[i], l[i], c[i], last, ring, sums, counts, scratch,
+                min_pt, sign, min_periods, diag[i],
+            )
+        else:
+            spread = _push_bar(
+                s, o[i], h[i], l[i], c[i], last, ring, sums, counts, scratch,
+                min_pt, sign, min_periods,
+            )
+        out_spread[i] = spread
+        out_z[i] = _z_push(s, spread, zring, zstats, zcounts, alpha, z_min_periods)
+
+
+class EdgeZScore:
+    """
+    Streaming EDGE spread, z-score and risk flag for one or many symbols.
+
+    Args:
+        symbols : sequence of str, default ("",)
+            Symbols tracked (case-insensitive); one unnamed series by default.
+        window : int, default 24
+            Rolling window (bars) of the EDGE estimate (>= 3).
+        zscore_window : int, optional
+            Number of trailing estimates for the z-score mean/std. Mutually
+            exclusive with ``halflife``; if neither is given, all estimates
+            so far are used (expanding).
+        halflife : float, optional
+            Half-life (in estimates) of an exponentially weighted mean/std.
+        threshold : float, default 2.0
+            Z-score above which ``risk_flag`` is raised.
+        sign : bool, default False
+            If True, uses signed spread estimates.
+        zscore_min_periods : int, optional
+            Minimum estimates before a z-score is returned. Defaults to
+            ``zscore_window`` for a rolling window and 2 otherwise.
+        min_pt : float, default 1e-6
+            Minimum probability threshold for tau, as in `edge`.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str] = ("",),
+        window: int = 24,
+        zscore_window: Optional[int] = None,
+        halflife: Optional[float] = None,
+        threshold: float = 2.0,
+        sign: bool = False,
+        zscore_min_periods: Optional[int] = None,
+        min_pt: float = 1e-6,
+    ):
+        if not isinstance(window, int) or window < 3:
+            raise ValueError("Window must be an integer >= 3.")
+        if zscore_window is not None and halflife is not None:
+            raise ValueError("Specify at most one of zscore_window and halflife.")
+        if zscore_window is not None and (not isinstance(zscore_window, int) or zscore_window < 2):
+            raise ValueError("zscore_window must be an integer >= 2.")
+        if halflife is not None and halflife <= 0:
+            raise ValueError("halflife must be positive.")
+        self.symbols = [s.upper() for s in symbols]
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.window = window
+        self.zscore_window = zscore_window
+        self.halflife = halflife
+        self.threshold = threshold
+        self.sign = sign
+        self.min_pt = min_pt
+        if zscore_min_periods is None:
+            zscore_min_periods = zscore_window if zscore_window is not None else 2
+        self.zscore_min_periods = max(2, zscore_min_periods)
+        self._alpha = 0.0 if halflife is None else 1.0 - np.exp(-np.log(2.0) / halflife)
+        self.reset()
+
+    def reset(self):
+        """Forget all bars."""
+        n = len(self.symbols)
+        self._last = np.full((n, 4), np.nan)
+        self._ring = np.zeros((n, self.window, 4))
+        self._sums = np.zeros((n, N_MOMENTS))
+        self._counts = np.zeros((n, 2), dtype=np.int64)
+        self._zring = np.full((n, self.zscore_window or 0), np.nan)
+        self._zstats = np.zeros((n, 3))
+        self._zcounts = np.zeros((n, 2), dtype=np.int64)
+
+    def update(
+        self, symbol: str, open_price: float, high: float, low: float, close: float
+    ) -> Tuple[float, float, bool]:
+        """Add one bar; returns (spread, z-score, risk flag) for ``symbol``."""
+        spread, z = self.update_many(
+            [self._id(symbol)], [open_price], [high], [low], [close]
+        )
+        return spread[0], z[0], bool(z[0] > self.threshold)
+
+    def update_many(
+        self, symbols, open_prices, high, low, close, return_diagnostics: bool = False
+    ) -> Union[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Add a batch of bars in order for any mix of symbols (names or integer
+        positions). Returns the spread and z-score after each bar, plus an
+        (n, len(COMPONENTS)) array of estimator components with
+        ``return_diagnostics=True`` (see `edge_components`).
+        """
+        arr = np.asarray(symbols)
+        if arr.dtype.kind in "iu":
+            sid = arr.astype(np.int64)
+            if len(sid) and (sid.min() < 0 or sid.max() >= len(self.symbols)):
+                raise IndexError("Symbol id out of range.")
+        else:
+            sid = np.fromiter((self._id(s) for s in arr), dtype=np.int64, count=len(arr))
+        o = np.ascontiguousarray(open_prices, dtype=np.float64)
+        h = np.ascontiguousarray(high, dtype=np.float64)
+        l = np.ascontiguousarray(low, dtype=np.float64)  # noqa: E741
+        c = np.ascontiguousarray(close, dtype=np.float64)
+        n = len(sid)
+        if not (len(o) == len(h) == len(l) == len(c) == n):
+            raise ValueError("Input arrays must have the same length.")
+        spread = np.empty(n)
+        z = np.empty(n)
+        diag = np.empty((n if return_diagnostics else 0, N_COMPONENTS))
+        _edge_z_many(
+            sid, o, h, l, c,
+            self._last, self._ring, self._sums, self._counts,
+            self.min_pt, self.sign, self.window,
+            self._zring, self._zstats, self._zcounts,
+            self._alpha, self.zscore_min_periods,
+            spread, z, diag,
+        )
+        if return_diagnostics:
+            return spread, z, diag
+        return spread, z
+
+    def _id(self, symbol: str) -> int:
+        try:
+            return self.index[symbol.upper()]
+        except KeyError:
+            raise KeyError(f"Unknown symbol: {symbol}") from None
+
+
+def edge_zscore(
+    df: pd.DataFrame,
+    window: int,
+    zscore_window: Optional[int] = None,
+    halflife: Optional[float] = None,
+    threshold: float = 2.0,
+    sign: bool = False,
+    zscore_min_periods: Optional[int] = None,
+    by: Optional[str] = None,
+    return_diagnostics: bool = False,
+) -> pd.DataFrame:
+    """
+    Rolling EDGE spreads with causal z-scores and liquidity-risk flags.
+
+    Args:
+        df : pd.DataFrame
+            OHLC data (columns 'open', 'high', 'low', 'close'), in time
+            order. A long panel of several symbols is supported via ``by``.
+        window : int
+            Rolling window (bars) of the EDGE estimate (>= 3).
+        zscore_window : int, optional
+            Trailing estimates used for the z-score; see `EdgeZScore`.
+        halflife : float, optional
+            Half-life for an exponentially weighted z-score instead.
+        threshold : float, default 2.0
+            Z-score above which ``risk_flag`` is True.
+        sign : bool, default False
+            If True, uses signed spread estimates.
+        zscore_min_periods : int, optional
+            Minimum estimates before a z-score is returned.
+        by : str, optional
+            Column holding the symbol of each row; each symbol gets its own
+            spread window and z-score state.
+        return_diagnostics : bool, default False
+            If True, adds the estimator components of every window (see
+            `edge_components`), computed in the same pass.
+
+    Returns:
+        pd.DataFrame
+            ``spread``, ``spread_zscore`` and ``risk_flag``, aligned with
+            ``df`` (followed by the component columns if requested).
+
+    Examples:
+        >>> risk = edge_zscore(df, window=24, zscore_window=168, threshold=2)
+        >>> risk[risk["risk_flag"]]
+    """
+    df_proc = df.rename(columns=str.lower)
+    if by is None:
+        symbols, codes = [""], np.zeros(len(df_proc), dtype=np.int64)
+    else:
+        codes, uniques = pd.factorize(df_proc[by.lower()].astype(str))
+        symbols, codes = list(uniques), codes.astype(np.int64)
+    engine = EdgeZScore(
+        symbols,
+        window=window,
+        zscore_window=zscore_window,
+        halflife=halflife,
+        threshold=threshold,
+        sign=sign,
+        zscore_min_periods=zscore_min_periods,
+    )
+    out = engine.update_many(
+        codes,
+        df_proc["open"].to_numpy(dtype=np.float64),
+        df_proc["high"].to_numpy(dtype=np.float64),
+        df_proc["low"].to_numpy(dtype=np.float64),
+        df_proc["close"].to_numpy(dtype=np.float64),
+        return_diagnostics=return_diagnostics,
+    )
+    spread, z = out[0], out[1]
+    result = pd.DataFrame(
+        {"spread": spread, "spread_zscore": z, "risk_flag": z > threshold},
+        index=df.index,
+    )
+    if return_diagnostics:
+        components = _diagnostics_frame(spread, out[2], df.index).drop(columns="spread")
+        result = pd.concat([result, components], axis=1)
+    return result
@@ -0,0 +1,314 @@
+"""
+Metrics for the streaming and monitoring layer, in Prometheus text format.
+
+A `MetricsRegistry` holds counters, gauges and fixed-bucket latency
+histograms, each with at most one label (typically ``symbol`` or
+``stage``). Recording is a bucket lookup and a few integer additions under
+a lock, so instruments can sit on per-bar paths. Gauges and counters can
+also be backed by a function read at scrape time (queue depth, drop
+counters kept elsewhere). `render` produces the Prometheus text exposition
+format and `MetricsServer` serves it from a stdlib HTTP server, so the
+output can be scraped or tested without any outside service.
+
+Latency stages recorded by `data.realtime.RealtimeStream` and
+`LiveSpreadMonitor` (label ``stage`` of ``bidask_stage_latency_seconds``):
+
+- ``bar_build``: socket receive to bar handed to the worker queues
+- ``receive``: socket receive to bar taken by a callback worker
+- ``callback``: one stream callback
+- ``estimate``: monitor estimate update
+- ``alert``: monitor data/alert callbacks
+- ``ingest_to_estimate``: socket receive to monitor estimate available
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+from typing import Callable, Dict, Optional, Sequence
+
+# 1-2-5 progression from 1 microsecond to 10 seconds, in nanoseconds.
+DEFAULT_LATENCY_BUCKETS_NS = tuple(
+    m * 10 ** e for e in range(3, 10) for m in (1, 2, 5)
+) + (10 ** 10,)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+STAGE_LATENCY = "bidask_stage_latency_seconds"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, label: Optional[str] = None,  # noqa: A002
+                 fn: Optional[Callable[[], object]] = None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.fn = fn
+        self._lock = threading.Lock()
+
+    def _labels(self, value) -> str:
+        if self.label is None or value is None:
+            return ""
+        return f'{{{self.label}="{_escape(str(value))}"}}'
+
+    def _render(self):
+        yield f"# HELP {self.name} {_escape(self.help)}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+
+class Counter(_Metric):
+    """Monotonic count, optionally per label value (e.g. per symbol)."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, label=None, fn=None):  # noqa: A002
+        super().__init__(name, help, label, fn)
+        self._values: Dict[object, float] = {}
+
+    def inc(self, amount: float = 1, label=None):
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def value(self, label=None) -> float:
+        if self.fn is not None:
+            return self.fn()
+        return self._values.get(label, 0)
+
+    def _samples(self):
+        if self.fn is not None:
+            yield f"{self.name} {_format(self.fn())}"
+            return
+        with self._lock:
+            items = list(self._values.items())
+        for label, value in items:
+            yield f"{self.name}{self._labels(label)} {_format(value)}"
+
+
+class Gauge(Counter):
+    """Current value that can go up and down, or a function read at scrape time."""
+
+    kind = "gauge"
+
+    def set(self, value: float, label=None):
+        with self._lock:
+            self._values[label] = value
+
+
+class LatencyHistogram(_Metric):
+    """
+    Fixed-bucket latency histogram, optionally per label value (e.g. stage).
+
+    Observations are nanoseconds; buckets are exported in seconds as a
+    Prometheus histogram (cumulative ``_bucket``, ``_sum`` and ``_count``).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, label=None,  # noqa: A002
+                 buckets_ns: Sequence[int] = DEFAULT_LATENCY_BUCKETS_NS):
+        super().__init__(name, help, label)
+        self.buckets_ns = tuple(sorted(int(b) for b in buckets_ns))
+        self._series: Dict[object, list] = {}
+
+    def observe_ns(self, ns: int, label=None):
+        """Record one latency of ``ns`` nanoseconds."""
+        i = bisect.bisect_left(self.buckets_ns, ns)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [[0] * (len(self.buckets_ns) + 1), 0, 0]
+            series[0][i] += 1
+            series[1] += ns
+            series[2] += 1
+
+    @contextmanager
+    def time(self, label=None):
+        """Record the duration of a ``with`` block."""
+        t0 = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.observe_ns(perf_counter_ns() - t0, label)
+
+    def count(self, label=None) -> int:
+        series = self._series.get(label)
+        return 0 if series is None else series[2]
+
+    def quantile(self, q: float, label=None) -> float:
+        """Upper bound (seconds) of the bucket holding quantile ``q``; NaN if empty."""
+        with self._lock:
+            series = self._series.get(label)
+            if series is None or series[2] == 0:
+                return float("nan")
+            counts, total = list(series[0]), series[2]
+        rank = q * total
+        seen = 0
+        for bound, n in zip(self.buckets_ns, counts):
+            seen += n
+            if seen >= rank:
+                return bound / 1e9
+        return float("inf")
+
+    def _samples(self):
+        with self._lock:
+            items = [(label, list(s[0]), s[1], s[2]) for label, s in self._series.items()]
+        for label, counts, total_ns, count in items:
+            prefix = "" if self.label is None or label is None else (
+                f'{self.label}="{_escape(str(label))}",'
+            )
+            cumulative = 0
+            for bound, n in zip(self.buckets_ns, counts):
+                cumulative += n
+                yield f'{self.name}_bucket{{{prefix}le="{_format(bound / 1e9)}"}} {cumulative}'
+            yield f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}'
+            yield f"{self.name}_sum{self._labels(label)} {_format(total_ns / 1e9)}"
+            yield f"{self.name}_count{self._labels(label)} {count}"
+
+
+class MetricsRegistry:
+    """
+    Named metrics rendered together in Prometheus text format.
+
+    The ``counter``/``gauge``/``histogram`` methods return the existing
+    metric when the name is already registered, so several components can
+    share one registry and one latency histogram.
+
+    Examples:
+        >>> registry = MetricsRegistry()
+        >>> monitor = LiveSpreadMonitor(symbols, metrics=registry)
+        >>> stream = RealtimeStream(symbols, metrics=registry)
+        >>> server = MetricsServer(registry, port=9108).start()
+        >>> print(registry.render())
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}.")
+            return metric
+
+    def counter(self, name: str, help: str, label: Optional[str] = None,  # noqa: A002
+                fn: Optional[Callable[[], float]] = None) -> Counter:
+        return self._get_or_create(Counter, name, help, label, fn)
+
+    def gauge(self, name: str, help: str, label: Optional[str] = None,  # noqa: A002
+              fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._get_or_create(Gauge, name, help, label, fn)
+
+    def histogram(self, name: str, help: str, label: Optional[str] = None,  # noqa: A002
+                  buckets_ns: Sequence[int] = DEFAULT_LATENCY_BUCKETS_NS) -> LatencyHistogram:
+        return self._get_or_create(LatencyHistogram, name, help, label, buckets_ns)
+
+    def __getitem__(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric._render())
+        return "\n".join(lines) + "\n"
+
+
+def stage_latency(registry: MetricsRegistry) -> LatencyHistogram:
+    """The shared per-stage latency histogram of ``registry``."""
+    return registry.histogram(
+        STAGE_LATENCY, "Latency of each streaming/monitoring stage.", label="stage"
+    )
+
+
+class MetricsServer:
+    """
+    Serves ``registry.render()`` at ``/metrics`` from a background thread.
+
+    Args:
+        registry : MetricsRegistry
+            Metrics to expose.
+        host : str, default "127.0.0.1"
+            Interface to bind.
+        port : int, default 0
+            Port to bind; 0 picks a free port (see ``url``).
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 0):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802 - stdlib hook name
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # noqa: A002 - silence access log
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self) -> "MetricsServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
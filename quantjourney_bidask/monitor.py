@@ -0,0 +1,313 @@
+"""
+Live multi-symbol spread monitor.
+
+Keeps a rolling EDGE estimate for many symbols at once. All per-symbol state
+lives in struct-of-arrays buffers (a symbols x window ring of log OHLC bars
+plus the estimator's running moment sums), so a new bar updates its symbol's
+estimate in constant time without building any DataFrame.
+
+Updates may arrive from several threads (e.g. the `RealtimeStream` callback
+workers): the state change of each update is serialized by a lock, while
+the data/alert callbacks run outside it.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import logging
+import threading
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ._moments import N_MOMENTS, _push_bar, _push_bars
+from .metrics import MetricsRegistry, stage_latency
+
+logger = logging.getLogger(__name__)
+
+
+class LiveSpreadMonitor:
+    """
+    Rolling EDGE spread monitor for a fixed universe of symbols.
+
+    Args:
+        symbols : sequence of str
+            Symbols to monitor (case-insensitive).
+        window : int, default 20
+            Number of bars in each symbol's rolling window (>= 3).
+        sign : bool, default False
+            If True, keeps signed estimates.
+        min_pt : float, default 1e-6
+            Minimum probability threshold for tau, as in `edge`.
+        min_periods : int, optional
+            Minimum bars before a symbol has an estimate. Defaults to
+            ``window``; never below 3.
+        metrics : MetricsRegistry, optional
+            Registry receiving per-symbol update/NaN/alert counters and the
+            ``estimate``, ``alert`` and ``ingest_to_estimate`` latencies.
+
+    Examples:
+        >>> monitor = LiveSpreadMonitor(["BTCUSDT", "ETHUSDT"], window=20)
+        >>> monitor.set_alert_threshold("BTCUSDT", high_bps=10, low_bps=1)
+        >>> monitor.add_alert_callback(lambda alert: print(alert))
+        >>> fetcher.add_stream_callback(monitor.on_bar)
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        window: int = 20,
+        sign: bool = False,
+        min_pt: float = 1e-6,
+        min_periods: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        if not isinstance(window, int) or window < 3:
+            raise ValueError("Window must be an integer >= 3.")
+        self.symbols = [s.upper() for s in symbols]
+        if len(set(self.symbols)) != len(self.symbols):
+            raise ValueError("Symbols must be unique.")
+        self.index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.window = window
+        self.sign = sign
+        self.min_pt = min_pt
+        self.min_periods = max(3, window if min_periods is None else min_periods)
+
+        n = len(self.symbols)
+        self._last = np.full((n, 4), np.nan)
+        self._ring = np.zeros((n, window, 4))
+        self._sums = np.zeros((n, N_MOMENTS))
+        self._counts = np.zeros((n, 2), dtype=np.int64)
+        self._lock = threading.Lock()
+        self.spread = np.full(n, np.nan)
+        self.high_bps = np.full(n, np.inf)
+        self.low_bps = np.full(n, -np.inf)
+        self.updates = 0
+
+        self._data_callbacks: List[Callable[[Dict, Dict], None]] = []
+        self._alert_callbacks: List[Callable[[Dict], None]] = []
+
+        self.metrics = metrics
+        if metrics is not None:
+            self._m_updates = metrics.counter(
+                "bidask_monitor_updates_total", "Bars added to the spread monitor.", "symbol"
+            )
+            self._m_nan = metrics.counter(
+                "bidask_monitor_nan_estimates_total", "Bars whose spread estimate is NaN.", "symbol"
+            )
+            self._m_alerts = metrics.counter(
+                "bidask_monitor_alerts_total", "Spread threshold alerts raised.", "symbol"
+            )
+            self._m_latency = stage_latency(metrics)
+
+    # --- Configuration ---
+    def set_alert_threshold(
+        self,
+        symbol: str,
+        high_bps: Optional[float] = None,
+        low_bps: Optional[float] = None,
+    ):
+        """Alert when ``symbol``'s spread goes above ``high_bps`` or below ``low_bps``."""
+        i = self._id(symbol)
+        self.high_bps[i] = np.inf if high_bps is None else high_bps
+        self.low_bps[i] = -np.inf if low_bps is None else low_bps
+
+    def add_data_callback(self, callback: Callable[[Dict, Dict], None]):
+        """Register ``callback(candle_data, spread_data)``, called on every bar."""
+        if not callable(callback):
+            raise TypeError("Callback must be a callable function.")
+        self._data_callbacks.append(callback)
+
+    def add_alert_callback(self, callback: Callable[[Dict], None]):
+        """Register ``callback(alert_data)``, called when a threshold is breached."""
+        if not callable(callback):
+            raise TypeError("Callback must be a callable function.")
+        self._alert_callbacks.append(callback)
+
+    # --- Updates ---
+    def update(
+        self,
+        symbol: str,
+        open_price: float,
+        high: float,
+        low: float,
+        close: float,
+        timestamp=None,
+    ) -> float:
+        """Add one completed bar for ``symbol`` and return its new estimate."""
+        return self._update(self._id(symbol), open_price, high, low, close, timestamp)[0]
+
+    def _update(self, i, open_price, high, low, close, timestamp):
+        """`update` of symbol position ``i``; also returns when the estimate was ready."""
+        t0 = perf_counter_ns() if self.metrics is not None else 0
+        scratch = np.empty(N_MOMENTS)  # per call: the kernel runs without the GIL
+        with self._lock:
+            value = _push_bar(
+                i, float(open_price), float(high), float(low), float(close),
+                self._last, self._ring, self._sums, self._counts, scratch,
+                self.min_pt, self.sign, self.min_periods,
+            )
+            self.spread[i] = value
+            self.updates += 1
+        estimated_ns = 0
+        if self.metrics is not None:
+            estimated_ns = perf_counter_ns()
+            self._m_latency.observe_ns(estimated_ns - t0, "estimate")
+            self._m_updates.inc(1, self.symbols[i])
+            if value != value:
+                self._m_nan.inc(1, self.symbols[i])
+        if self._data_callbacks or self._alert_callbacks:
+            self._notify(i, open_price, high, low, close, timestamp, value)
+            if self.metrics is not None:
+                self._m_latency.observe_ns(perf_counter_ns() - estimated_ns, "alert")
+        return value, estimated_ns
+
+    def update_many(self, symbols, open_prices, high, low, close, timestamps=None) -> np.ndarray:
+        """
+        Add a batch of bars, in order, for any mix of symbols.
+
+        ``symbols`` may hold symbol names or integer positions in
+        ``self.symbols``. Returns the estimate after each bar.
+        """
+        sid = self._ids(symbols)
+        o = np.ascontiguousarray(open_prices, dtype=np.float64)
+        h = np.ascontiguousarray(high, dtype=np.float64)
+        l = np.ascontiguousarray(low, dtype=np.float64)  # noqa: E741
+        c = np.ascontiguousarray(close, dtype=np.float64)
+        n = len(sid)
+        if not (len(o) == len(h) == len(l) == len(c) == n):
+            raise ValueError("Input arrays must have the same length.")
+        out = np.empty(n)
+        if self.metrics is not None:
+            t0 = perf_counter_ns()
+        with self._lock:
+            _push_bars(
+                sid, o, h, l, c, self._last, self._ring, self._sums, self._counts,
+                self.min_pt, self.sign, self.min_periods, out,
+            )
+            self.spread[sid] = out  # later bars of a symbol win
+            self.updates += n
+        if self.metrics is not None:
+            t1 = perf_counter_ns()
+            self._m_latency.observe_ns(t1 - t0, "estimate")
+            updates = np.bincount(sid, minlength=len(self.symbols))
+            nans = np.bincount(sid, weights=np.isnan(out), minlength=len(self.symbols))
+            for k in np.flatnonzero(updates):
+                self._m_updates.inc(int(updates[k]), self.symbols[k])
+                if nans[k]:
+                    self._m_nan.inc(int(nans[k]), self.symbols[k])
+        if self._data_callbacks or self._alert_callbacks:
+            for k in range(n):
+                ts = None if timestamps is None else timestamps[k]
+                self._notify(sid[k], o[k], h[k], l[k], c[k], ts, out[k])
+            if self.metrics is not None:
+                self._m_latency.observe_ns(perf_counter_ns() - t1, "alert")
+        return out
+
+    def on_bar(self, bar: Dict) -> Optional[float]:
+        """
+        Stream callback: feed a bar dict (``symbol``, ``open``, ``high``,
+        ``low``, ``close``, optional ``timestamp``, ``is_closed`` and
+        ``recv_ns``, the `time.perf_counter_ns` receive time).
+
+        Bars still in progress and symbols outside the universe are ignored.
+        """
+        if not bar.get("is_closed", True):
+            return None
+        symbol = str(bar.get("symbol", "")).upper()
+        if symbol not in self.index:
+            return None
+        value, estimated_ns = self._update(
+            self.index[symbol], bar["open"], bar["high"], bar["low"], bar["close"],
+            bar.get("timestamp"),
+        )
+        if self.metrics is not None and bar.get("recv_ns") is not None:
+            self._m_latency.observe_ns(estimated_ns - bar["recv_ns"], "ingest_to_estimate")
+        return value
+
+    # --- State ---
+    @property
+    def spread_bps(self) -> np.ndarray:
+        """Latest estimate per symbol, in basis points."""
+        return self.spread * 10000
+
+    @property
+    def bars(self) -> np.ndarray:
+        """Number of bars seen per symbol."""
+        return self._counts[:, 0].copy()
+
+    def snapshot(self) -> pd.DataFrame:
+        """Latest estimate and bar count per symbol."""
+        return pd.DataFrame(
+            {"spread": self.spread, "spread_bps": self.spread_bps, "bars": self.bars},
+            index=pd.Index(self.symbols, name="symbol"),
+        )
+
+    def reset(self):
+        """Forget all bars for every symbol (thresholds and callbacks are kept)."""
+        with self._lock:
+            self._last[:] = np.nan
+            self._ring[:] = 0.0
+            self._sums[:] = 0.0
+            self._counts[:] = 0
+            self.spread[:] = np.nan
+
+    # --- Internals ---
+    def _id(self, symbol: str) -> int:
+        try:
+            return self.index[symbol.upper()]
+        except KeyError:
+            raise KeyError(f"Unknown symbol: {symbol}") from None
+
+    def _ids(self, symbols) -> np.ndarray:
+        arr = np.asarray(symbols)
+        if arr.dtype.kind in "iu":
+            sid = arr.astype(np.int64)
+            if len(sid) and (sid.min() < 0 or sid.max() >= len(self.symbols)):
+                raise IndexError("Symbol id out of range.")
+            return sid
+        return np.fromiter((self._id(s) for s in arr), dtype=np.int64, count=len(arr))
+
+    def _notify(self, i, open_price, high, low, close, timestamp, value):
+        symbol = self.symbols[i]
+        bps = value * 10000
+        if self._data_callbacks:
+            candle = {
+                "symbol": symbol,
+                "timestamp": timestamp,
+                "open": open_price,
+                "high": high,
+                "low": low,
+                "close": close,
+            }
+            spread = {"symbol": symbol, "timestamp": timestamp, "spread": value, "spread_bps": bps}
+            for callback in self._data_callbacks:
+                try:
+                    callback(candle, spread)
+                except Exception as e:
+                    logger.error(f"Error in data callback: {e}")
+        if self._alert_callbacks and value == value:
+            if bps > self.high_bps[i]:
+                kind, threshold = "HIGH", self.high_bps[i]
+            elif bps < self.low_bps[i]:
+                kind, threshold = "LOW", self.low_bps[i]
+            else:
+                return
+            if self.metrics is not None:
+                self._m_alerts.inc(1, symbol)
+            alert = {
+                "symbol": symbol,
+                "timestamp": timestamp,
+                "type": kind,
+                "spread_bps": bps,
+                "threshold_bps": threshold,
+            }
+            for callback in self._alert_callbacks:
+                try:
+                    callback(alert)
+                except Exception as e:
+                    logger.error(f"Error in alert callback: {e}")
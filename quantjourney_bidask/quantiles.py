@@ -0,0 +1,275 @@
+"""
+Streaming rolling quantiles for spread thresholds.
+
+Keeps, for each series, a ring of the last ``window`` values and, for each
+requested quantile, two indexed heaps that partition the window at that
+quantile's rank: a max-heap of the lower part and a min-heap of the upper
+part. A new value replaces the oldest one with O(log w) heap operations,
+and the two heap tops give the order statistics needed for the quantile,
+so thresholds update per observation instead of re-running
+``Series.rolling(...).quantile(...)`` over the whole history. Quantiles use
+linear interpolation and NaN handling identical to pandas.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numba import jit
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _rq_push(s, x, ring, heaps, sizes, where, counts, qs, min_periods, out):
+    """
+    Push ``x`` into series ``s`` and write its quantiles ``qs`` to ``out``.
+
+    State: ``ring`` (S, w) raw values; for quantile ``i`` of series ``s``
+    (group ``g = s*Q + i``) ``heaps[2g]`` / ``heaps[2g+1]`` hold the ring
+    slots of the lower (max) / upper (min) heap, ``sizes`` (2*S*Q,) their
+    sizes and ``where[g]`` (w,) the heap position of each slot (-1 if NaN);
+    ``counts`` (S, 3) values seen, ring cursor, number of non-NaN values.
+    """
+    w = ring.shape[1]
+    nq = qs.shape[0]
+
+    # Heap helpers are closures so numba inlines them into this kernel.
+    def better(side, a, b):
+        return a > b if side == 0 else a < b
+
+    def sift_up(h, g, side, i):
+        slot = heaps[h, i]
+        v = ring[s, slot]
+        while i > 0:
+            p = (i - 1) // 2
+            up = heaps[h, p]
+            if not better(side, v, ring[s, up]):
+                break
+            heaps[h, i] = up
+            where[g, up] = side * w + i
+            i = p
+        heaps[h, i] = slot
+        where[g, slot] = side * w + i
+        return i
+
+    def sift_down(h, g, side, i):
+        n = sizes[h]
+        slot = heaps[h, i]
+        v = ring[s, slot]
+        while True:
+            c = 2 * i + 1
+            if c >= n:
+                break
+            if c + 1 < n and better(side, ring[s, heaps[h, c + 1]], ring[s, heaps[h, c]]):
+                c += 1
+            down = heaps[h, c]
+            if not better(side, ring[s, down], v):
+                break
+            heaps[h, i] = down
+            where[g, down] = side * w + i
+            i = c
+        heaps[h, i] = slot
+        where[g, slot] = side * w + i
+
+    def push(h, g, side, slot):
+        n = sizes[h]
+        heaps[h, n] = slot
+        sizes[h] = n + 1
+        sift_up(h, g, side, n)
+
+    def remove(h, g, side, i):
+        slot = heaps[h, i]
+        where[g, slot] = -1
+        n = sizes[h] - 1
+        sizes[h] = n
+        if i < n:
+            heaps[h, i] = heaps[h, n]
+            sift_down(h, g, side, sift_up(h, g, side, i))
+        return slot
+
+    slot = counts[s, 1]
+    nv = counts[s, 2]
+    old = ring[s, slot]
+    if counts[s, 0] >= w and old == old:
+        for i in range(nq):
+            g = s * nq + i
+            loc = where[g, slot]
+            side = loc // w
+            remove(2 * g + side, g, side, loc % w)
+        nv -= 1
+    ring[s, slot] = x
+    if x == x:
+        nv += 1
+    counts[s, 1] = 0 if slot + 1 == w else slot + 1
+    counts[s, 0] += 1
+    counts[s, 2] = nv
+
+    for i in range(nq):
+        g = s * nq + i
+        lo_h = 2 * g
+        hi_h = lo_h + 1
+        if x == x:
+            if sizes[lo_h] > 0 and x <= ring[s, heaps[lo_h, 0]]:
+                push(lo_h, g, 0, slot)
+            else:
+                push(hi_h, g, 1, slot)
+        idx = qs[i] * (nv - 1)
+        lo = int(np.floor(idx)) if nv > 0 else -1
+        target = min(lo + 1, nv)
+        while sizes[lo_h] > target:
+            push(hi_h, g, 1, remove(lo_h, g, 0, 0))
+        while sizes[lo_h] < target:
+            push(lo_h, g, 0, remove(hi_h, g, 1, 0))
+
+        if nv == 0 or nv < min_periods:
+            out[i] = np.nan
+        elif lo >= nv - 1:
+            out[i] = ring[s, heaps[lo_h, 0]]
+        else:
+            vlow = ring[s, heaps[lo_h, 0]]
+            out[i] = vlow + (ring[s, heaps[hi_h, 0]] - vlow) * (idx - lo)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _rq_push_many(sid, x, ring, heaps, sizes, where, counts, qs, min_periods, out):
+    for i in range(sid.shape[0]):
+        _rq_push(sid[i], x[i], ring, heaps, sizes, where, counts, qs, min_periods, out[i])
+
+
+class RollingQuantile:
+    """
+    Rolling quantiles of one or many series, updated one value at a time.
+
+    Args:
+        window : int
+            Number of most recent observations per series.
+        quantiles : sequence of float, default (0.25, 0.75)
+            Quantiles in [0, 1].
+        n_series : int, default 1
+            Number of independent series (e.g. symbols).
+        min_periods : int, optional
+            Minimum non-NaN observations in the window for a result.
+            Defaults to ``window``, as in pandas.
+
+    Examples:
+        >>> rq = RollingQuantile(window=48, quantiles=(0.25, 0.75))
+        >>> low, high = rq.update(spread)
+    """
+
+    def __init__(
+        self,
+        window: int,
+        quantiles: Sequence[float] = (0.25, 0.75),
+        n_series: int = 1,
+        min_periods: Optional[int] = None,
+    ):
+        if not isinstance(window, int) or window < 1:
+            raise ValueError("Window must be a positive integer.")
+        qs = np.asarray(quantiles, dtype=np.float64).ravel()
+        if len(qs) == 0 or (qs < 0).any() or (qs > 1).any():
+            raise ValueError("Quantiles must be in [0, 1].")
+        if min_periods is None:
+            min_periods = window
+        if not 0 <= min_periods <= window:
+            raise ValueError("min_periods must be between 0 and window.")
+        self.window = window
+        self.quantiles = qs
+        self.n_series = n_series
+        self.min_periods = min_periods
+        self.reset()
+
+    def reset(self):
+        """Forget all observations."""
+        n, q, w = self.n_series, len(self.quantiles), self.window
+        self._ring = np.full((n, w), np.nan)
+        self._heaps = np.zeros((2 * n * q, w), dtype=np.int64)
+        self._sizes = np.zeros(2 * n * q, dtype=np.int64)
+        self._where = np.full((n * q, w), -1, dtype=np.int64)
+        self._counts = np.zeros((n, 3), dtype=np.int64)
+
+    def update(self, value: float, series: int = 0) -> np.ndarray:
+        """Add one observation to ``series``; returns its current quantiles."""
+        if not 0 <= series < self.n_series:
+            raise IndexError("Series id out of range.")
+        out = np.empty(len(self.quantiles))
+        _rq_push(
+            series, float(value), self._ring, self._heaps, self._sizes, self._where,
+            self._counts, self.quantiles, self.min_periods, out,
+        )
+        return out
+
+    def update_many(self, values, series=None) -> np.ndarray:
+        """
+        Add observations in order; ``series`` gives each value's series id
+        (all 0 if omitted). Returns an array of shape (n, n_quantiles).
+        """
+        x = np.ascontiguousarray(values, dtype=np.float64)
+        if series is None:
+            sid = np.zeros(len(x), dtype=np.int64)
+        else:
+            sid = np.asarray(series, dtype=np.int64)
+            if len(sid) != len(x):
+                raise ValueError("values and series must have the same length.")
+            if len(sid) and (sid.min() < 0 or sid.max() >= self.n_series):
+                raise IndexError("Series id out of range.")
+        out = np.empty((len(x), len(self.quantiles)))
+        _rq_push_many(
+            sid, x, self._ring, self._heaps, self._sizes, self._where, self._counts,
+            self.quantiles, self.min_periods, out,
+        )
+        return out
+
+
+def rolling_quantile(
+    values,
+    window: int,
+    quantiles: Sequence[float] = (0.25, 0.75),
+    min_periods: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Rolling quantiles of a 1-D array, matching ``Series.rolling(...).quantile``.
+
+    Returns:
+        np.ndarray
+            Array of shape (n, n_quantiles).
+    """
+    return RollingQuantile(window, quantiles, min_periods=min_periods).update_many(values)
+
+
+def spread_thresholds(
+    spread: pd.Series,
+    window: int,
+    low_percentile: float = 25,
+    high_percentile: float = 75,
+    min_periods: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Rolling low/high percentile thresholds of a spread series.
+
+    Args:
+        spread : pd.Series
+            Spread estimates (e.g. from `edge_rolling`).
+        window : int
+            Number of most recent estimates used for the percentiles.
+        low_percentile, high_percentile : float, default 25, 75
+            Percentiles in [0, 100].
+        min_periods : int, optional
+            Minimum non-NaN estimates for a threshold; defaults to ``window``.
+
+    Returns:
+        pd.DataFrame
+            ``low_threshold`` and ``high_threshold`` aligned with ``spread``.
+    """
+    q = rolling_quantile(
+        spread.to_numpy(dtype=np.float64),
+        window,
+        (low_percentile / 100, high_percentile / 100),
+        min_periods=min_periods,
+    )
+    return pd.DataFrame(
+        {"low_threshold": q[:, 0], "high_threshold": q[:, 1]}, index=spread.index
+    )
@@ -0,0 +1,295 @@
+"""
+Shared-memory OHLC panels for multi-process estimation.
+
+A `SharedPanel` keeps a long panel of many symbols in one
+`multiprocessing.shared_memory` block: open/high/low/close, timestamps
+(int64 ticks), the symbol index (rows of each symbol are contiguous and in
+time order, located by an offsets array) and float output buffers. The
+layout, symbol names and time zone live in a header inside the block, so
+any process can map the panel with ``SharedPanel.attach(name)`` and read or
+write it in place: worker processes receive a name and a symbol range
+instead of pickled frames.
+
+`SharedPanel.map` runs a function over symbol ranges in a process pool;
+`edge_rolling` and `edge_zscore` are built on it and write their results
+into the output buffers. Only the creating process unlinks the block (on
+`close`, on leaving a ``with`` block or when the panel is garbage
+collected), so a worker that dies leaves nothing behind: the pool raises
+``BrokenProcessPool`` and the owner's cleanup still runs.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import _shm
+from ._moments import N_COMPONENTS
+from .edge_rolling import EdgeRollingState, _rolling_pass
+from .edge_zscore import EdgeZScore, _edge_z_many
+
+OHLC = ("open", "high", "low", "close")
+
+
+class SharedPanel:
+    """
+    Long OHLC panel in shared memory, grouped by symbol.
+
+    Create one with `from_frame` (or `create` to fill the buffers directly),
+    hand ``panel.name`` to other processes and map it there with `attach`.
+    Columns are NumPy views (``panel["close"]``, ``panel.rows(symbol)``);
+    nothing is copied when workers read or write them.
+
+    Args:
+        outputs : sequence of str, default ("spread", "spread_zscore")
+            Float64 output buffers, initialized to NaN.
+
+    Examples:
+        >>> with SharedPanel.from_frame(df, by="symbol", time="timestamp") as panel:
+        ...     panel.edge_rolling(window=21, n_jobs=8)
+        ...     spreads = panel.to_frame()
+    """
+
+    def __init__(self, shm, layout, meta: dict, owner: bool):
+        self._shm = shm
+        self._arrays = _shm.views(shm, layout)
+        self.symbols: List[str] = list(meta["symbols"])
+        self.outputs: List[str] = list(meta["outputs"])
+        self.tz: Optional[str] = meta["tz"]
+        self.time_unit: str = meta["time_unit"]
+        self.owner = owner
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self._finalizer = weakref.finalize(self, _shm.release, shm, owner)
+
+    # --- Construction ---
+    @classmethod
+    def create(cls, symbols: Sequence[str], counts: Sequence[int],
+               outputs: Sequence[str] = ("spread", "spread_zscore"),
+               tz: Optional[str] = None, time_unit: str = "ns") -> "SharedPanel":
+        """
+        Empty panel with ``counts[i]`` rows for ``symbols[i]``.
+
+        The OHLC and ``time`` buffers are left for the caller to fill (e.g.
+        a loader writing each symbol's rows in place); outputs are NaN.
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        if len(counts) != len(symbols) or (len(counts) and counts.min() < 0):
+            raise ValueError("counts must give a non-negative row count per symbol.")
+        reserved = set(OHLC) | {"time", "offsets"}
+        if reserved & set(outputs):
+            raise ValueError(f"Output names must not be one of {sorted(reserved)}.")
+        n = int(counts.sum())
+        specs = {k: ((n,), np.float64) for k in OHLC}
+        specs["time"] = ((n,), np.int64)
+        specs["offsets"] = ((len(counts) + 1,), np.int64)
+        for name in outputs:
+            specs[name] = ((n,), np.float64)
+        meta = {"symbols": [str(s) for s in symbols], "outputs": list(outputs),
+                "tz": tz, "time_unit": time_unit}
+        shm, layout = _shm.create(specs, meta)
+        panel = cls(shm, layout, meta, owner=True)
+        panel._arrays["offsets"][0] = 0
+        np.cumsum(counts, out=panel._arrays["offsets"][1:])
+        for name in outputs:
+            panel._arrays[name].fill(np.nan)
+        return panel
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, by: str = "symbol", time: Optional[str] = "timestamp",
+                   outputs: Sequence[str] = ("spread", "spread_zscore")) -> "SharedPanel":
+        """
+        Copy a long panel (one row per symbol and bar) into shared memory.
+
+        Args:
+            df : pd.DataFrame
+                Columns 'open', 'high', 'low', 'close' and ``by``, rows in
+                time order within each symbol.
+            by : str, default "symbol"
+                Column holding the symbol of each row.
+            time : str, optional
+                Datetime column; the index is used if None or absent.
+        """
+        df_proc = df.rename(columns=str.lower)
+        if time is not None and time.lower() in df_proc.columns:
+            stamps = pd.DatetimeIndex(df_proc[time.lower()])
+        elif isinstance(df_proc.index, pd.DatetimeIndex):
+            stamps = df_proc.index
+        else:
+            raise ValueError("Panel rows need timestamps (a datetime column or index).")
+        codes, uniques = pd.factorize(df_proc[by.lower()].astype(str))
+        order = np.argsort(codes, kind="stable")
+        unit = np.datetime_data(stamps.dtype if stamps.tz is None else stamps.tz_localize(None).dtype)[0]
+        panel = cls.create(
+            list(uniques), np.bincount(codes, minlength=len(uniques)), outputs,
+            tz=None if stamps.tz is None else str(stamps.tz), time_unit=unit,
+        )
+        for k in OHLC:
+            np.take(df_proc[k].to_numpy(dtype=np.float64), order, out=panel._arrays[k])
+        np.take(stamps.asi8, order, out=panel._arrays["time"])
+        return panel
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedPanel":
+        """Map an existing panel by block name (this process never unlinks it)."""
+        shm = _shm.attach(name)
+        layout, meta = _shm.read_header(shm)
+        return cls(shm, layout, meta, owner=False)
+
+    # --- Access ---
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return self._arrays["offsets"]
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self._arrays[column]
+
+    def rows(self, symbol) -> slice:
+        """Row range of ``symbol`` (name or position)."""
+        i = symbol if isinstance(symbol, (int, np.integer)) else self._index[str(symbol)]
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def timestamps(self, rows: slice = slice(None)) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(self._arrays["time"][rows].view(f"datetime64[{self.time_unit}]"))
+        return index if self.tz is None else index.tz_localize("UTC").tz_convert(self.tz)
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Long frame (grouped by symbol) of ``columns`` (default: OHLC and outputs), copied."""
+        columns = list(OHLC) + self.outputs if columns is None else list(columns)
+        counts = np.diff(self.offsets)
+        frame = pd.DataFrame({
+            "timestamp": self.timestamps(),
+            "symbol": np.repeat(np.asarray(self.symbols, dtype=object), counts),
+        })
+        for k in columns:
+            frame[k] = self._arrays[k].copy()
+        return frame
+
+    # --- Parallel execution ---
+    def map(self, func: Callable, n_jobs: Optional[int] = None, **kwargs) -> list:
+        """
+        Call ``func(panel, lo, hi, **kwargs)`` over symbol ranges ``[lo, hi)``.
+
+        With ``n_jobs`` > 1 (-1: one per CPU), the symbols are split into
+        ranges of similar row counts and each range runs in a worker
+        process on its own mapping of this panel; ``func`` must then be a
+        module-level function. Returns the results in range order.
+        """
+        if n_jobs is not None and (not isinstance(n_jobs, int) or n_jobs == 0 or n_jobs < -1):
+            raise ValueError("n_jobs must be a positive integer or -1.")
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        if n_jobs is None or n_jobs <= 1 or len(self.symbols) <= 1:
+            return [func(self, 0, len(self.symbols), **kwargs)]
+        targets = np.linspace(0, len(self), n_jobs + 1)[1:-1]
+        cuts = np.searchsorted(self.offsets, targets, side="left")
+        bounds = np.unique(np.concatenate([[0], cuts, [len(self.symbols)]]))
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(bounds) - 1)) as pool:
+            futures = [
+                pool.submit(_map_worker, self.name, func, int(lo), int(hi), kwargs)
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+            ]
+            return [future.result() for future in futures]
+
+    def edge_rolling(self, window: int, sign: bool = False, step: int = 1,
+                     min_periods: Optional[int] = None, n_jobs: Optional[int] = None,
+                     output: str = "spread") -> np.ndarray:
+        """
+        Rolling EDGE estimates of every symbol into the ``output`` buffer.
+
+        Same values as `edge_rolling` on each symbol's rows; returns the
+        output view.
+        """
+        if not isinstance(window, int) or window < 3:
+            raise ValueError("Window must be an integer >= 3.")
+        if not isinstance(step, int) or step < 1:
+            raise ValueError("Step must be a positive integer.")
+        need = max(window, 3 if min_periods is None else max(3, min_periods))
+        self.map(_rolling_symbols, n_jobs, window=window, sign=sign, step=step,
+                 need=need, output=output)
+        return self._arrays[output]
+
+    def edge_zscore(self, window: int, zscore_window: Optional[int] = None,
+                    halflife: Optional[float] = None, sign: bool = False,
+                    zscore_min_periods: Optional[int] = None, n_jobs: Optional[int] = None,
+                    output: str = "spread", zscore_output: str = "spread_zscore") -> np.ndarray:
+        """
+        Rolling EDGE spreads and causal z-scores of every symbol into the
+        ``output``/``zscore_output`` buffers, as `edge_zscore` with ``by``;
+        returns the z-score view.
+        """
+        EdgeZScore(window=window, zscore_window=zscore_window, halflife=halflife,
+                   zscore_min_periods=zscore_min_periods)  # validate once here
+        self.map(_zscore_symbols, n_jobs, window=window, zscore_window=zscore_window,
+                 halflife=halflife, sign=sign, zscore_min_periods=zscore_min_periods,
+                 output=output, zscore_output=zscore_output)
+        return self._arrays[zscore_output]
+
+    # --- Lifetime ---
+    def close(self):
+        """Unmap the panel; the creating process also removes the block."""
+        self._arrays = {}
+        self._finalizer()
+
+    def __enter__(self) -> "SharedPanel":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _map_worker(name: str, func: Callable, lo: int, hi: int, kwargs: Dict):
+    panel = SharedPanel.attach(name)
+    try:
+        return func(panel, lo, hi, **kwargs)
+    finally:
+        panel.close()
+
+
+def _rolling_symbols(panel: SharedPanel, lo: int, hi: int, window, sign, step, need, output):
+    o, h, l, c = (panel[k] for k in OHLC)  # noqa: E741
+    out = panel[output]
+    no_diag = np.empty((0, N_COMPONENTS))
+    for s in range(lo, hi):
+        rows = panel.rows(s)
+        n = rows.stop - rows.start
+        starts = np.zeros(n, dtype=np.bool_)
+        starts[:1] = True
+        state = EdgeRollingState(window, sign, step, need)
+        _rolling_pass(
+            o[rows], h[rows], l[rows], c[rows], starts, 0, step, need, 1e-6, sign,
+            state._last, state._ring, state._sums, state._counts, out[rows], no_diag,
+        )
+
+
+def _zscore_symbols(panel: SharedPanel, lo: int, hi: int, window, zscore_window, halflife,
+                    sign, zscore_min_periods, output, zscore_output):
+    o, h, l, c = (panel[k] for k in OHLC)  # noqa: E741
+    spread, z = panel[output], panel[zscore_output]
+    no_diag = np.empty((0, N_COMPONENTS))
+    for s in range(lo, hi):
+        rows = panel.rows(s)
+        engine = EdgeZScore(window=window, zscore_window=zscore_window, halflife=halflife,
+                            sign=sign, zscore_min_periods=zscore_min_periods)
+        _edge_z_many(
+            np.zeros(rows.stop - rows.start, dtype=np.int64), o[rows], h[rows], l[rows], c[rows],
+            engine._last, engine._ring, engine._sums, engine._counts,
+            engine.min_pt, engine.sign, engine.window,
+            engine._zring, engine._zstats, engine._zcounts,
+            engine._alpha, engine.zscore_min_periods,
+            spread[rows], z[rows], no_diag,
+        )
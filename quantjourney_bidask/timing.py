@@ -0,0 +1,106 @@
+"""
+Opt-in per-stage timing of the estimators.
+
+`edge`, `edge_hft.edge`, `edge_rolling`, `edge_rolling_update` and
+`edge_expanding` mark the boundaries of their internal stages (input
+conversion, log transform, indicator construction, compiled kernel, Series
+construction, ...). While timing is enabled, each stage adds its elapsed
+nanoseconds and a call count to a process-wide table that `stats` returns.
+While disabled, a stage boundary costs one function call and a flag check.
+
+Stage names are ``"<function>.<stage>"``. The stages of `edge_expanding`
+include the nested `edge` calls, which are also recorded under ``edge.*``.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import threading
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import Dict
+
+_enabled = False
+_lock = threading.Lock()
+_totals: Dict[str, list] = {}
+
+
+def enable():
+    """Start recording stage timings (process-wide)."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop recording; accumulated timings are kept until `reset`."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Clear the accumulated timings."""
+    with _lock:
+        _totals.clear()
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """
+    Accumulated timings per stage.
+
+    Returns:
+        dict
+            ``{stage: {"calls": int, "total_ns": int, "mean_ns": float}}``,
+            sorted by stage name.
+
+    Examples:
+        >>> from quantjourney_bidask import edge_rolling, timing
+        >>> with timing.record():
+        ...     edge_rolling(df, window=21)
+        >>> timing.stats()["edge_rolling.kernel"]["total_ns"]
+    """
+    with _lock:
+        items = sorted((k, tuple(v)) for k, v in _totals.items())
+    return {
+        stage: {"calls": calls, "total_ns": total, "mean_ns": total / calls}
+        for stage, (calls, total) in items
+    }
+
+
+@contextmanager
+def record(reset_stats: bool = True):
+    """Enable timing inside a ``with`` block (clearing earlier stats by default)."""
+    global _enabled
+    previous = _enabled
+    if reset_stats:
+        reset()
+    _enabled = True
+    try:
+        yield
+    finally:
+        _enabled = previous
+
+
+def _start() -> int:
+    """Timestamp opening the first stage, or 0 when timing is disabled."""
+    return perf_counter_ns() if _enabled else 0
+
+
+def _lap(stage: str, t0: int) -> int:
+    """Charge the time since ``t0`` to ``stage``; returns the new timestamp."""
+    if not t0:
+        return 0
+    now = perf_counter_ns()
+    with _lock:
+        entry = _totals.get(stage)
+        if entry is None:
+            _totals[stage] = [1, now - t0]
+        else:
+            entry[0] += 1
+            entry[1] += now - t0
+    return now
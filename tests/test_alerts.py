@@ -0,0 +1,107 @@
+"""
+Unit tests for the vectorized spread alert engine.
+
+Test suite for AlertEngine covering transition-only output, hysteresis,
+cooldown, percentile thresholds and callbacks.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+import pytest
+
+from quantjourney_bidask import AlertEngine, rolling_quantile
+from quantjourney_bidask.alerts import HIGH, LOW, NORMAL
+
+
+def _run(engine, ticks):
+    return [engine.update(np.atleast_1d(t)) for t in ticks]
+
+
+def test_emits_only_transitions():
+    """A persistent breach produces one alert, and one on recovery."""
+    engine = AlertEngine(["A", "B"], high_bps=10, low_bps=2)
+    out = _run(engine, [[5, 5], [12, 5], [13, 1], [14, 1], [5, 5]])
+    assert [len(a["index"]) for a in out] == [0, 1, 1, 0, 2]
+    assert out[1]["symbol"].tolist() == ["A"] and out[1]["state"].tolist() == [HIGH]
+    assert out[2]["symbol"].tolist() == ["B"] and out[2]["state"].tolist() == [LOW]
+    assert out[4]["state"].tolist() == [NORMAL, NORMAL]
+    assert out[4]["previous"].tolist() == [HIGH, LOW]
+    assert engine.transitions == 4
+
+
+def test_hysteresis_suppresses_flapping():
+    """Spreads hovering around the threshold do not toggle the state."""
+    path = [9, 11, 9.5, 10.5, 9.2, 10.8, 8.9, 11]
+    flappy = AlertEngine(["A"], high_bps=10)
+    steady = AlertEngine(["A"], high_bps=10, hysteresis_bps=1.0)
+    assert sum(len(a["index"]) for a in _run(flappy, path)) == 7
+    out = _run(steady, path)
+    assert [len(a["index"]) for a in out] == [0, 1, 0, 0, 0, 0, 1, 1]
+    assert out[6]["threshold_bps"].tolist() == [9.0]
+
+
+def test_cooldown_limits_transition_rate():
+    """A symbol cannot change state again within the cooldown."""
+    engine = AlertEngine(["A"], high_bps=10, cooldown=3)
+    out = _run(engine, [11, 5, 5, 5, 11, 11])
+    assert [a["state"].tolist() for a in out] == [[HIGH], [], [], [NORMAL], [], []]
+    engine = AlertEngine(["A"], high_bps=10, cooldown=10.0)
+    assert len(engine.update([11.0], now=100.0)["index"]) == 1
+    assert len(engine.update([5.0], now=105.0)["index"]) == 0
+    assert len(engine.update([5.0], now=110.0)["index"]) == 1
+
+
+def test_nan_keeps_state():
+    """Symbols without a new spread keep their state."""
+    engine = AlertEngine(["A", "B"], high_bps=10)
+    _run(engine, [[11, 11]])
+    out = engine.update([np.nan, 5.0])
+    assert out["symbol"].tolist() == ["B"]
+    assert engine.state.tolist() == [HIGH, NORMAL]
+
+
+def test_percentile_thresholds():
+    """Percentile mode compares each spread to the percentiles of the spreads before it."""
+    rng = np.random.default_rng(4)
+    values = rng.normal(5, 1, (200, 3))
+    values[rng.random((200, 3)) < 0.1] = np.nan
+    engine = AlertEngine(["A", "B", "C"], percentile_window=20, low_percentile=10, high_percentile=90)
+    states = []
+    for row in values:
+        engine.update(row)
+        states.append(engine.state.copy())
+    for k in range(3):
+        ok = ~np.isnan(values[:, k])
+        x = values[ok, k]
+        q = rolling_quantile(x, 20, (0.1, 0.9))
+        low, high = np.r_[np.nan, q[:-1, 0]], np.r_[np.nan, q[:-1, 1]]
+        expected = np.where(x > high, HIGH, np.where(x < low, LOW, NORMAL))
+        # NaN ticks keep the previous state and do not enter the window.
+        assert np.array_equal(np.array(states)[ok, k], expected)
+    with pytest.raises(ValueError):
+        engine.set_threshold("A", high_bps=10)
+
+
+def test_callbacks_receive_transitions():
+    """Callbacks get one dict per transition."""
+    alerts = []
+    engine = AlertEngine(["btcusdt", "ethusdt"], high_bps=[10, 20])
+    engine.set_threshold("ETHUSDT", low_bps=1)
+    engine.add_callback(alerts.append)
+    _run(engine, [[15, 15], [15, 0.5]])
+    assert [(a["symbol"], a["type"]) for a in alerts] == [("BTCUSDT", "HIGH"), ("ETHUSDT", "LOW")]
+    assert alerts[1]["threshold_bps"] == 1.0
+
+
+def test_validation():
+    """Invalid configuration and inputs are rejected."""
+    with pytest.raises(ValueError):
+        AlertEngine(["A"], high_bps=10, percentile_window=20)
+    with pytest.raises(ValueError):
+        AlertEngine(["A"], hysteresis_bps=-1)
+    with pytest.raises(ValueError):
+        AlertEngine(["A", "B"], high_bps=10).update([1.0])
@@ -0,0 +1,135 @@
+"""
+Unit tests for trade-to-bar aggregation and the streaming EDGE estimator.
+
+Test suite for the time, volume and tick bar clocks in batch and incremental
+mode, and for EdgeStream consistency with the rolling and expanding
+estimators.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantjourney_bidask import (
+    BarBuilder,
+    EdgeStream,
+    edge,
+    edge_expanding,
+    edge_rolling,
+    trades_to_bars,
+)
+
+
+@pytest.fixture
+def trades():
+    """Random-walk trades with bid/ask bounce, several per minute."""
+    rng = np.random.default_rng(7)
+    n = 5000
+    ts = pd.Timestamp("2024-01-01").value + np.cumsum(rng.integers(1, 3_000_000_000, n))
+    mid = 100 * np.exp(np.cumsum(rng.normal(0, 2e-4, n)))
+    price = mid * (1 + 0.0005 * rng.choice([-1, 1], n))
+    size = rng.gamma(2.0, 1.0, n)
+    return ts, price, size
+
+
+@pytest.fixture
+def ohlc_data():
+    """OHLC bars with a few missing values."""
+    rng = np.random.default_rng(42)
+    n = 200
+    prices = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    df = pd.DataFrame({
+        "open": prices,
+        "high": prices * (1 + rng.uniform(0, 0.02, n)),
+        "low": prices * (1 - rng.uniform(0, 0.02, n)),
+        "close": prices + rng.normal(0, 0.2, n),
+    })
+    df.iloc[17, 0] = np.nan
+    df.iloc[90, 3] = np.nan
+    return df
+
+
+def test_time_bars_match_pandas_resample(trades):
+    """Time bars reproduce pandas resample OHLC on non-empty intervals."""
+    ts, price, size = trades
+    bars = trades_to_bars(ts, price, size, clock="time", every="1min")
+    s = pd.Series(price, index=pd.to_datetime(ts))
+    expected = s.resample("1min").ohlc().dropna()
+    volume = pd.Series(size, index=s.index).resample("1min").sum()
+
+    assert len(bars["close"]) == len(expected)
+    np.testing.assert_array_equal(bars["timestamp"], expected.index.to_numpy("datetime64[ns]"))
+    for field in ["open", "high", "low", "close"]:
+        np.testing.assert_allclose(bars[field], expected[field].to_numpy())
+    np.testing.assert_allclose(bars["volume"], volume.loc[expected.index].to_numpy())
+    assert bars["trades"].sum() == len(price)
+
+
+def test_volume_and_tick_clocks(trades):
+    """Volume bars close at the size threshold; tick bars at the trade count."""
+    ts, price, size = trades
+    tick = trades_to_bars(ts, price, size, clock="tick", every=50)
+    assert (tick["trades"] == 50).all()
+    np.testing.assert_allclose(tick["close"], price[49::50])
+
+    vol = trades_to_bars(ts, price, size, clock="volume", every=100.0, include_partial=False)
+    assert (vol["volume"] >= 100.0).all()
+    assert (vol["volume"] - 100.0 < size.max()).all()
+    assert vol["trades"].sum() < len(price)
+
+
+def test_incremental_matches_batch(trades):
+    """Pushing trades one by one yields the same bars as the batch call."""
+    ts, price, size = trades
+    batch = trades_to_bars(ts, price, size, clock="volume", every=75.0)
+
+    builder = BarBuilder("volume", every=75.0)
+    bars = [b for b in (builder.push(t, p, q) for t, p, q in zip(ts, price, size)) if b]
+    bars.append(builder.flush())
+    assert builder.flush() is None
+    assert len(bars) == len(batch["close"])
+    np.testing.assert_allclose([b["high"] for b in bars], batch["high"])
+    assert [b["timestamp"] for b in bars] == list(pd.to_datetime(batch["timestamp"]))
+
+
+def test_builder_feeds_streaming_estimator(trades):
+    """Completed bars go straight into EdgeStream, matching edge() on the bars."""
+    ts, price, size = trades
+    builder = BarBuilder("time", every="1min", estimator=EdgeStream())
+    first = builder.push_many(ts[:2500], price[:2500], size[:2500])
+    second = builder.push_many(ts[2500:], price[2500:], size[2500:])
+    o, h, l, c = (np.concatenate([first[k], second[k]]) for k in ["open", "high", "low", "close"])
+    assert second["spread"][-1] == pytest.approx(edge(o, h, l, c), rel=1e-6)
+
+
+@pytest.mark.parametrize("window", [3, 10, 21])
+def test_edge_stream_matches_rolling(ohlc_data, window):
+    """EdgeStream over a sliding window matches edge_rolling."""
+    stream = EdgeStream(window=window, sign=True)
+    streamed = stream.update_many(*(ohlc_data[k] for k in ["open", "high", "low", "close"]))
+    expected = edge_rolling(ohlc_data, window=window, sign=True)
+    np.testing.assert_allclose(streamed, expected, rtol=1e-6, atol=1e-10)
+    assert stream.n_bars == len(ohlc_data)
+
+
+def test_edge_stream_matches_expanding(ohlc_data):
+    """Expanding EdgeStream, one bar at a time, matches edge_expanding."""
+    stream = EdgeStream()
+    streamed = [stream.update(*row) for row in ohlc_data.itertuples(index=False)]
+    expected = edge_expanding(ohlc_data, min_periods=3)
+    np.testing.assert_allclose(streamed, expected, rtol=1e-6, atol=1e-10)
+
+
+def test_validation():
+    """Invalid parameters are rejected."""
+    with pytest.raises(ValueError):
+        EdgeStream(window=2)
+    with pytest.raises(ValueError):
+        BarBuilder("dollar")
+    with pytest.raises(ValueError):
+        BarBuilder("tick", every=0)
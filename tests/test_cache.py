@@ -0,0 +1,96 @@
+"""
+Unit tests for the content-addressed estimate cache.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.synthetic import simulate_ohlc
+from quantjourney_bidask import EstimateCache, edge_expanding, edge_rolling
+from quantjourney_bidask.cache import fingerprint
+
+
+@pytest.fixture
+def df():
+    return simulate_ohlc(600, spread=0.002, seed=7).set_index("timestamp")
+
+
+def test_hits_return_the_computed_result(df):
+    cache = EstimateCache()
+    first = cache.edge_rolling(df, window=21, step=3)
+    second = cache.edge_rolling(df, window=21, step=3)
+    pd.testing.assert_series_equal(first, edge_rolling(df, window=21, step=3))
+    pd.testing.assert_series_equal(second, first)
+    expanding = cache.edge_expanding(df, min_periods=5)
+    pd.testing.assert_series_equal(expanding, edge_expanding(df, min_periods=5))
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+    # Mutating a returned result leaves the cached copy intact.
+    second.iloc[:] = 0.0
+    pd.testing.assert_series_equal(cache.edge_rolling(df, window=21, step=3), first)
+
+
+def test_changed_parameters_or_data_miss(df):
+    cache = EstimateCache()
+    cache.edge_rolling(df, window=21)
+    cache.edge_rolling(df, window=22)
+    cache.edge_rolling(df, window=21, sign=True)
+    revised = df.copy()
+    revised.iloc[300, revised.columns.get_loc("close")] *= 1.0001
+    cache.edge_rolling(revised, window=21)
+    assert cache.stats()["misses"] == 4 and cache.stats()["hits"] == 0
+    assert fingerprint(df, window=21) == fingerprint(df.copy(), window=21)
+    assert fingerprint(df, window=21, n_jobs=4) == fingerprint(df, window=21)
+    assert fingerprint(df, window=21) != fingerprint(df.reset_index(drop=True), window=21)
+
+
+def test_byte_budget_evicts_least_recently_used(df):
+    one = edge_rolling(df, window=21)
+    size = int(one.memory_usage(index=True))
+    cache = EstimateCache(max_bytes=2 * size)
+    cache.edge_rolling(df, window=10)
+    cache.edge_rolling(df, window=11)
+    cache.edge_rolling(df, window=10)  # refresh: 11 becomes least recent
+    cache.edge_rolling(df, window=12)
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["entries"] == 2 and stats["bytes"] <= 2 * size
+    cache.edge_rolling(df, window=10)
+    assert cache.stats()["hits"] == 2
+    cache.edge_rolling(df, window=11)
+    assert cache.stats()["misses"] == 4
+
+
+def test_disk_tier_survives_new_instance(df, tmp_path):
+    frames = EstimateCache(directory=str(tmp_path)).edge_rolling(
+        df, window=21, return_diagnostics=True
+    )
+    fresh = EstimateCache(directory=str(tmp_path))
+    loaded = fresh.edge_rolling(df, window=21, return_diagnostics=True)
+    pd.testing.assert_frame_equal(loaded, frames)
+    assert fresh.stats()["disk_hits"] == 1 and fresh.stats()["misses"] == 0
+    assert isinstance(loaded.index, pd.DatetimeIndex)
+
+    # Exchange-local results crossing a DST fall-back are read back as well.
+    local = df.tz_convert("America/New_York")
+    local.index = local.index + (pd.Timestamp("2024-11-03", tz="UTC") - local.index[0])
+    expected = EstimateCache(directory=str(tmp_path)).edge_rolling(local, window=21)
+    fresh = EstimateCache(directory=str(tmp_path))
+    pd.testing.assert_series_equal(fresh.edge_rolling(local, window=21), expected)
+    assert fresh.stats()["disk_hits"] == 1 and fresh.stats()["misses"] == 0
+
+    fresh.clear(disk=True)
+    assert len(fresh) == 0 and not any(p.suffix == ".npz" for p in tmp_path.iterdir())
+    assert np.isfinite(fresh.edge_rolling(df, window=21, return_diagnostics=True)["spread"]).any()
+    assert fresh.stats()["misses"] == 1
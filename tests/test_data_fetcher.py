@@ -64,12 +64,16 @@ def test_stock_data():
         assert "volume" in df.columns
 
 
+# Unreachable local endpoint, forces the synthetic fallback
+OFFLINE_URL = "ws://127.0.0.1:9/stream"
+
+
 def test_btc_websocket_synthetic():
     """Test BTC websocket data generation."""
 
     async def test_websocket():
         fetcher = DataFetcher()
-        df = await fetcher.get_btc_1m_websocket(duration_seconds=5)
+        df = await fetcher.get_btc_1m_websocket(duration_seconds=5, url=OFFLINE_URL)
         return df
 
     df = asyncio.run(test_websocket())
@@ -88,7 +92,7 @@ def test_stream_btc_data():
     """Test stream BTC data convenience function."""
 
     async def test_stream():
-        return await stream_btc_data(duration_seconds=3)
+        return await stream_btc_data(duration_seconds=3, url=OFFLINE_URL)
 
     df = asyncio.run(test_stream())
     assert isinstance(df, pd.DataFrame)
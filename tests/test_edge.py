@@ -15,7 +15,7 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from quantjourney_bidask import edge
+from quantjourney_bidask import NAN_REASONS, edge, edge_components, edge_hft
 
 
 @pytest.fixture
@@ -170,3 +170,42 @@ def test_edge_invalid_lengths():
     """Test edge function with mismatched input lengths."""
     with pytest.raises(ValueError, match="must have the same length"):
         edge([1, 2], [1, 2, 3], [1, 2], [1, 2])
+
+
+def test_edge_components(ohlc_data):
+    """Components reproduce the estimate and explain NaN results."""
+    args = (ohlc_data.Open, ohlc_data.High, ohlc_data.Low, ohlc_data.Close)
+    d = edge_components(*args, sign=True)
+    assert d == edge(*args, sign=True, return_diagnostics=True)
+    assert d["spread"] == pytest.approx(edge(*args, sign=True), rel=1e-12)
+    assert NAN_REASONS[d["reason"]] == "ok"
+    assert d["n_obs"] == len(ohlc_data) - 1
+    vt = d["v1"] + d["v2"]
+    assert d["s2"] == pytest.approx((d["v2"] * d["e1"] + d["v1"] * d["e2"]) / vt, rel=1e-12)
+
+    short = edge_components([18.21, 17.61], [18.21, 17.61], [17.61, 17.61], [17.61, 17.61])
+    assert np.isnan(short["spread"]) and NAN_REASONS[short["reason"]] == "insufficient_bars"
+    flat = edge_components(*[np.full(10, 100.0)] * 4)
+    assert np.isnan(flat["spread"]) and NAN_REASONS[flat["reason"]] == "tau_sum_below_2"
+
+
+def test_edge_nogil_path(ohlc_data, ohlc_missing_data):
+    """The compiled GIL-free path matches the NumPy path."""
+    for data in (ohlc_data, ohlc_missing_data):
+        args = (data.Open, data.High, data.Low, data.Close)
+        expected, result = edge(*args, sign=True), edge(*args, sign=True, nogil=True)
+        assert np.isnan(result) if np.isnan(expected) else result == pytest.approx(expected, rel=1e-9)
+    assert np.isnan(edge([18.21, 17.61], [18.21, 17.61], [17.61, 17.61], [17.61, 17.61], nogil=True))
+    with pytest.raises(ValueError, match="must have the same length"):
+        edge([1, 2], [1, 2, 3], [1, 2], [1, 2], nogil=True)
+
+
+def test_edge_hft_nogil_path(ohlc_data):
+    """The compiled GIL-free HFT path matches its NumPy path on clean data."""
+    args = (ohlc_data.Open, ohlc_data.High, ohlc_data.Low, ohlc_data.Close)
+    for sign in (False, True):
+        expected = edge_hft.edge(*args, sign=sign)
+        assert edge_hft.edge(*args, sign=sign, nogil=True) == pytest.approx(expected, rel=1e-9)
+    assert np.isnan(edge_hft.edge([18.21, 17.61], [18.21, 17.61], [17.61, 17.61], [17.61, 17.61], nogil=True))
+    with pytest.raises(ValueError, match="must have the same length"):
+        edge_hft.edge([1, 2], [1, 2, 3], [1, 2], [1, 2], nogil=True)
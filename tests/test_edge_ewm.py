@@ -0,0 +1,102 @@
+"""
+Unit tests for the exponentially weighted EDGE estimator.
+
+Test suite for edge_ewm and EdgeEWM covering an explicit weighted-mean
+reference, the long half-life limit, streaming updates and validation.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantjourney_bidask import EdgeEWM, edge_ewm, edge_expanding
+
+
+@pytest.fixture
+def ohlc_data():
+    """OHLC bars with a few missing prices."""
+    rng = np.random.default_rng(11)
+    n = 300
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    df = pd.DataFrame({
+        "open": prices * (1 + rng.uniform(-0.003, 0.003, n)),
+        "high": prices * (1 + rng.uniform(0.003, 0.008, n)),
+        "low": prices * (1 - rng.uniform(0.003, 0.008, n)),
+        "close": prices * (1 + rng.uniform(-0.003, 0.003, n)),
+    })
+    df.iloc[[40, 41, 150], [0, 3]] = np.nan
+    return df
+
+
+def _weighted_edge(df, halflife):
+    """EDGE with every nanmean replaced by an exponentially weighted mean."""
+    o, h, l, c = (np.log(df[k].to_numpy()) for k in ("open", "high", "low", "close"))
+    m = (h + l) / 2
+    r1, r2, r3 = m[1:] - o[1:], o[1:] - m[:-1], m[1:] - c[:-1]
+    r4, r5 = c[:-1] - m[:-1], o[1:] - c[:-1]
+    w = 0.5 ** (np.arange(len(r1))[::-1] / halflife)
+
+    def wmean(x):
+        ok = ~np.isnan(x)
+        return np.sum(w[ok] * x[ok]) / np.sum(w[ok])
+
+    def ind(a, b):
+        return np.where(np.isnan(a) | np.isnan(b), np.nan, (a != b).astype(float))
+
+    tau = np.where(np.isnan(h[1:]) | np.isnan(l[1:]) | np.isnan(c[:-1]), np.nan,
+                   ((h[1:] != l[1:]) | (l[1:] != c[:-1])).astype(float))
+    pt = wmean(tau)
+    po = wmean(tau * ind(o[1:], h[1:])) + wmean(tau * ind(o[1:], l[1:]))
+    pc = wmean(tau * ind(c[:-1], h[:-1])) + wmean(tau * ind(c[:-1], l[:-1]))
+    d1 = r1 - wmean(r1) / pt * tau
+    d3 = r3 - wmean(r3) / pt * tau
+    d5 = r5 - wmean(r5) / pt * tau
+    x1 = -4 / po * d1 * r2 - 4 / pc * d3 * r4
+    x2 = -4 / po * d1 * r5 - 4 / pc * d5 * r4
+    e1, e2 = wmean(x1), wmean(x2)
+    v1, v2 = wmean(x1**2) - e1**2, wmean(x2**2) - e2**2
+    s2 = (v2 * e1 + v1 * e2) / (v1 + v2)
+    return np.sqrt(abs(s2))
+
+
+@pytest.mark.parametrize("halflife", [30, 1.0, 0.5])
+def test_matches_weighted_reference(ohlc_data, halflife):
+    """Each estimate equals EDGE with exponentially weighted means."""
+    out = edge_ewm(ohlc_data, halflife=halflife)
+    for t in (2, 60, 151, 299):
+        expected = _weighted_edge(ohlc_data.iloc[: t + 1], halflife)
+        assert out.iloc[t] == pytest.approx(expected, rel=1e-9)
+
+
+def test_long_halflife_matches_expanding(ohlc_data):
+    """With a very long half-life all bars weigh the same."""
+    out = edge_ewm(ohlc_data, halflife=1e12)
+    expected = edge_expanding(ohlc_data, min_periods=3)
+    assert np.isfinite(out.iloc[2])
+    np.testing.assert_allclose(out.iloc[2:], expected.iloc[2:], rtol=1e-6)
+    assert out.name == "EDGE_ewm"
+    assert out.index.equals(ohlc_data.index)
+
+
+def test_streaming_matches_batch(ohlc_data):
+    """Bar-by-bar updates give the batch result with constant-size state."""
+    stream = EdgeEWM(halflife=20)
+    got = [stream.update(*row) for row in ohlc_data.itertuples(index=False)]
+    np.testing.assert_allclose(got, edge_ewm(ohlc_data, halflife=20), rtol=1e-12)
+    assert stream.n_bars == len(ohlc_data)
+    assert stream._sums.size + stream._last.size == 49
+    assert np.isnan(got[:2]).all() and not np.isnan(got[2:]).all()
+
+
+def test_validation():
+    """Non-positive half-lives and ragged inputs are rejected."""
+    for halflife in (0, -1):
+        with pytest.raises(ValueError):
+            EdgeEWM(halflife=halflife)
+    with pytest.raises(ValueError):
+        EdgeEWM(halflife=0.5).update_many([1.0], [1.0, 2.0], [1.0], [1.0])
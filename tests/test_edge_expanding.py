@@ -65,4 +65,12 @@ def test_edge_expanding(ohlc_data, min_periods, sign):
         rtol=1e-6, # Relaxed tolerance slightly for floating point differences
         atol=1e-6,
         err_msg="Expanding estimates do not match expected estimates",
-    )
\ No newline at end of file
+    )
+
+
+@pytest.mark.parametrize("sign", [True, False])
+def test_edge_expanding_nogil(ohlc_data, sign):
+    """The single compiled pass matches the per-row edge() loop."""
+    expected = edge_expanding(ohlc_data, min_periods=5, sign=sign)
+    result = edge_expanding(ohlc_data, min_periods=5, sign=sign, nogil=True)
+    pd.testing.assert_series_equal(result, expected, rtol=1e-9, atol=1e-12)
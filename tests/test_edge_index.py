@@ -0,0 +1,112 @@
+"""
+Unit tests for the EDGE interval index.
+
+Test suite for EdgeIndex covering random interval queries against edge,
+label-based bounds, small and empty intervals, save/load round trips and
+revised bars.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantjourney_bidask import EdgeIndex, edge
+
+
+@pytest.fixture
+def ohlc_data():
+    """1000 hourly bars with a few missing prices."""
+    rng = np.random.default_rng(4)
+    n = 1000
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    df = pd.DataFrame({
+        "open": prices * (1 + rng.uniform(-0.002, 0.002, n)),
+        "high": prices * (1 + rng.uniform(0.002, 0.006, n)),
+        "low": prices * (1 - rng.uniform(0.002, 0.006, n)),
+        "close": prices * (1 + rng.uniform(-0.002, 0.002, n)),
+    }, index=pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC"))
+    df.iloc[[100, 101, 555], [1, 3]] = np.nan
+    return df
+
+
+def _edge(df, i0, i1, sign=False):
+    sl = df.iloc[i0:i1 + 1]
+    return edge(sl.open, sl.high, sl.low, sl.close, sign=sign)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64])
+def test_random_intervals_match_edge(ohlc_data, block_size):
+    """Any [i0, i1] query equals edge() on that slice."""
+    index = EdgeIndex(ohlc_data, block_size=block_size)
+    rng = np.random.default_rng(block_size)
+    i0 = rng.integers(0, 990, 200)
+    i1 = i0 + rng.integers(2, 400, 200).clip(max=999 - i0)
+    got = index.spread_iloc(i0, i1, sign=True)
+    expected = [_edge(ohlc_data, a, b, sign=True) for a, b in zip(i0, i1)]
+    np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-14)
+    assert index.spread_iloc(0, 999) == pytest.approx(_edge(ohlc_data, 0, 999), rel=1e-9)
+
+
+def test_label_queries(ohlc_data):
+    """Timestamp bounds are inclusive; None leaves a side open."""
+    index = EdgeIndex(ohlc_data)
+    start, end = pd.Timestamp("2024-01-05", tz="UTC"), pd.Timestamp("2024-01-20 12:00", tz="UTC")
+    expected = edge(*(ohlc_data.loc[start:end, k] for k in ("open", "high", "low", "close")))
+    assert index.spread(start, end) == pytest.approx(expected, rel=1e-9)
+    assert index.spread() == pytest.approx(_edge(ohlc_data, 0, 999), rel=1e-9)
+    np.testing.assert_allclose(index.spread_many([start, None], [end, end]), [
+        expected, index.spread(None, end)
+    ])
+
+
+def test_short_intervals_are_nan(ohlc_data):
+    """Fewer than three bars, or bounds outside the data, give NaN."""
+    index = EdgeIndex(ohlc_data, block_size=4)
+    assert np.isnan(index.spread_iloc(10, 11))
+    assert np.isnan(index.spread_iloc(5, 1))
+    assert np.isnan(index.spread("2030-01-01", "2031-01-01"))
+    assert not np.isnan(index.spread_iloc(10, 12))
+
+
+def test_save_and_load(ohlc_data, tmp_path):
+    """A saved index answers the same queries after loading."""
+    index = EdgeIndex(ohlc_data, block_size=16)
+    path = tmp_path / "btc.edge.npz"
+    index.save(path)
+    loaded = EdgeIndex.load(path)
+    assert loaded.index.equals(ohlc_data.index)
+    assert len(loaded) == len(ohlc_data) and loaded.block_size == 16
+    i0 = np.arange(0, 900, 37)
+    np.testing.assert_array_equal(loaded.spread_iloc(i0, i0 + 99), index.spread_iloc(i0, i0 + 99))
+
+
+def test_save_and_load_across_dst(ohlc_data, tmp_path):
+    """An exchange-local index crossing a DST fall-back round-trips exactly."""
+    df = ohlc_data.tz_convert("America/New_York")  # 2024-01-01 .. 2024-02-11
+    df.index = df.index + pd.Timedelta(days=305)  # now covers 2024-11-03 01:00 twice
+    path = tmp_path / "ny.edge.npz"
+    EdgeIndex(df, block_size=16).save(path)
+    loaded = EdgeIndex.load(path)
+    assert loaded.index.equals(df.index) and str(loaded.index.tz) == "America/New_York"
+
+
+def test_update_bar_matches_rebuild(ohlc_data):
+    """A revised bar gives the same queries as an index built on revised data."""
+    index = EdgeIndex(ohlc_data, block_size=8)
+    revised = ohlc_data.copy()
+    for i in (0, 63, 64, 500, 999):
+        row = revised.iloc[i] * 1.01
+        revised.iloc[i] = row
+        index.update_bar(i, *row[["open", "high", "low", "close"]])
+    fresh = EdgeIndex(revised, block_size=8)
+    i0 = np.arange(0, 980, 13)
+    np.testing.assert_allclose(
+        index.spread_iloc(i0, i0 + 19), fresh.spread_iloc(i0, i0 + 19), rtol=1e-12
+    )
+    with pytest.raises(IndexError):
+        index.update_bar(1000, 1, 1, 1, 1)
@@ -0,0 +1,44 @@
+"""
+Unit tests for concurrent estimation of many frames on a thread pool.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.synthetic import simulate_ohlc
+from quantjourney_bidask import edge, edge_many, edge_rolling
+
+
+@pytest.fixture
+def frames():
+    return {f"SYM{i}": simulate_ohlc(300, spread=0.003, seed=i) for i in range(6)}
+
+
+def test_edge_many_matches_edge(frames):
+    expected = [edge(f.open, f.high, f.low, f.close) for f in frames.values()]
+    result = edge_many(list(frames.values()), max_workers=3)
+    assert isinstance(result, np.ndarray)
+    np.testing.assert_allclose(result, expected, rtol=1e-9)
+    keyed = edge_many(frames, max_workers=1)
+    assert list(keyed.index) == list(frames) and np.allclose(keyed.to_numpy(), expected, rtol=1e-9)
+    upper = edge_many([f.rename(columns=str.upper) for f in frames.values()], max_workers=2)
+    np.testing.assert_array_equal(upper, result)
+
+
+def test_edge_many_rolling(frames):
+    result = edge_many(frames, max_workers=4, window=21, step=2)
+    assert list(result) == list(frames)
+    for key, df in frames.items():
+        pd.testing.assert_series_equal(result[key], edge_rolling(df, window=21, step=2))
@@ -10,11 +10,20 @@ Date: 2025-06-28
 Part of the QuantJourney framework - The framework with advanced quantitative 
 finance tools and insights.
 """
+import pickle
+
 import numpy as np
 import pandas as pd
 import pytest
 
-from quantjourney_bidask import edge, edge_rolling
+from quantjourney_bidask import (
+    NAN_REASONS,
+    edge,
+    edge_components,
+    edge_rolling,
+    edge_rolling_update,
+)
+from quantjourney_bidask.edge_rolling import _chunk_bounds, _session_starts
 
 
 @pytest.fixture
@@ -71,4 +80,128 @@ def test_edge_rolling(ohlc_data, window, sign, step):
         rtol=1e-6, # Relaxed tolerance slightly for floating point differences
         atol=1e-6,
         err_msg="Rolling estimates do not match expected estimates",
-    )
\ No newline at end of file
+    )
+
+
+@pytest.fixture
+def intraday_data():
+    """Three sessions of 1-minute bars with overnight gaps and jumps."""
+    rng = np.random.default_rng(8)
+    frames = []
+    for day, jump in zip(["2024-03-04", "2024-03-05", "2024-03-06"], [0.0, 0.05, -0.04]):
+        index = pd.date_range(f"{day} 09:30", periods=60, freq="1min", tz="America/New_York")
+        prices = 100 * np.exp(jump + np.cumsum(rng.normal(0, 0.001, 60)))
+        frames.append(pd.DataFrame({
+            "open": prices * (1 + rng.uniform(-0.001, 0.001, 60)),
+            "high": prices * (1 + rng.uniform(0.001, 0.003, 60)),
+            "low": prices * (1 - rng.uniform(0.001, 0.003, 60)),
+            "close": prices * (1 + rng.uniform(-0.001, 0.001, 60)),
+        }, index=index))
+    return pd.concat(frames)
+
+
+def test_sessions_match_per_day_windows(intraday_data):
+    """Session windows equal edge_rolling run on each day separately."""
+    expected = pd.concat(
+        [edge_rolling(day, window=20) for _, day in intraday_data.groupby(intraday_data.index.date)]
+    )
+    for kwargs in (
+        {"sessions": "D"},
+        {"sessions": pd.Timedelta("1h")},
+        {"sessions": [60, 120]},
+        {"segment_by": intraday_data.index.date},
+    ):
+        out = edge_rolling(intraday_data, window=20, **kwargs)
+        pd.testing.assert_series_equal(out, expected, rtol=1e-12)
+    assert out.iloc[60:79].isna().all() and out.iloc[79:120].notna().all()
+
+
+def test_sessions_mask_overnight_transitions(intraday_data):
+    """The previous session's last bar never enters a window of the next one."""
+    shocked = intraday_data.copy()
+    shocked.iloc[59] *= 1.2
+    out = edge_rolling(shocked, window=20, step=5, sessions="D")
+    base = edge_rolling(intraday_data, window=20, step=5, sessions="D")
+    pd.testing.assert_series_equal(out.iloc[60:], base.iloc[60:])
+    assert not np.allclose(
+        edge_rolling(shocked, window=20).iloc[60:80].dropna(),
+        edge_rolling(intraday_data, window=20).iloc[60:80].dropna(),
+    )
+
+
+def test_sessions_validation(ohlc_data):
+    """Calendar rules need a DatetimeIndex; options are exclusive."""
+    with pytest.raises(ValueError):
+        edge_rolling(ohlc_data, window=5, sessions="D")
+    with pytest.raises(ValueError):
+        edge_rolling(ohlc_data, window=5, sessions=[0], segment_by=np.zeros(len(ohlc_data)))
+    with pytest.raises(ValueError):
+        edge_rolling(ohlc_data, window=5, sessions=[len(ohlc_data)])
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"step": 5, "min_periods": 30},
+    {"sessions": "D"},
+    {"sessions": pd.Timedelta("1h"), "sign": True},
+])
+def test_incremental_update_equals_full_recompute(intraday_data, kwargs):
+    """Appending chunks gives bit-identical values to one edge_rolling call."""
+    expected = edge_rolling(intraday_data, window=20, **kwargs)
+    parts, state = [], None
+    for lo, hi in [(0, 7), (7, 7), (7, 61), (61, 100), (100, 180)]:
+        out, state = edge_rolling_update(state, intraday_data.iloc[lo:hi], window=20, **kwargs)
+        parts.append(out)
+    pd.testing.assert_series_equal(pd.concat(parts), expected, check_exact=True)
+    assert state.rows == len(intraday_data)
+    assert state._ring.shape == (1, 20, 4)
+
+
+def test_incremental_update_state_is_persistent(intraday_data):
+    """States survive pickling and are not modified by later updates."""
+    data = intraday_data.assign(day=intraday_data.index.day)
+    head, state = edge_rolling_update(None, data.iloc[:90], window=20, segment_by="day")
+    frozen = pickle.loads(pickle.dumps(state))
+    tail, _ = edge_rolling_update(state, data.iloc[90:])
+    again, _ = edge_rolling_update(frozen, data.iloc[90:])
+    pd.testing.assert_series_equal(tail, again, check_exact=True)
+    expected = edge_rolling(data, window=20, segment_by="day")
+    pd.testing.assert_series_equal(pd.concat([head, tail]), expected, check_exact=True)
+    with pytest.raises(ValueError):
+        edge_rolling_update(None, data, window=20, sessions=[0, 60])
+
+
+def test_rolling_diagnostics(ohlc_data):
+    """Per-window components match edge_components on the same slice."""
+    window = 21
+    diag = edge_rolling(ohlc_data, window=window, step=2, return_diagnostics=True)
+    plain = edge_rolling(ohlc_data, window=window, step=2)
+    np.testing.assert_array_equal(diag["spread"].to_numpy(), plain.to_numpy())
+    reasons = diag["reason"].map(dict(enumerate(NAN_REASONS)))
+    assert (reasons[: window - 1:2] == "insufficient_bars").all()
+    assert (reasons[1::2] == "not_evaluated").all()
+
+    for i in (window - 1, 30, 48):
+        w = ohlc_data.iloc[i - window + 1 : i + 1]
+        expected = edge_components(w.open, w.high, w.low, w.close)
+        for key, value in expected.items():
+            if key != "reason":
+                np.testing.assert_allclose(diag[key].iloc[i], value, rtol=1e-9)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"sessions": "D", "step": 3, "min_periods": 12}])
+def test_parallel_equals_serial(intraday_data, kwargs):
+    """Chunks run in worker processes stitch to the serial values bit for bit."""
+    data = intraday_data.copy()
+    data.iloc[::17, 1] = np.nan
+    assert len(_chunk_bounds(_session_starts(data, kwargs.get("sessions")), 5, 4)) > 3
+    expected = edge_rolling(data, window=5, return_diagnostics=True, **kwargs)
+    result = edge_rolling(data, window=5, return_diagnostics=True, n_jobs=4, **kwargs)
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    pd.testing.assert_series_equal(
+        edge_rolling(data, window=5, n_jobs=4, **kwargs),
+        edge_rolling(data, window=5, **kwargs),
+        check_exact=True,
+    )
+    with pytest.raises(ValueError):
+        edge_rolling(data, window=5, n_jobs=0)
@@ -0,0 +1,64 @@
+"""
+Unit tests for correctable rolling EDGE estimates.
+
+Test suite for EdgeRollingTable covering corrections against a full
+edge_rolling recompute, the set of repaired windows and interval queries on
+revised data.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantjourney_bidask import EdgeRollingTable, edge, edge_rolling
+
+
+@pytest.fixture
+def ohlc_data():
+    """500 minute bars."""
+    rng = np.random.default_rng(21)
+    n = 500
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    return pd.DataFrame({
+        "open": prices * (1 + rng.uniform(-0.001, 0.001, n)),
+        "high": prices * (1 + rng.uniform(0.001, 0.004, n)),
+        "low": prices * (1 - rng.uniform(0.001, 0.004, n)),
+        "close": prices * (1 + rng.uniform(-0.001, 0.001, n)),
+    }, index=pd.date_range("2024-01-01", periods=n, freq="min"))
+
+
+@pytest.mark.parametrize("min_periods", [None, 30])
+def test_corrections_match_full_recompute(ohlc_data, min_periods):
+    """After revising bars, estimates equal edge_rolling on the revised data."""
+    table = EdgeRollingTable(ohlc_data, window=20, min_periods=min_periods, block_size=16)
+    revised = ohlc_data.copy()
+    for i in (0, 5, 19, 250, 490, 499):
+        row = revised.iloc[i] * np.array([1.004, 1.01, 0.99, 0.997])
+        revised.iloc[i] = row
+        table.correct_iloc(i, *row)
+    expected = edge_rolling(revised, window=20, min_periods=min_periods)
+    pd.testing.assert_series_equal(table.estimates, expected, rtol=1e-11)
+    assert table.corrections == 6
+
+
+def test_correct_returns_repaired_windows(ohlc_data):
+    """Only the windows containing the revised bar are returned and changed."""
+    table = EdgeRollingTable(ohlc_data, window=20)
+    before = table.estimates
+    ts = ohlc_data.index[100]
+    changed = table.correct(ts, 100.0, 101.0, 99.0, 100.5)
+    assert changed.index.equals(ohlc_data.index[100:120])
+    after = table.estimates
+    pd.testing.assert_series_equal(after.iloc[:100], before.iloc[:100])
+    pd.testing.assert_series_equal(after.iloc[120:], before.iloc[120:])
+    assert not np.allclose(after.iloc[100:120], before.iloc[100:120])
+    sl = ohlc_data.iloc[90:111].copy()
+    sl.iloc[10] = [100.0, 101.0, 99.0, 100.5]
+    assert table.edge_index.spread_iloc(90, 110) == pytest.approx(
+        edge(sl.open, sl.high, sl.low, sl.close), rel=1e-9
+    )
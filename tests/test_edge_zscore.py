@@ -0,0 +1,115 @@
+"""
+Unit tests for online spread z-scores and liquidity-risk flags.
+
+Test suite for edge_zscore and EdgeZScore covering rolling, EWM and
+expanding z-scores against pandas, panel grouping and per-bar updates.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantjourney_bidask import EdgeZScore, edge_rolling, edge_zscore
+
+
+def _ohlc(rng, n, width):
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "open": prices * (1 + rng.uniform(-width, width, n)),
+        "high": prices * (1 + rng.uniform(width, 3 * width, n)),
+        "low": prices * (1 - rng.uniform(width, 3 * width, n)),
+        "close": prices * (1 + rng.uniform(-width, width, n)),
+    })
+
+
+@pytest.fixture
+def ohlc_data():
+    """OHLC bars whose spread widens halfway through."""
+    rng = np.random.default_rng(5)
+    return pd.concat([_ohlc(rng, 300, 0.002), _ohlc(rng, 100, 0.006)], ignore_index=True)
+
+
+def test_rolling_zscore_matches_pandas(ohlc_data):
+    """Rolling z-score equals pandas rolling mean/std of edge_rolling."""
+    out = edge_zscore(ohlc_data, window=20, zscore_window=50)
+    spread = edge_rolling(ohlc_data, window=20)
+    expected = (spread - spread.rolling(50).mean()) / spread.rolling(50).std()
+    np.testing.assert_allclose(out["spread"], spread, rtol=1e-6, atol=1e-12)
+    np.testing.assert_allclose(out["spread_zscore"], expected, rtol=1e-8, atol=1e-10)
+
+
+def test_ewm_and_expanding_zscores_match_pandas(ohlc_data):
+    """EWM and expanding z-scores are causal equivalents of pandas ewm/expanding."""
+    spread = edge_rolling(ohlc_data, window=20)
+
+    out = edge_zscore(ohlc_data, window=20, halflife=10)
+    ewm = spread.ewm(halflife=10, adjust=False, ignore_na=True, min_periods=2)
+    expected = (spread - ewm.mean()) / np.sqrt(ewm.var(bias=True))
+    np.testing.assert_allclose(out["spread_zscore"], expected, rtol=1e-8, atol=1e-10)
+
+    out = edge_zscore(ohlc_data, window=20)
+    expected = (spread - spread.expanding(2).mean()) / spread.expanding(2).std()
+    np.testing.assert_allclose(out["spread_zscore"], expected, rtol=1e-8, atol=1e-10)
+
+
+def test_risk_flags_are_causal(ohlc_data):
+    """Flags fire on the spread regime change and do not depend on later bars."""
+    full = edge_zscore(ohlc_data, window=20, zscore_window=100, threshold=2.0)
+    head = edge_zscore(ohlc_data.iloc[:320], window=20, zscore_window=100, threshold=2.0)
+    pd.testing.assert_frame_equal(full.iloc[:320], head)
+    assert full["risk_flag"].iloc[300:340].any()
+    assert full["risk_flag"].dtype == bool
+
+
+def test_panel_and_streaming_match_single_symbol(ohlc_data):
+    """A long panel and per-bar updates match per-symbol batch results."""
+    rng = np.random.default_rng(9)
+    other = _ohlc(rng, len(ohlc_data), 0.004)
+    panel = pd.concat(
+        [ohlc_data.assign(symbol="AAA"), other.assign(symbol="BBB")]
+    ).sort_index(kind="stable")
+    out = edge_zscore(panel, window=10, zscore_window=30, by="symbol")
+    for symbol, df in [("AAA", ohlc_data), ("BBB", other)]:
+        expected = edge_zscore(df, window=10, zscore_window=30)
+        got = out[(panel["symbol"] == symbol).to_numpy()]
+        np.testing.assert_allclose(got["spread_zscore"], expected["spread_zscore"], rtol=1e-12)
+
+    engine = EdgeZScore(["AAA", "BBB"], window=10, zscore_window=30)
+    live = [engine.update(r.symbol, r.open, r.high, r.low, r.close) for r in panel.itertuples()]
+    np.testing.assert_allclose([z for _, z, _ in live], out["spread_zscore"], rtol=1e-12)
+    assert [f for _, _, f in live] == out["risk_flag"].tolist()
+
+
+def test_panel_diagnostics(ohlc_data):
+    """Panel diagnostics match the per-symbol rolling diagnostics."""
+    rng = np.random.default_rng(11)
+    other = _ohlc(rng, len(ohlc_data), 0.004)
+    panel = pd.concat(
+        [ohlc_data.assign(symbol="AAA"), other.assign(symbol="BBB")]
+    ).sort_index(kind="stable")
+    out = edge_zscore(panel, window=10, zscore_window=30, by="symbol", return_diagnostics=True)
+    plain = edge_zscore(panel, window=10, zscore_window=30, by="symbol")
+    pd.testing.assert_frame_equal(out[plain.columns], plain)
+    for symbol, df in [("AAA", ohlc_data), ("BBB", other)]:
+        expected = edge_rolling(df, window=10, return_diagnostics=True)
+        got = out[(panel["symbol"] == symbol).to_numpy()]
+        np.testing.assert_allclose(got["pt"], expected["pt"], rtol=1e-12)
+        np.testing.assert_allclose(got["s2"], expected["s2"], rtol=1e-9)
+        np.testing.assert_array_equal(got["reason"], expected["reason"])
+
+
+def test_validation():
+    """Invalid parameters are rejected."""
+    with pytest.raises(ValueError):
+        EdgeZScore(window=2)
+    with pytest.raises(ValueError):
+        EdgeZScore(zscore_window=50, halflife=10)
+    with pytest.raises(ValueError):
+        EdgeZScore(halflife=0)
+    with pytest.raises(KeyError):
+        EdgeZScore(["AAA"]).update("BBB", 1, 1, 1, 1)
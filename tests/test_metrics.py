@@ -0,0 +1,119 @@
+"""
+Unit tests for the streaming/monitoring metrics and their Prometheus export.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.realtime import RealtimeStream
+from data.synthetic import simulate_ohlc
+from quantjourney_bidask import LiveSpreadMonitor, MetricsRegistry, MetricsServer
+from quantjourney_bidask.metrics import STAGE_LATENCY
+
+
+def _samples(text):
+    """Parse exposition text into {sample name with labels: value}."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            out[name] = float(value)
+    return out
+
+
+def test_render_counters_gauges_and_histograms():
+    """Text format follows the Prometheus exposition rules."""
+    registry = MetricsRegistry()
+    bars = registry.counter("bars_total", "Bars seen.", "symbol")
+    bars.inc(label="BTCUSDT")
+    bars.inc(2, label="ETHUSDT")
+    depth = [3]
+    registry.gauge("queue_depth", "Pending bars.", fn=lambda: depth[0])
+    hist = registry.histogram("lat_seconds", "Latency.", "stage", buckets_ns=[1_000, 1_000_000])
+    hist.observe_ns(500, "estimate")
+    hist.observe_ns(20_000, "estimate")
+    hist.observe_ns(5_000_000, "estimate")
+
+    assert registry.counter("bars_total", "Bars seen.", "symbol") is bars
+    with pytest.raises(ValueError):
+        registry.gauge("bars_total", "Bars seen.")
+
+    text = registry.render()
+    assert "# TYPE bars_total counter" in text
+    assert "# TYPE lat_seconds histogram" in text
+    samples = _samples(text)
+    assert samples['bars_total{symbol="BTCUSDT"}'] == 1
+    assert samples['bars_total{symbol="ETHUSDT"}'] == 2
+    assert samples["queue_depth"] == 3
+    assert samples['lat_seconds_bucket{stage="estimate",le="1e-06"}'] == 1
+    assert samples['lat_seconds_bucket{stage="estimate",le="0.001"}'] == 2
+    assert samples['lat_seconds_bucket{stage="estimate",le="+Inf"}'] == 3
+    assert samples['lat_seconds_count{stage="estimate"}'] == 3
+    assert samples['lat_seconds_sum{stage="estimate"}'] == pytest.approx(0.0050205)
+    assert hist.quantile(0.5, "estimate") == 0.001
+    assert hist.quantile(0.99, "estimate") == float("inf")
+
+
+def test_http_endpoint_serves_metrics():
+    """The stdlib server exposes /metrics and 404s anything else."""
+    registry = MetricsRegistry()
+    registry.counter("up_total", "Scrapes.").inc()
+    with MetricsServer(registry) as server:
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert _samples(response.read().decode())["up_total"] == 1
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(server.url.replace("/metrics", "/other"), timeout=5)
+
+
+def test_monitor_and_stream_metrics():
+    """Monitor counters and stream stage latencies land in one registry."""
+    registry = MetricsRegistry()
+    panel = simulate_ohlc(40, n_symbols=2, symbols=["AAA", "BBB"], seed=4)
+    monitor = LiveSpreadMonitor(["AAA", "BBB"], window=10, metrics=registry)
+    monitor.set_alert_threshold("AAA", high_bps=0.0)
+    monitor.add_alert_callback(lambda alert: None)
+    monitor.update_many(
+        panel["symbol"].to_numpy(), panel["open"], panel["high"], panel["low"], panel["close"]
+    )
+    samples = _samples(registry.render())
+    assert samples['bidask_monitor_updates_total{symbol="AAA"}'] == 40
+    assert samples['bidask_monitor_nan_estimates_total{symbol="BBB"}'] == 9
+    assert samples['bidask_monitor_alerts_total{symbol="AAA"}'] == 31
+    assert registry[STAGE_LATENCY].count("estimate") == 1
+
+    stream = RealtimeStream(["AAA", "BBB"], synthetic=True, tick_seconds=0.005, metrics=registry)
+    stream.add_callback(monitor.on_bar)
+    stream.start()
+    try:
+        deadline = time.monotonic() + 5
+        while monitor.updates < 100 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stream.stop()
+    samples = _samples(registry.render())
+    stats = stream.stats()
+    assert samples['bidask_stream_bars_received_total{symbol="AAA"}'] >= 10
+    assert sum(v for k, v in samples.items() if k.startswith("bidask_stream_bars_dispatched")) == (
+        stats["dispatched"]
+    )
+    assert samples["bidask_stream_dropped_total"] == 0
+    assert "bidask_stream_queue_depth" in samples
+    latency = registry[STAGE_LATENCY]
+    for stage in ("bar_build", "receive", "callback", "ingest_to_estimate"):
+        assert latency.count(stage) > 0
+    assert np.isfinite(latency.quantile(0.5, "receive"))
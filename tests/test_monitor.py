@@ -0,0 +1,147 @@
+"""
+Unit tests for the live multi-symbol spread monitor.
+
+Test suite for LiveSpreadMonitor covering consistency with edge_rolling for
+interleaved symbols, threshold alerts, callbacks and stream bar handling.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantjourney_bidask import LiveSpreadMonitor, edge_rolling
+
+
+@pytest.fixture
+def panel():
+    """Three symbols with different spread levels, 120 bars each."""
+    rng = np.random.default_rng(3)
+    frames = {}
+    for k, symbol in enumerate(["BTCUSDT", "ETHUSDT", "SOLUSDT"]):
+        n = 120
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        width = 0.002 * (k + 1)
+        frames[symbol] = pd.DataFrame({
+            "open": prices * (1 + rng.uniform(-width, width, n)),
+            "high": prices * (1 + rng.uniform(width, 2 * width, n)),
+            "low": prices * (1 - rng.uniform(width, 2 * width, n)),
+            "close": prices * (1 + rng.uniform(-width, width, n)),
+        })
+    return frames
+
+
+def _interleave(panel):
+    symbols = np.repeat(list(panel), len(next(iter(panel.values()))))
+    stacked = pd.concat(panel.values(), ignore_index=True)
+    order = np.argsort(np.tile(np.arange(len(stacked) // len(panel)), len(panel)), kind="stable")
+    return symbols[order], stacked.iloc[order]
+
+
+def test_matches_edge_rolling_per_symbol(panel):
+    """Interleaved updates give each symbol its own edge_rolling estimate."""
+    monitor = LiveSpreadMonitor(list(panel), window=20)
+    symbols, bars = _interleave(panel)
+    out = monitor.update_many(
+        symbols, bars["open"], bars["high"], bars["low"], bars["close"]
+    )
+    for symbol, df in panel.items():
+        expected = edge_rolling(df, window=20).to_numpy()
+        np.testing.assert_allclose(out[symbols == symbol], expected, rtol=1e-6, atol=1e-10)
+        assert monitor.spread[monitor.index[symbol]] == pytest.approx(expected[-1], rel=1e-6)
+    assert monitor.updates == len(symbols)
+    assert (monitor.bars == 120).all()
+
+
+def test_single_updates_match_batch(panel):
+    """Bar-by-bar updates agree with the batch path."""
+    batch = LiveSpreadMonitor(list(panel), window=10)
+    single = LiveSpreadMonitor(list(panel), window=10)
+    symbols, bars = _interleave(panel)
+    expected = batch.update_many(
+        symbols, bars["open"], bars["high"], bars["low"], bars["close"]
+    )
+    got = [single.update(s, *row) for s, row in zip(symbols, bars.itertuples(index=False))]
+    np.testing.assert_allclose(got, expected, rtol=1e-12)
+    pd.testing.assert_frame_equal(single.snapshot(), batch.snapshot())
+
+
+def test_alerts_and_data_callbacks(panel):
+    """Threshold breaches fire alerts; every bar fires the data callback."""
+    monitor = LiveSpreadMonitor(list(panel), window=20)
+    monitor.set_alert_threshold("solusdt", high_bps=1.0)
+    monitor.set_alert_threshold("BTCUSDT", low_bps=1e6)
+    alerts, data = [], []
+    monitor.add_alert_callback(alerts.append)
+    monitor.add_data_callback(lambda candle, spread: data.append((candle, spread)))
+
+    for symbol, df in panel.items():
+        for row in df.itertuples(index=False):
+            monitor.update(symbol, *row)
+
+    assert len(data) == 3 * 120
+    assert data[-1][1]["spread_bps"] == pytest.approx(monitor.spread_bps[2])
+    kinds = {(a["symbol"], a["type"]) for a in alerts}
+    assert kinds == {("SOLUSDT", "HIGH"), ("BTCUSDT", "LOW")}
+    # Alerts only start once a symbol has a full window.
+    assert len(alerts) == 2 * (120 - 19)
+
+
+def test_on_bar_skips_open_and_unknown_bars(panel):
+    """Stream bars still in progress or for other symbols are ignored."""
+    monitor = LiveSpreadMonitor(["BTCUSDT"], window=5)
+    row = panel["BTCUSDT"].iloc[0].to_dict()
+    assert monitor.on_bar({"symbol": "BTCUSDT", "is_closed": False, **row}) is None
+    assert monitor.on_bar({"symbol": "DOGEUSDT", **row}) is None
+    for _, row in panel["BTCUSDT"].iloc[:5].iterrows():
+        value = monitor.on_bar({"symbol": "btcusdt", "is_closed": True, **row.to_dict()})
+    assert value == pytest.approx(edge_rolling(panel["BTCUSDT"].iloc[:5], window=5).iloc[-1])
+    assert monitor.bars[0] == 5
+
+
+def test_validation():
+    """Invalid configuration and unknown symbols are rejected."""
+    with pytest.raises(ValueError):
+        LiveSpreadMonitor(["A"], window=2)
+    with pytest.raises(ValueError):
+        LiveSpreadMonitor(["A", "a"])
+    monitor = LiveSpreadMonitor(["A"])
+    with pytest.raises(KeyError):
+        monitor.update("B", 1, 1, 1, 1)
+    with pytest.raises(IndexError):
+        monitor.update_many([1], [1.0], [1.0], [1.0], [1.0])
+
+
+def test_concurrent_updates_match_serial(panel):
+    """Symbols fed from several threads (as by stream workers) match serial updates."""
+    serial = LiveSpreadMonitor(list(panel), window=20)
+    symbols, bars = _interleave(panel)
+    serial.update_many(symbols, bars["open"], bars["high"], bars["low"], bars["close"])
+
+    monitor = LiveSpreadMonitor(list(panel), window=20)
+    start = threading.Barrier(len(panel))
+
+    def feed(symbol, df):
+        start.wait()
+        for _ in range(5):  # repeat so the kernels overlap for longer
+            for row in df.itertuples():
+                monitor.on_bar({"symbol": symbol, "open": row.open, "high": row.high,
+                                "low": row.low, "close": row.close})
+
+    threads = [threading.Thread(target=feed, args=item) for item in panel.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for symbol, df in panel.items():
+        repeated = pd.concat([df] * 5, ignore_index=True)
+        expected = edge_rolling(repeated, window=20).iloc[-1]
+        assert monitor.spread[monitor.index[symbol]] == pytest.approx(expected, rel=1e-6)
+    assert monitor.updates == 5 * len(symbols)
+    np.testing.assert_array_equal(monitor.bars, 5 * serial.bars)
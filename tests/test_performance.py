@@ -0,0 +1,144 @@
+"""
+Performance regression tests for the estimator hot paths.
+
+Each case is timed (best of several runs, after a warm-up call that also
+triggers JIT compilation) and divided into the time of a fixed calibration
+workload run on the same machine, giving a machine-independent score. The
+score must stay within ``TOLERANCE`` of the checked-in baseline in
+``perf_baselines.json``, so a change that makes a hot path several times
+slower fails like a correctness bug.
+
+After an intentional speed change, regenerate the baselines with:
+    python tests/test_performance.py --update
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantjourney_bidask import EdgeStream, edge, edge_expanding, edge_rolling
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baselines.json")
+# Allowed slowdown relative to the baseline score before a test fails.
+TOLERANCE = 3.0
+REPEAT = 5
+
+
+def _ohlc(n, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return pd.DataFrame({
+        "open": prices * (1 + rng.uniform(-0.001, 0.001, n)),
+        "high": prices * (1 + rng.uniform(0.001, 0.003, n)),
+        "low": prices * (1 - rng.uniform(0.001, 0.003, n)),
+        "close": prices * (1 + rng.uniform(-0.001, 0.001, n)),
+    })
+
+
+def _best_time(fn, repeat=REPEAT):
+    fn()
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _calibration():
+    """Fixed mix of vectorized NumPy work and interpreted Python loop."""
+    x = np.random.default_rng(0).uniform(1.0, 2.0, 200_000)
+
+    def work():
+        y = np.log(x)
+        np.nanmean(np.where(y > 0.5, y, np.nan) ** 2)
+        total = 0.0
+        for v in range(50_000):
+            total += v * 0.5
+        return total
+
+    return _best_time(work)
+
+
+_DF = _ohlc(100_000)
+_STREAM_BARS = _DF.iloc[:20_000].to_numpy()
+
+
+def _stream_updates():
+    stream = EdgeStream(window=21)
+    for o, h, l, c in _STREAM_BARS:  # noqa: E741
+        stream.update(o, h, l, c)
+
+
+CASES = {
+    "edge[n=100000]": lambda: edge(_DF.open, _DF.high, _DF.low, _DF.close),
+    "edge_rolling[n=100000,w=21]": lambda: edge_rolling(_DF, window=21),
+    "edge_rolling[n=100000,w=21,step=5]": lambda: edge_rolling(_DF, window=21, step=5),
+    "edge_expanding[n=1000]": lambda: edge_expanding(_DF.iloc[:1000]),
+    "EdgeStream.update_many[n=100000,w=21]": lambda: EdgeStream(window=21).update_many(
+        _DF.open, _DF.high, _DF.low, _DF.close
+    ),
+    "EdgeStream.update[n=20000,w=21]": _stream_updates,
+}
+
+
+def _scores(names):
+    calibration = _calibration()
+    return {name: calibration / _best_time(CASES[name]) for name in names}
+
+
+def _load_baselines():
+    with open(BASELINES) as f:
+        return json.load(f)["scores"]
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_hot_path_has_not_regressed(name):
+    """Normalized throughput stays within TOLERANCE of the baseline."""
+    baseline = _load_baselines()[name]
+    score = _scores([name])[name]
+    if score < baseline / TOLERANCE:
+        # Re-measure once to rule out a noisy neighbour before failing.
+        score = max(score, _scores([name])[name])
+    assert score >= baseline / TOLERANCE, (
+        f"PERFORMANCE REGRESSION in {name}: score {score:.3f} vs baseline "
+        f"{baseline:.3f} ({baseline / score:.1f}x slower, limit {TOLERANCE:.1f}x)"
+    )
+
+
+def test_every_case_has_a_baseline():
+    """New cases must come with a baseline."""
+    assert set(_load_baselines()) == set(CASES)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show or update performance baselines.")
+    parser.add_argument("--update", action="store_true", help="rewrite perf_baselines.json")
+    args = parser.parse_args()
+    scores = _scores(sorted(CASES))
+    for name, score in scores.items():
+        print(f"{name:<40} {score:10.4f}")
+    if args.update:
+        with open(BASELINES, "w") as f:
+            json.dump({
+                "description": "calibration time / case time (higher is faster); "
+                               "see tests/test_performance.py",
+                "scores": {k: round(v, 4) for k, v in scores.items()},
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {BASELINES}")
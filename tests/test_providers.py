@@ -0,0 +1,158 @@
+"""
+Unit tests for batched equity data providers.
+
+Test suite for the batch equity loader using local fake providers, covering
+request batching, thread-pool fallback and panel normalisation.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.providers import (
+    PANEL_COLUMNS,
+    BatchEquityLoader,
+    EquityProvider,
+    normalise_wide,
+)
+
+DATES = pd.date_range("2024-01-01", periods=5, freq="D", name="Date")
+
+
+def _single(ticker, offset):
+    base = 100.0 + offset + np.arange(len(DATES))
+    return pd.DataFrame(
+        {
+            "Open": base,
+            "High": base + 1.0,
+            "Low": base - 1.0,
+            "Close": base + 0.5,
+            "Volume": np.full(len(DATES), 1000.0),
+        },
+        index=DATES,
+    )
+
+
+class FakeBatchProvider(EquityProvider):
+    """Returns yfinance-style wide frames and records every request."""
+
+    def __init__(self, batch_size=2, missing=()):
+        self.batch_size = batch_size
+        self.missing = set(missing)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch_batch(self, tickers, period, interval):
+        with self._lock:
+            self.calls.append(list(tickers))
+        frames = {
+            t: _single(t, 10 * i)
+            for i, t in enumerate(tickers)
+            if t not in self.missing
+        }
+        if not frames:
+            return pd.DataFrame()
+        wide = pd.concat(frames, axis=1)  # (ticker, field)
+        return wide.swaplevel(axis=1).sort_index(axis=1)  # (field, ticker)
+
+    def fetch_one(self, ticker, period, interval):
+        raise AssertionError("batch providers are queried with fetch_batch")
+
+
+class FakeSingleProvider(EquityProvider):
+    """Serves one ticker per request."""
+
+    batch_size = 1
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    def fetch_batch(self, tickers, period, interval):
+        raise AssertionError("single-ticker providers are queried with fetch_one")
+
+    def fetch_one(self, ticker, period, interval):
+        self.calls.append(ticker)
+        if ticker in self.fail:
+            raise RuntimeError("boom")
+        return _single(ticker, 0)
+
+
+def test_batch_loader_groups_requests():
+    """Tickers are fetched in multi-symbol requests of batch_size."""
+    provider = FakeBatchProvider(batch_size=2)
+    panel = BatchEquityLoader(provider, max_workers=1).load(
+        ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    )
+    assert provider.calls == [["AAA", "BBB"], ["CCC", "DDD"], ["EEE"]]
+    assert list(panel.columns) == PANEL_COLUMNS
+    assert len(panel) == 5 * len(DATES)
+    assert list(panel["symbol"].unique()) == ["AAA", "BBB", "CCC", "DDD", "EEE"]
+
+
+def test_panel_values_and_order():
+    """Each symbol's rows are contiguous, time-ordered and correctly aligned."""
+    provider = FakeBatchProvider(batch_size=3)
+    panel = BatchEquityLoader(provider, max_workers=4).load(["AAA", "BBB", "CCC"])
+    bbb = panel[panel["symbol"] == "BBB"]
+    assert bbb["timestamp"].is_monotonic_increasing
+    assert str(bbb["timestamp"].dt.tz) == "UTC"
+    np.testing.assert_allclose(bbb["open"], 110.0 + np.arange(len(DATES)))
+    np.testing.assert_allclose(bbb["close"] - bbb["open"], 0.5)
+
+
+def test_missing_tickers_are_skipped():
+    """Tickers absent from the provider response do not appear in the panel."""
+    provider = FakeBatchProvider(batch_size=10, missing={"BBB"})
+    panel = BatchEquityLoader(provider).load(["AAA", "BBB", "CCC"])
+    assert set(panel["symbol"]) == {"AAA", "CCC"}
+
+
+def test_thread_pool_fallback_for_single_provider():
+    """Providers without batch support are queried per ticker, failures skipped."""
+    provider = FakeSingleProvider(fail={"BAD"})
+    panel = BatchEquityLoader(provider, max_workers=4).load(["AAA", "BAD", "CCC"])
+    assert sorted(provider.calls) == ["AAA", "BAD", "CCC"]
+    assert list(panel["symbol"].unique()) == ["AAA", "CCC"]
+    assert len(panel) == 2 * len(DATES)
+
+
+def test_normalise_flat_frame():
+    """A flat single-ticker frame is normalised without a ticker level."""
+    panel = normalise_wide(_single("AAA", 0), ["AAA"])
+    assert list(panel.columns) == PANEL_COLUMNS
+    assert (panel["symbol"] == "AAA").all()
+    with pytest.raises(ValueError):
+        normalise_wide(_single("AAA", 0), ["AAA", "BBB"])
+
+
+def test_normalise_tz_aware_index():
+    """Exchange-local timestamps come out as the same instants in UTC."""
+    frame = _single("AAA", 0).tz_localize("America/New_York")
+    wide = pd.concat({"AAA": frame, "BBB": frame}, axis=1).swaplevel(axis=1)
+    panel = normalise_wide(wide, ["AAA", "BBB"])
+    assert str(panel["timestamp"].dt.tz) == "UTC"
+    expected = frame.index.tz_convert("UTC")
+    assert (panel["timestamp"].to_numpy() == np.tile(expected.to_numpy(), 2)).all()
+    with pytest.raises(TypeError):
+        EquityProvider()
+
+
+def test_empty_input():
+    """No tickers yields an empty panel with the canonical columns."""
+    panel = BatchEquityLoader(FakeBatchProvider()).load([])
+    assert panel.empty
+    assert list(panel.columns) == PANEL_COLUMNS
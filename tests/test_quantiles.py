@@ -0,0 +1,80 @@
+"""
+Unit tests for streaming rolling quantiles.
+
+Test suite for RollingQuantile and spread_thresholds covering equality with
+pandas rolling quantiles, NaN handling, multi-series updates and
+validation.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantjourney_bidask import RollingQuantile, rolling_quantile, spread_thresholds
+
+QUANTILES = (0.0, 0.1, 0.25, 0.5, 0.75, 1.0)
+
+
+@pytest.fixture
+def values():
+    """Noisy series with NaN gaps and a run of ties."""
+    rng = np.random.default_rng(11)
+    x = rng.normal(size=3000)
+    x[::37] = np.nan
+    x[100:110] = np.nan
+    x[500:600] = 1.0
+    return x
+
+
+@pytest.mark.parametrize("window,min_periods", [(1, None), (5, None), (48, 24), (500, 1)])
+def test_matches_pandas(values, window, min_periods):
+    """Results are identical to Series.rolling(...).quantile(...)."""
+    got = rolling_quantile(values, window, QUANTILES, min_periods=min_periods)
+    series = pd.Series(values)
+    for i, q in enumerate(QUANTILES):
+        expected = series.rolling(window, min_periods=min_periods).quantile(q)
+        np.testing.assert_array_equal(got[:, i], expected.to_numpy())
+
+
+def test_streaming_matches_batch(values):
+    """Per-value updates on interleaved series match per-series batch runs."""
+    rq = RollingQuantile(20, (0.25, 0.75), n_series=2)
+    series = np.arange(len(values)) % 2
+    live = np.array([rq.update(v, s) for v, s in zip(values, series)])
+    for s in (0, 1):
+        expected = rolling_quantile(values[series == s], 20, (0.25, 0.75))
+        np.testing.assert_array_equal(live[series == s], expected)
+
+
+def test_spread_thresholds(values):
+    """Percentile thresholds are aligned with the input series."""
+    spread = pd.Series(np.abs(values), index=pd.date_range("2024-01-01", periods=len(values), freq="min"))
+    out = spread_thresholds(spread, window=48, low_percentile=25, high_percentile=75, min_periods=24)
+    assert list(out.columns) == ["low_threshold", "high_threshold"]
+    assert out.index.equals(spread.index)
+    pd.testing.assert_series_equal(
+        out["high_threshold"],
+        spread.rolling(48, min_periods=24).quantile(0.75),
+        check_names=False,
+    )
+    assert (out["low_threshold"].dropna() <= out["high_threshold"].dropna()).all()
+
+
+def test_validation():
+    """Invalid parameters are rejected."""
+    with pytest.raises(ValueError):
+        RollingQuantile(0)
+    with pytest.raises(ValueError):
+        RollingQuantile(10, quantiles=(1.5,))
+    with pytest.raises(ValueError):
+        RollingQuantile(10, min_periods=11)
+    rq = RollingQuantile(10, n_series=2)
+    with pytest.raises(IndexError):
+        rq.update(1.0, series=2)
+    with pytest.raises(IndexError):
+        rq.update_many([1.0], series=[5])
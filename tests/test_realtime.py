@@ -0,0 +1,221 @@
+"""
+Unit tests for the threaded real-time crypto stream.
+
+Test suite for the background I/O thread, sharded callback workers and the
+DataFetcher streaming API, using synthetic bars and a local replay server.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.fetch import DataFetcher
+from data.realtime import RealtimeStream, interval_seconds
+from data.stream import ReplayServer, kline_messages
+from data.synthetic import simulate_ohlc
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def replay_server():
+    """ReplayServer running on its own event loop thread."""
+    panel = simulate_ohlc(50, n_symbols=2, symbols=["BTCUSDT", "ETHUSDT"], seed=2)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = ReplayServer(kline_messages(panel))
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+    yield server, panel
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def test_interval_seconds():
+    """Exchange interval strings convert to seconds."""
+    assert interval_seconds("1s") == 1
+    assert interval_seconds("5m") == 300
+    with pytest.raises(ValueError):
+        interval_seconds("1x")
+
+
+def test_synthetic_stream_dispatches_in_order():
+    """Synthetic bars reach callbacks on worker threads, in order per symbol."""
+    seen = {}
+    threads = set()
+
+    def callback(bar):
+        threads.add(threading.current_thread().name)
+        seen.setdefault(bar["symbol"], []).append(bar["timestamp"])
+
+    stream = RealtimeStream(
+        ["BTCUSDT", "ETHUSDT", "SOLUSDT"], synthetic=True, workers=2, tick_seconds=0.005
+    )
+    stream.add_callback(callback)
+    stream.start()
+    try:
+        assert _wait_for(lambda: all(len(seen.get(s, [])) >= 10 for s in stream.symbols))
+    finally:
+        stream.stop()
+    for stamps in seen.values():
+        assert stamps == sorted(stamps)
+    assert threads <= {"stream-worker-0", "stream-worker-1"}
+    stats = stream.stats()
+    assert stats["received"] >= stats["dispatched"] >= 30
+    assert stats["dropped"] == 0
+
+
+def test_callback_errors_counted_across_workers():
+    """Exceptions from callbacks on every worker are counted, not lost."""
+    def callback(bar):
+        raise RuntimeError("boom")
+
+    stream = RealtimeStream(
+        ["BTCUSDT", "ETHUSDT", "SOLUSDT"], synthetic=True, workers=2, tick_seconds=0.002
+    )
+    stream.add_callback(callback)
+    stream.start()
+    try:
+        assert _wait_for(lambda: stream.stats()["dispatched"] >= 30)
+    finally:
+        stream.stop()
+    stats = stream.stats()
+    assert stats["callback_errors"] == stats["dispatched"]
+
+
+def test_slow_consumer_does_not_stall_ingestion(replay_server):
+    """A blocked callback drops its oldest bars but ingestion keeps going."""
+    server, panel = replay_server
+    release = threading.Event()
+    entered = threading.Event()
+
+    def callback(bar):
+        entered.set()
+        release.wait(5)
+
+    stream = RealtimeStream(
+        ["BTCUSDT", "ETHUSDT"], url=server.url, workers=1, queue_size=5
+    )
+    stream.add_callback(callback)
+    stream.start()
+    try:
+        assert _wait_for(lambda: stream.stats()["received"] == len(panel))
+        assert entered.wait(5)
+        stats = stream.stats()
+        # The worker may take its first bar before or after the queue fills.
+        assert stats["queue_depth"] in (4, 5)
+        # One bar is held by the blocked callback; the rest queued or dropped.
+        assert stats["dropped"] + stats["queue_depth"] + 1 == len(panel)
+    finally:
+        release.set()
+        stream.stop()
+
+
+def test_conflation_keeps_latest_bar_per_symbol(replay_server):
+    """Under a blocked consumer, at most one bar per symbol waits, and it is the latest."""
+    server, panel = replay_server
+    release = threading.Event()
+    seen = []
+
+    def callback(bar):
+        release.wait(5)
+        seen.append((bar["symbol"], bar["timestamp"]))
+
+    stream = RealtimeStream(
+        ["BTCUSDT", "ETHUSDT"], url=server.url, workers=1, conflate=True
+    )
+    stream.add_callback(callback)
+    stream.start()
+    try:
+        assert _wait_for(lambda: stream.stats()["received"] == len(panel))
+        stats = stream.stats()
+        assert stats["queue_depth"] <= 2
+        assert stats["dropped"] == 0
+        # One bar is held by the blocked callback, at most two are pending.
+        assert stats["conflated"] >= len(panel) - 3
+        release.set()
+        assert _wait_for(lambda: stream.stats()["queue_depth"] == 0)
+        assert _wait_for(lambda: len(seen) == stream.stats()["dispatched"])
+    finally:
+        release.set()
+        stream.stop()
+    stats = stream.stats()
+    assert stats["dispatched"] + stats["conflated"] == len(panel)
+    assert stats["latency_p99_ms"] >= stats["latency_p50_ms"] > 0
+    last = {symbol: ts for symbol, ts in seen}
+    assert last == panel.groupby("symbol")["timestamp"].max().to_dict()
+
+
+def test_conflation_rate_limits_each_symbol():
+    """With min_interval, each symbol is dispatched at most once per interval."""
+    times = {}
+
+    def callback(bar):
+        times.setdefault(bar["symbol"], []).append(time.monotonic())
+
+    stream = RealtimeStream(
+        ["BTCUSDT", "ETHUSDT"], synthetic=True, tick_seconds=0.002,
+        conflate=True, min_interval=0.05,
+    )
+    stream.add_callback(callback)
+    stream.start()
+    try:
+        assert _wait_for(lambda: all(len(times.get(s, [])) >= 4 for s in stream.symbols))
+    finally:
+        stream.stop()
+    for stamps in times.values():
+        assert min(np.diff(stamps)) >= 0.045
+    stats = stream.stats()
+    assert stats["conflated"] > 0
+    assert stats["queue_depth"] <= 2
+
+
+def test_start_raises_when_unreachable():
+    """The first connection failure is reported to the caller."""
+    stream = RealtimeStream(["BTCUSDT"], url="ws://127.0.0.1:9/stream", connect_timeout=1.0)
+    with pytest.raises(ConnectionError):
+        stream.start()
+    assert not stream.running
+
+
+def test_data_fetcher_stream_api(replay_server):
+    """DataFetcher exposes start/add_stream_callback/stop over the stream."""
+    server, panel = replay_server
+    server.interval = 0.002  # leave time to register the callback after start
+    bars = []
+    fetcher = DataFetcher()
+    fetcher.start_realtime_crypto_stream(
+        symbols=["BTCUSDT", "ETHUSDT"], interval="1m", url=server.url
+    )
+    fetcher.add_stream_callback(bars.append)
+    try:
+        assert _wait_for(lambda: fetcher.get_stream_stats()["dispatched"] == len(panel))
+    finally:
+        fetcher.stop_realtime_crypto_stream()
+    # The callback was registered after start, so early bars may be missed.
+    assert 0 < len(bars) <= len(panel)
+    assert {"symbol", "timestamp", "open", "high", "low", "close", "volume"} <= set(bars[-1])
+    assert not fetcher.realtime_stream.running
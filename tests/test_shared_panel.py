@@ -0,0 +1,85 @@
+"""
+Unit tests for the shared-memory panel and its multi-process estimators.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import os
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.synthetic import simulate_ohlc
+from quantjourney_bidask import SharedPanel, edge_rolling, edge_zscore
+
+
+@pytest.fixture
+def panel_data():
+    """Five interleaved symbols in time order."""
+    df = simulate_ohlc(400, spread=0.002, n_symbols=5, seed=3)
+    return df.sort_values(["timestamp", "spread"], kind="stable").reset_index(drop=True)
+
+
+def _symbol_sum(panel, lo, hi, column):
+    return [float(np.nansum(panel[column][panel.rows(s)])) for s in range(lo, hi)]
+
+
+def _die(panel, lo, hi):
+    os._exit(3)
+
+
+def test_panel_layout_and_attach(panel_data):
+    with SharedPanel.from_frame(panel_data) as panel:
+        assert len(panel) == len(panel_data)
+        assert sorted(panel.symbols) == ["SYM0", "SYM1", "SYM2", "SYM3", "SYM4"]
+        rows = panel.rows("SYM2")
+        expected = panel_data[panel_data["symbol"] == "SYM2"]
+        np.testing.assert_array_equal(panel["close"][rows], expected["close"].to_numpy())
+        assert panel.timestamps(rows).equals(pd.DatetimeIndex(expected["timestamp"]))
+
+        other = SharedPanel.attach(panel.name)
+        other["spread"][rows] = 1.0  # writes are visible to every mapping
+        assert not other.owner and np.all(panel["spread"][rows] == 1.0)
+        other.close()
+
+        sums = panel.map(_symbol_sum, n_jobs=2, column="close")
+        assert sum(sums, []) == _symbol_sum(panel, 0, 5, "close")
+
+
+def test_parallel_estimators_match_per_symbol(panel_data):
+    expected_z = edge_zscore(panel_data, window=24, zscore_window=40, by="symbol")
+    with SharedPanel.from_frame(panel_data) as panel:
+        panel.edge_rolling(window=21, step=2, n_jobs=3)
+        for symbol in panel.symbols:
+            rows = panel.rows(symbol)
+            own = panel_data[panel_data["symbol"] == symbol]
+            np.testing.assert_array_equal(
+                panel["spread"][rows], edge_rolling(own, window=21, step=2).to_numpy()
+            )
+        panel.edge_zscore(window=24, zscore_window=40, n_jobs=2)
+        frame = panel.to_frame()
+    for symbol in frame["symbol"].unique():
+        mask = (panel_data["symbol"] == symbol).to_numpy()
+        np.testing.assert_array_equal(
+            frame.loc[frame["symbol"] == symbol, "spread_zscore"].to_numpy(),
+            expected_z["spread_zscore"].to_numpy()[mask],
+        )
+
+
+def test_worker_death_leaves_no_segment(panel_data):
+    panel = SharedPanel.from_frame(panel_data)
+    name = panel.name
+    with pytest.raises(BrokenProcessPool):
+        with panel:
+            panel.map(_die, n_jobs=2)
+    with pytest.raises(FileNotFoundError):
+        SharedPanel.attach(name)
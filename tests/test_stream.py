@@ -0,0 +1,256 @@
+"""
+Unit tests for push-based websocket streaming.
+
+Test suite for the websocket client, columnar bar buffer and local replay
+server, covering multiplexed subscriptions, reconnection with resubscription
+and the DataFetcher websocket feed.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import asyncio
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.fetch import DataFetcher
+from data.stream import (
+    BarBuffer,
+    HandshakeError,
+    ProtocolError,
+    ReplayServer,
+    StreamClient,
+    _accept,
+    connect,
+    kline_messages,
+    load_messages,
+)
+from data.synthetic import simulate_ohlc
+
+
+def _messages(n_bars=20, symbols=("BTCUSDT", "ETHUSDT")):
+    panel = simulate_ohlc(n_bars, n_symbols=len(symbols), symbols=list(symbols), seed=1)
+    return panel, kline_messages(panel)
+
+
+def _quote(symbol, bid, ask):
+    return json.dumps(
+        {
+            "stream": f"{symbol.lower()}@bookTicker",
+            "data": {"s": symbol, "b": str(bid), "a": str(ask)},
+        }
+    )
+
+
+def test_bar_buffer_wraps_and_counts_overwrites():
+    """The ring keeps the newest rows and counts what the consumer missed."""
+    buf = BarBuffer(capacity=4)
+    for i in range(6):
+        buf.append(0, i, i, 0, 1.0, 2.0, 0.5, float(i), 1.0, np.nan, np.nan, True)
+    assert len(buf) == 4
+    assert buf.overwritten == 2
+    rows = buf.drain()
+    np.testing.assert_array_equal(rows["close"], [2.0, 3.0, 4.0, 5.0])
+    assert len(buf) == 0
+    assert len(buf.drain()["close"]) == 0
+
+
+def test_multiplexed_subscription():
+    """Many symbols share one connection and land in the columnar buffer."""
+    panel, messages = _messages()
+    messages.insert(0, _quote("BTCUSDT", 99.0, 101.0))
+
+    async def run():
+        async with ReplayServer(messages) as server:
+            client = StreamClient(url=server.url)
+            client.subscribe(["BTCUSDT", "ETHUSDT"])
+            await client.run(duration=0.5)
+            return server, client
+
+    server, client = asyncio.run(run())
+    assert server.connections == 1
+    assert sorted(server.subscriptions[0]) == sorted(
+        ["btcusdt@kline_1m", "btcusdt@bookTicker", "ethusdt@kline_1m", "ethusdt@bookTicker"]
+    )
+    rows = client.buffer.drain()
+    assert len(rows["close"]) == len(panel)
+    df = client.to_frame(rows)
+    btc = df[df["symbol"] == "BTCUSDT"]
+    np.testing.assert_allclose(
+        btc["close"].to_numpy(), panel.loc[panel["symbol"] == "BTCUSDT", "close"]
+    )
+    assert (btc["bid"] == 99.0).all() and (btc["ask"] == 101.0).all()
+    assert df.loc[df["symbol"] == "ETHUSDT", "bid"].isna().all()
+
+
+def test_unsubscribed_streams_are_not_sent():
+    """The server only replays streams the client asked for."""
+    panel, messages = _messages()
+
+    async def run():
+        async with ReplayServer(messages) as server:
+            client = StreamClient(url=server.url)
+            client.subscribe(["ETHUSDT"])
+            await client.run(duration=0.5)
+            return client
+
+    client = asyncio.run(run())
+    rows = client.buffer.drain()
+    assert len(rows["close"]) == (panel["symbol"] == "ETHUSDT").sum()
+
+
+def test_reconnect_resubscribes():
+    """Dropped connections are re-established and resubscribed."""
+    panel, messages = _messages(n_bars=15)
+    seen = []
+
+    async def run():
+        async with ReplayServer(messages, drop_after=10) as server:
+            client = StreamClient(url=server.url, reconnect_delay=0.01, on_update=seen.append)
+            client.subscribe(["BTCUSDT", "ETHUSDT"])
+            await client.run(duration=1.0)
+            return server, client
+
+    server, client = asyncio.run(run())
+    assert server.connections >= 3
+    assert client.reconnects >= 2
+    assert all(len(s) == 4 for s in server.subscriptions)
+    assert len(seen) == len(panel)
+    assert seen == list(range(len(panel)))
+
+
+def test_record_and_replay(tmp_path):
+    """Recorded raw messages can be replayed by the stand-in server."""
+    _, messages = _messages(n_bars=5)
+    path = str(tmp_path / "recording.jsonl")
+
+    async def record():
+        async with ReplayServer(messages) as server:
+            client = StreamClient(url=server.url, record_path=path)
+            client.subscribe(["BTCUSDT", "ETHUSDT"])
+            await client.run(duration=0.5)
+
+    asyncio.run(record())
+    recorded = [m for m in load_messages(path) if "stream" in json.loads(m)]
+    assert recorded == messages
+
+
+def test_fetcher_streams_from_websocket():
+    """DataFetcher builds its frame from pushed klines rather than polling."""
+    panel, messages = _messages(n_bars=8, symbols=("BTCUSDT",))
+    messages.insert(0, _quote("BTCUSDT", 99.5, 100.5))
+
+    async def run():
+        async with ReplayServer(messages) as server:
+            return await DataFetcher().get_btc_1m_websocket(
+                duration_seconds=1, url=server.url
+            )
+
+    df = asyncio.run(run())
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) == 8
+    assert (df["spread_source"] == "real").all()
+    np.testing.assert_allclose(df["spread"], 1.0 / df["price"])
+
+
+async def _serve(handler):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    return server, f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/stream"
+
+
+def test_protocol_violations_fail_the_connection():
+    """Bad control frames and stray continuations close with 1002, oversized data with 1009."""
+    frames = [
+        (bytes([0x09, 0x00]), 1002),  # ping without FIN
+        (bytes([0x89, 126]) + struct.pack("!H", 126) + b"x" * 126, 1002),  # 126-byte ping
+        (bytes([0x80, 0x01]) + b"x", 1002),  # continuation with nothing to continue
+        (bytes([0x81, 127]) + struct.pack("!Q", 1 << 40), 1009),  # 1 TiB frame, never sent
+        (bytes([0x01, 40]) + b"x" * 40 + bytes([0x80, 40]) + b"x" * 40, 1009),  # 80-byte message
+    ]
+
+    async def run(frame):
+        replies = []
+
+        async def handler(reader, writer):
+            ws = await _accept(reader, writer)
+            writer.write(frame)
+            await writer.drain()
+            replies.append(await ws._read_frame())
+            writer.close()
+
+        server, url = await _serve(handler)
+        async with server:
+            ws = await connect(url, timeout=2.0, max_size=64)
+            with pytest.raises(ProtocolError):
+                await ws.recv()
+            assert ws.closed
+            await asyncio.sleep(0.05)
+        return replies
+
+    for frame, code in frames:
+        (fin, opcode, payload), = asyncio.run(run(frame))
+        assert (fin, opcode, struct.unpack("!H", payload)[0]) == (True, 0x8, code)
+
+
+def test_subscribe_from_another_thread():
+    """Symbols added from a non-loop thread while running are subscribed on the loop."""
+    panel, messages = _messages(n_bars=20)
+
+    async def run():
+        async with ReplayServer(messages, interval=0.01) as server:
+            client = StreamClient(url=server.url)
+            client.subscribe(["BTCUSDT"])
+            task = asyncio.ensure_future(client.run(duration=1.0))
+            while not server.sent:
+                await asyncio.sleep(0.01)
+            await asyncio.to_thread(client.subscribe, ["ETHUSDT", "ETHUSDT"])
+            await task
+            return server, client
+
+    server, client = asyncio.run(run())
+    assert server.subscriptions[1] == ["ethusdt@kline_1m", "ethusdt@bookTicker"]
+    df = client.to_frame(client.buffer.drain())
+    assert (df["symbol"] == "ETHUSDT").any()
+    assert client.symbol_names == ["BTCUSDT", "ETHUSDT"] and len(client._bid) == 2
+
+
+def test_handshake_failures_raise():
+    """Rejected or missing upgrade responses raise, and bad requests get a 400."""
+    async def refuse(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def hang_up(reader, writer):
+        writer.close()
+
+    async def run():
+        for handler in (refuse, hang_up):
+            server, url = await _serve(handler)
+            async with server:
+                with pytest.raises(HandshakeError):
+                    await connect(url, timeout=2.0)
+        async with ReplayServer([]) as server:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(b"GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return server, response
+
+    server, response = asyncio.run(run())
+    assert response.startswith(b"HTTP/1.1 400")
+    assert server.rejected == 1 and server.connections == 0
@@ -0,0 +1,77 @@
+"""
+Unit tests for the vectorized synthetic OHLC generators.
+
+Test suite for the seeded bid/ask bounce simulator, covering output layout,
+reproducibility, OHLC consistency and recovery of the true spread.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.synthetic import simulate_ohlc, simulate_ohlc_arrays
+from quantjourney_bidask import edge
+
+
+def test_arrays_shape_and_consistency():
+    """Bars are well-formed OHLC for every symbol."""
+    out = simulate_ohlc_arrays(500, n_symbols=3, seed=1)
+    for key in ("open", "high", "low", "close", "volume", "mid"):
+        assert out[key].shape == (3, 500)
+    assert np.all(out["high"] >= np.maximum(out["open"], out["close"]))
+    assert np.all(out["low"] <= np.minimum(out["open"], out["close"]))
+    assert np.all(out["volume"] > 0)
+    np.testing.assert_array_equal(out["spread"], [0.01, 0.01, 0.01])
+
+
+def test_seed_reproducibility():
+    """The same seed gives identical bars, a different seed does not."""
+    a = simulate_ohlc_arrays(200, seed=7)
+    b = simulate_ohlc_arrays(200, seed=7)
+    c = simulate_ohlc_arrays(200, seed=8)
+    np.testing.assert_array_equal(a["close"], b["close"])
+    assert not np.array_equal(a["close"], c["close"])
+
+
+def test_symbols_start_from_initial_price():
+    """Each symbol's walk starts near its own initial price."""
+    out = simulate_ohlc_arrays(
+        10, n_symbols=2, initial_price=[100.0, 5000.0], volatility=0.001, seed=3
+    )
+    np.testing.assert_allclose(out["mid"][:, 0], [100.0, 5000.0], rtol=0.01)
+
+
+@pytest.mark.parametrize("spread", [0.002, 0.01])
+def test_edge_recovers_true_spread(spread):
+    """The EDGE estimate on a long sample is close to the simulated spread."""
+    out = simulate_ohlc_arrays(20000, spread=spread, seed=11)
+    est = edge(out["open"][0], out["high"][0], out["low"][0], out["close"][0])
+    assert est == pytest.approx(spread, rel=0.1)
+
+
+def test_panel_frame():
+    """The DataFrame variant is a long panel with the true spread column."""
+    df = simulate_ohlc(50, n_symbols=2, spread=[0.01, 0.02], symbols=["A", "B"], seed=5)
+    assert len(df) == 100
+    assert list(df["symbol"].unique()) == ["A", "B"]
+    assert df.loc[df["symbol"] == "B", "spread"].eq(0.02).all()
+    assert df.groupby("symbol")["timestamp"].apply(lambda s: s.is_monotonic_increasing).all()
+
+
+def test_invalid_arguments():
+    """Per-symbol parameters must match the number of symbols."""
+    with pytest.raises(ValueError):
+        simulate_ohlc_arrays(10, n_symbols=2, spread=[0.01, 0.02, 0.03])
+    with pytest.raises(ValueError):
+        simulate_ohlc_arrays(0)
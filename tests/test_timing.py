@@ -0,0 +1,88 @@
+"""
+Unit tests for the opt-in per-stage timing of the estimators.
+
+Author: Jakub Polec
+Date: 2025-06-28
+
+Part of the QuantJourney framework - The framework with advanced quantitative
+finance tools and insights.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantjourney_bidask import (
+    edge,
+    edge_expanding,
+    edge_hft,
+    edge_rolling,
+    edge_rolling_update,
+    timing,
+)
+
+
+@pytest.fixture
+def ohlc_data():
+    rng = np.random.default_rng(7)
+    n = 200
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    return pd.DataFrame({
+        "open": prices * (1 + rng.uniform(-0.001, 0.001, n)),
+        "high": prices * (1 + rng.uniform(0.001, 0.004, n)),
+        "low": prices * (1 - rng.uniform(0.001, 0.004, n)),
+        "close": prices * (1 + rng.uniform(-0.001, 0.001, n)),
+    })
+
+
+@pytest.fixture(autouse=True)
+def clean_timing():
+    timing.disable()
+    timing.reset()
+    yield
+    timing.disable()
+    timing.reset()
+
+
+def test_stages_recorded_per_estimator(ohlc_data):
+    """Every instrumented entry point reports its stages with call counts."""
+    args = [ohlc_data[c] for c in ("open", "high", "low", "close")]
+    with timing.record():
+        value = edge(*args)
+        edge_hft.edge(*args)
+        edge_rolling(ohlc_data, window=21)
+        edge_rolling_update(None, ohlc_data, window=21)
+        edge_expanding(ohlc_data.iloc[:10])
+    stats = timing.stats()
+
+    for stage in ("convert", "log", "returns", "indicators", "probabilities", "kernel"):
+        assert stats[f"edge.{stage}"]["calls"] == 1 + 8  # direct call + expanding rows 2..9
+        assert stats[f"edge_hft.{stage}"]["calls"] == 1
+    for stage in ("prepare", "sessions", "kernel", "series"):
+        assert stats[f"edge_rolling.{stage}"]["calls"] == 1
+        assert stats[f"edge_rolling_update.{stage}"]["calls"] == 1
+    for stage in ("prepare", "loop", "series"):
+        assert stats[f"edge_expanding.{stage}"]["calls"] == 1
+    for entry in stats.values():
+        assert entry["total_ns"] >= 0
+        assert entry["mean_ns"] == entry["total_ns"] / entry["calls"]
+    assert value == edge(*args)
+
+
+def test_disabled_records_nothing(ohlc_data):
+    """Timing is off by default and record() restores the previous state."""
+    edge_rolling(ohlc_data, window=21)
+    assert timing.stats() == {}
+
+    with timing.record():
+        assert timing.is_enabled()
+        edge_rolling(ohlc_data, window=21)
+    assert not timing.is_enabled()
+    recorded = timing.stats()
+    edge_rolling(ohlc_data, window=21)
+    assert timing.stats() == recorded
+
+    timing.enable()
+    edge_rolling(ohlc_data, window=21)
+    assert timing.stats()["edge_rolling.kernel"]["calls"] == 2
+    timing.reset()
+    assert timing.stats() == {}